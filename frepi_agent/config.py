@@ -34,6 +34,9 @@ class Config:
     telegram_bot_token: str
     telegram_webhook_url: Optional[str] = None
 
+    # Direct Postgres connection for hot read paths (optional)
+    database_url: Optional[str] = None
+
     # Application settings
     log_level: str = "INFO"
     environment: str = "development"
@@ -64,6 +67,7 @@ class Config:
             telegram_bot_token=os.environ.get("TELEGRAM_BOT_TOKEN", ""),
             # Optional keys
             telegram_webhook_url=os.environ.get("TELEGRAM_WEBHOOK_URL"),
+            database_url=os.environ.get("DATABASE_URL"),
             log_level=os.environ.get("LOG_LEVEL", "INFO"),
             environment=os.environ.get("ENVIRONMENT", "development"),
             # Model settings
@@ -5,11 +5,15 @@ Handles incoming messages from Telegram and routes them to the appropriate agent
 based on user type (restaurant or supplier).
 """
 
+import asyncio
 import logging
-from typing import Dict, Union
+import time
+from datetime import timedelta
+from typing import AsyncIterator, Dict, Optional, Union
 from dataclasses import dataclass, field
 
 from telegram import Update
+from telegram.error import BadRequest, RetryAfter
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -19,8 +23,10 @@ from telegram.ext import (
 )
 
 from frepi_agent.config import get_config
+from frepi_agent.shared.db_pool import close_db_pool, init_db_pool
 from frepi_agent.shared.user_identification import (
     identify_user,
+    invalidate_user_cache,
     UserType,
     UserIdentification,
     get_role_selection_message,
@@ -30,7 +36,8 @@ from frepi_agent.restaurant_facing_agent.agent import (
     ConversationContext as RestaurantContext,
 )
 from frepi_agent.supplier_facing_agent.agent import (
-    supplier_chat,
+    close_supplier_agent,
+    supplier_chat_stream,
     SupplierConversationContext,
 )
 from frepi_agent.restaurant_facing_agent.subagents.onboarding_subagent.agent import (
@@ -45,6 +52,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Telegram's limit for a single message
+MAX_MESSAGE_LENGTH = 4096
+# Minimum time between edits of a streamed reply (Telegram rate-limits edits)
+STREAM_EDIT_INTERVAL_SECONDS = 1.0
+# Sent instead when a streamed reply turns out empty (Telegram rejects "")
+EMPTY_REPLY_MESSAGE = "Desculpe, não consegui gerar uma resposta. Pode tentar novamente?"
+
 
 @dataclass
 class UserSession:
@@ -280,6 +294,75 @@ Digite 1 ou 2 para continuar.
         """.strip()
 
 
+async def stream_reply(update: Update, chunks: AsyncIterator[str]) -> Optional[str]:
+    """
+    Show a streamed reply by editing a single message as text arrives.
+
+    Args:
+        update: Telegram update
+        chunks: Reply text chunks
+
+    Returns:
+        The full reply if it still has to be sent normally (nothing was shown,
+        or it outgrew a single message), EMPTY_REPLY_MESSAGE if the stream
+        had no text, otherwise None
+    """
+    sent = None
+    text = ""
+    shown = ""
+    next_edit = 0.0
+    async for chunk in chunks:
+        text += chunk
+        if not text.strip() or len(text) > MAX_MESSAGE_LENGTH:
+            continue
+        now = time.monotonic()
+        if sent is None:
+            sent = await update.message.reply_text(text)
+            shown = text.rstrip()
+            next_edit = now + STREAM_EDIT_INTERVAL_SECONDS
+        # Telegram trims trailing whitespace, so such chunks would not modify it
+        elif now >= next_edit and text.rstrip() != shown:
+            try:
+                await _edit_message(sent, text)
+            except RetryAfter as e:
+                # Flood-limited: keep streaming and show the text once allowed
+                next_edit = now + _retry_after_seconds(e)
+                continue
+            shown = text.rstrip()
+            next_edit = now + STREAM_EDIT_INTERVAL_SECONDS
+
+    if sent is None:
+        return text if text.strip() else EMPTY_REPLY_MESSAGE
+    if len(text) > MAX_MESSAGE_LENGTH:
+        await sent.delete()
+        return text
+
+    # Partial text is shown plain (markup may be unbalanced); render it at the end
+    try:
+        await _edit_message(sent, text, parse_mode="Markdown")
+    except RetryAfter as e:
+        await asyncio.sleep(_retry_after_seconds(e))
+        await _edit_message(sent, text, parse_mode="Markdown")
+    return None
+
+
+async def _edit_message(message, text: str, **kwargs):
+    """Edit a sent message, ignoring Telegram's "message is not modified"."""
+    try:
+        await message.edit_text(text, **kwargs)
+    except BadRequest as e:
+        if "not modified" not in str(e).lower():
+            raise
+
+
+def _retry_after_seconds(error: RetryAfter) -> float:
+    """Seconds to wait from a RetryAfter (an int, or a timedelta on newer versions)."""
+    retry_after = error.retry_after
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle incoming text messages with routing based on user type."""
     chat_id = update.effective_chat.id
@@ -324,6 +407,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 # Check if onboarding completed
                 if session.onboarding_context.onboarding_complete:
                     session.needs_onboarding = False
+                    invalidate_user_cache(chat_id)
                     # Transfer info to restaurant context
                     session.restaurant_context.restaurant_name = session.onboarding_context.restaurant_name
                     logger.info(f"   ✅ Onboarding completed!")
@@ -336,19 +420,24 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 response = await restaurant_chat(user_message, session.restaurant_context)
 
         elif session.user_type == UserType.SUPPLIER:
-            # Route to supplier agent
-            response = await supplier_chat(user_message, session.supplier_context)
+            # Route to supplier agent, streaming the reply into the chat
+            response = await stream_reply(
+                update,
+                supplier_chat_stream(user_message, session.supplier_context),
+            )
 
         else:
             # Fallback - shouldn't happen
             session.awaiting_role_selection = True
             response = get_role_selection_message()
 
-        # Send response (split if too long)
-        if len(response) > 4096:
+        # Send response (split if too long); streamed replies are already shown
+        if response is None:
+            pass
+        elif len(response) > MAX_MESSAGE_LENGTH:
             # Split into chunks
-            for i in range(0, len(response), 4096):
-                chunk = response[i:i + 4096]
+            for i in range(0, len(response), MAX_MESSAGE_LENGTH):
+                chunk = response[i:i + MAX_MESSAGE_LENGTH]
                 await update.message.reply_text(chunk, parse_mode="Markdown")
         else:
             await update.message.reply_text(response, parse_mode="Markdown")
@@ -410,6 +499,11 @@ async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def _post_init(application: Application):
     """Called after the application is initialized (inside the event loop)."""
+    try:
+        await init_db_pool()
+    except Exception as e:
+        logger.warning(f"Postgres pool setup failed (using REST client): {e}")
+
     try:
         from frepi_agent.services.heartbeat import init_heartbeat
         init_heartbeat(application.bot)
@@ -418,6 +512,13 @@ async def _post_init(application: Application):
         logger.warning(f"Heartbeat setup failed (continuing without): {e}")
 
 
+async def _post_shutdown(application: Application):
+    """Called after the application has shut down (still inside the event loop)."""
+    await close_supplier_agent()
+    # Releases the pool's connections (up to 50) instead of dropping them
+    await close_db_pool()
+
+
 def create_application() -> Application:
     """Create and configure the Telegram application."""
     config = get_config()
@@ -426,7 +527,14 @@ def create_application() -> Application:
         raise ValueError("TELEGRAM_BOT_TOKEN not configured")
 
     # Create application with post_init for heartbeat (needs running event loop)
-    application = Application.builder().token(config.telegram_bot_token).post_init(_post_init).build()
+    # and post_shutdown to close connections inside that same loop
+    application = (
+        Application.builder()
+        .token(config.telegram_bot_token)
+        .post_init(_post_init)
+        .post_shutdown(_post_shutdown)
+        .build()
+    )
 
     # Add handlers
     application.add_handler(CommandHandler("start", start_command))
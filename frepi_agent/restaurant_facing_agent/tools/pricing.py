@@ -17,7 +17,7 @@ from .supabase_client import (
 )
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PriceInfo:
     """Price information for a product from a supplier."""
 
@@ -19,8 +19,11 @@ from .supabase_client import (
     execute_rpc,
 )
 
+# master_list columns returned to callers (skips the wide embedding columns)
+PRODUCT_COLUMNS = "id, product_name, brand, specifications"
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class ProductMatch:
     """A product match result from vector search."""
 
@@ -157,7 +160,7 @@ async def _fallback_search(
     # Note: This requires the embedding_vector_v2 column to be of type vector(1536)
     result = (
         client.table(Tables.MASTER_LIST)
-        .select("id, product_name, brand, specifications")
+        .select(PRODUCT_COLUMNS)
         .eq("is_active", True)
         .limit(limit)
         .execute()
@@ -185,7 +188,7 @@ async def get_product_by_id(product_id: int) -> Optional[dict]:
 
     result = (
         client.table(Tables.MASTER_LIST)
-        .select("*")
+        .select(PRODUCT_COLUMNS)
         .eq("id", product_id)
         .eq("is_active", True)
         .limit(1)
@@ -213,6 +216,7 @@ async def get_products_by_ids(product_ids: list[int]) -> list[dict]:
     return await fetch_many(
         Tables.MASTER_LIST,
         filters={"id": product_ids, "is_active": True},
+        columns=PRODUCT_COLUMNS,
     )
 
 
@@ -9,6 +9,8 @@ from frepi_agent.shared.supabase_client import (
     get_supabase_client,
     reset_client,
     Tables,
+    execute_async,
+    quote_filter_value,
     fetch_one,
     fetch_many,
     insert_one,
@@ -21,6 +23,8 @@ __all__ = [
     "get_supabase_client",
     "reset_client",
     "Tables",
+    "execute_async",
+    "quote_filter_value",
     "fetch_one",
     "fetch_many",
     "insert_one",
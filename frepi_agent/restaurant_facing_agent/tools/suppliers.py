@@ -4,21 +4,25 @@ Supplier operations for Frepi Agent.
 Handles supplier queries, registration, and management.
 """
 
+import time
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
+
+from frepi_agent.shared import db_pool
 
 from .supabase_client import (
     get_supabase_client,
     Tables,
+    execute_async,
+    quote_filter_value,
     fetch_one,
-    fetch_many,
     insert_one,
     update_one,
 )
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Supplier:
     """Supplier information."""
 
@@ -33,6 +37,23 @@ class Supplier:
     reliability_score: Optional[float]
     response_time_avg: Optional[float]
 
+    @classmethod
+    def from_row(cls, row: dict) -> "Supplier":
+        """Build a Supplier from a suppliers table row."""
+        get = row.get
+        return cls(
+            row["id"],
+            row["company_name"],
+            get("contact_person"),
+            get("phone"),
+            get("email"),
+            get("cnpj"),
+            get("address"),
+            get("is_active", True),
+            get("reliability_score"),
+            get("response_time_avg"),
+        )
+
     def to_dict(self) -> dict:
         """Convert to dictionary."""
         return {
@@ -49,6 +70,58 @@ class Supplier:
         }
 
 
+# Supplier columns for the asyncpg path. Numeric columns are cast to float8,
+# since asyncpg returns numeric as Decimal, which json.dumps cannot encode.
+_SUPPLIER_PG_COLUMNS = """
+    id, company_name, contact_person, phone, email, cnpj, address, is_active,
+    reliability_score::float8 AS reliability_score,
+    response_time_avg::float8 AS response_time_avg
+"""
+
+# Short-lived cache of supplier lookups, keyed by ("id", supplier_id) or
+# ("name", lowercased name). Only found suppliers are cached.
+SUPPLIER_CACHE_TTL_SECONDS = 300
+SUPPLIER_CACHE_MAX_SIZE = 2_048
+_supplier_cache: dict[tuple[str, Any], tuple[float, "Supplier"]] = {}
+
+
+def invalidate_supplier_cache(supplier_id: Optional[int] = None):
+    """
+    Drop cached supplier lookups.
+
+    Args:
+        supplier_id: Supplier to drop (by ID and by any name that found it),
+            or None to clear the whole cache
+    """
+    if supplier_id is None:
+        _supplier_cache.clear()
+        return
+
+    stale = [
+        key for key, (_, supplier) in _supplier_cache.items()
+        if supplier.id == supplier_id
+    ]
+    for key in stale:
+        del _supplier_cache[key]
+
+
+def _get_cached_supplier(key: tuple[str, Any]) -> Optional["Supplier"]:
+    """Cached supplier for a lookup key, or None if missing or expired."""
+    cached = _supplier_cache.get(key)
+    if cached and time.monotonic() - cached[0] < SUPPLIER_CACHE_TTL_SECONDS:
+        return cached[1]
+    return None
+
+
+def _cache_supplier(key: tuple[str, Any], supplier: "Supplier"):
+    """Cache a found supplier, evicting the oldest entry when full."""
+    if len(_supplier_cache) >= SUPPLIER_CACHE_MAX_SIZE:
+        # Dicts keep insertion order, so the first key is the oldest
+        _supplier_cache.pop(next(iter(_supplier_cache)))
+    _supplier_cache.pop(key, None)
+    _supplier_cache[key] = (time.monotonic(), supplier)
+
+
 async def get_supplier_by_id(supplier_id: int) -> Optional[Supplier]:
     """
     Get a supplier by ID.
@@ -59,9 +132,16 @@ async def get_supplier_by_id(supplier_id: int) -> Optional[Supplier]:
     Returns:
         Supplier object or None if not found
     """
+    key = ("id", supplier_id)
+    supplier = _get_cached_supplier(key)
+    if supplier is not None:
+        return supplier
+
     row = await fetch_one(Tables.SUPPLIERS, {"id": supplier_id})
     if row:
-        return _row_to_supplier(row)
+        supplier = Supplier.from_row(row)
+        _cache_supplier(key, supplier)
+        return supplier
     return None
 
 
@@ -75,19 +155,33 @@ async def get_supplier_by_name(company_name: str) -> Optional[Supplier]:
     Returns:
         Supplier object or None if not found
     """
-    client = get_supabase_client()
-
-    # Use ilike for case-insensitive search
-    result = (
-        client.table(Tables.SUPPLIERS)
-        .select("*")
-        .ilike("company_name", f"%{company_name}%")
-        .limit(1)
-        .execute()
-    )
-
-    if result.data:
-        return _row_to_supplier(result.data[0])
+    key = ("name", company_name.lower())
+    supplier = _get_cached_supplier(key)
+    if supplier is not None:
+        return supplier
+
+    if db_pool.get_db_pool() is not None:
+        rows = await db_pool.fetch(
+            f"SELECT {_SUPPLIER_PG_COLUMNS} FROM suppliers"
+            " WHERE company_name ILIKE '%' || $1 || '%' LIMIT 1",
+            company_name,
+        )
+    else:
+        client = get_supabase_client()
+
+        # Use ilike for case-insensitive search
+        result = await execute_async(
+            client.table(Tables.SUPPLIERS)
+            .select("*")
+            .ilike("company_name", f"%{company_name}%")
+            .limit(1)
+        )
+        rows = result.data
+
+    if rows:
+        supplier = Supplier.from_row(rows[0])
+        _cache_supplier(key, supplier)
+        return supplier
     return None
 
 
@@ -101,33 +195,71 @@ async def search_suppliers(query: str) -> list[Supplier]:
     Returns:
         List of matching suppliers
     """
+    if db_pool.get_db_pool() is not None:
+        rows = await db_pool.fetch(
+            f"""
+            SELECT {_SUPPLIER_PG_COLUMNS} FROM suppliers
+            WHERE company_name ILIKE '%' || $1 || '%' AND is_active
+            LIMIT 10
+            """,
+            query,
+        )
+        return list(map(Supplier.from_row, rows))
+
     client = get_supabase_client()
 
-    result = (
+    result = await execute_async(
         client.table(Tables.SUPPLIERS)
         .select("*")
         .ilike("company_name", f"%{query}%")
         .eq("is_active", True)
         .limit(10)
-        .execute()
     )
 
-    return [_row_to_supplier(row) for row in (result.data or [])]
+    return list(map(Supplier.from_row, result.data or []))
 
 
-async def get_all_active_suppliers() -> list[Supplier]:
+async def get_all_active_suppliers(
+    limit: Optional[int] = None,
+    after: Optional[tuple[str, int]] = None,
+) -> tuple[list[Supplier], Optional[tuple[str, int]]]:
     """
-    Get all active suppliers.
+    Get active suppliers, ordered by company name and then id.
+
+    Args:
+        limit: Maximum number of suppliers to return (all if None)
+        after: Keyset cursor returned with the previous page; only suppliers
+            after it are returned
 
     Returns:
-        List of active suppliers
+        The suppliers, and the cursor for the next page: the (company_name,
+        id) of the last supplier when the page is full, else None. Names are
+        not unique, so the id breaks ties at page boundaries.
     """
-    rows = await fetch_many(
-        Tables.SUPPLIERS,
-        filters={"is_active": True},
-        order_by="company_name",
+    client = get_supabase_client()
+    query = (
+        client.table(Tables.SUPPLIERS)
+        .select("*")
+        .eq("is_active", True)
     )
-    return [_row_to_supplier(row) for row in rows]
+    if after is not None:
+        company_name, supplier_id = after
+        company_name = quote_filter_value(company_name)
+        query = query.or_(
+            f"company_name.gt.{company_name},"
+            f"and(company_name.eq.{company_name},id.gt.{int(supplier_id)})"
+        )
+    query = query.order("company_name").order("id")
+    if limit:
+        query = query.limit(limit)
+
+    result = await execute_async(query)
+    suppliers = list(map(Supplier.from_row, result.data or []))
+
+    cursor = None
+    if limit and len(suppliers) == limit:
+        cursor = (suppliers[-1].company_name, suppliers[-1].id)
+    return suppliers, cursor
 
 
 async def check_supplier_exists(company_name: str) -> bool:
@@ -140,8 +272,19 @@ async def check_supplier_exists(company_name: str) -> bool:
     Returns:
         True if supplier exists, False otherwise
     """
-    supplier = await get_supplier_by_name(company_name)
-    return supplier is not None
+    if _get_cached_supplier(("name", company_name.lower())) is not None:
+        return True
+
+    client = get_supabase_client()
+
+    # Count only (HEAD request): no row is transferred
+    result = await execute_async(
+        client.table(Tables.SUPPLIERS)
+        .select("id", count="exact", head=True)
+        .ilike("company_name", f"%{company_name}%")
+        .limit(1)
+    )
+    return bool(result.count)
 
 
 async def create_supplier(
@@ -181,7 +324,10 @@ async def create_supplier(
     data = {k: v for k, v in data.items() if v is not None}
 
     row = await insert_one(Tables.SUPPLIERS, data)
-    return _row_to_supplier(row)
+
+    # A new supplier can change what a cached name lookup should find
+    invalidate_supplier_cache()
+    return Supplier.from_row(row)
 
 
 async def update_supplier(
@@ -203,8 +349,9 @@ async def update_supplier(
     data["updated_at"] = datetime.now().isoformat()
 
     row = await update_one(Tables.SUPPLIERS, {"id": supplier_id}, data)
+    invalidate_supplier_cache(supplier_id)
     if row:
-        return _row_to_supplier(row)
+        return Supplier.from_row(row)
     return None
 
 
@@ -220,42 +367,18 @@ async def get_suppliers_for_product(product_id: int) -> list[Supplier]:
     """
     client = get_supabase_client()
 
-    # Get supplier IDs from supplier_mapped_products
-    smp_result = (
+    # Active suppliers embedded in their product mappings, in one query
+    result = await execute_async(
         client.table(Tables.SUPPLIER_MAPPED_PRODUCTS)
-        .select("supplier_id")
+        .select("suppliers!inner(*)")
         .eq("master_list_id", product_id)
-        .execute()
+        .eq("suppliers.is_active", True)
     )
 
-    if not smp_result.data:
-        return []
-
-    supplier_ids = list(set(row["supplier_id"] for row in smp_result.data))
-
-    # Get supplier details
-    suppliers_result = (
-        client.table(Tables.SUPPLIERS)
-        .select("*")
-        .in_("id", supplier_ids)
-        .eq("is_active", True)
-        .execute()
-    )
-
-    return [_row_to_supplier(row) for row in (suppliers_result.data or [])]
-
-
-def _row_to_supplier(row: dict) -> Supplier:
-    """Convert a database row to a Supplier object."""
-    return Supplier(
-        id=row["id"],
-        company_name=row["company_name"],
-        contact_person=row.get("contact_person"),
-        phone=row.get("phone"),
-        email=row.get("email"),
-        cnpj=row.get("cnpj"),
-        address=row.get("address"),
-        is_active=row.get("is_active", True),
-        reliability_score=row.get("reliability_score"),
-        response_time_avg=row.get("response_time_avg"),
-    )
+    # A supplier can map the same product more than once
+    suppliers = {}
+    for row in result.data or []:
+        supplier = row["suppliers"]
+        if supplier["id"] not in suppliers:
+            suppliers[supplier["id"]] = Supplier.from_row(supplier)
+    return list(suppliers.values())
@@ -7,18 +7,24 @@ Runs periodic tasks for the procurement agent:
 - Overdue delivery tracking
 - Post-delivery feedback collection
 - Weekly preference drip questions
+- Nightly engagement score recalculation
+
+Checks that fire in the same window run together as one "sweep": their
+queries share a single Supabase client and run concurrently, and the
+restaurant chat ID lookup is done once for the whole sweep.
 
 Sends notifications via Telegram.
 """
 
+import asyncio
 import logging
 from datetime import datetime, timedelta
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from apscheduler.triggers.interval import IntervalTrigger
 
 from frepi_agent.config import get_config
+from frepi_agent.shared.engagement_scoring import recalculate_engagement_bulk
 from frepi_agent.shared.supabase_client import (
     get_supabase_client,
     fetch_many,
@@ -39,39 +45,43 @@ def init_heartbeat(telegram_bot):
 
     _scheduler = AsyncIOScheduler(timezone="America/Sao_Paulo")
 
-    # Job 1: Stale price alerts - daily at 8am BRT
+    # Morning sweep: stale prices + unconfirmed orders + overdue deliveries - daily at 8am BRT
     _scheduler.add_job(
-        _check_stale_prices,
+        _combined_sweep,
         CronTrigger(hour=8, timezone="America/Sao_Paulo"),
-        id="stale_prices",
-        name="Stale Price Check",
+        args=[["stale_prices", "unconfirmed_orders", "overdue_deliveries"]],
+        id="morning_sweep",
+        name="Morning Sweep",
     )
 
-    # Job 2: Unconfirmed orders - every 2 hours, 8am-8pm BRT
+    # Unconfirmed orders - every 2 hours after the morning sweep, until 8pm BRT
     _scheduler.add_job(
-        _check_unconfirmed_orders,
-        IntervalTrigger(hours=2),
+        _combined_sweep,
+        CronTrigger(hour="10-20/2", timezone="America/Sao_Paulo"),
+        args=[["unconfirmed_orders"]],
         id="unconfirmed_orders",
         name="Unconfirmed Order Check",
     )
 
-    # Job 3: Overdue deliveries - every 4 hours, 7am-9pm BRT
+    # Overdue deliveries - every 4 hours after the morning sweep, until 8pm BRT
     _scheduler.add_job(
-        _check_overdue_deliveries,
-        IntervalTrigger(hours=4),
+        _combined_sweep,
+        CronTrigger(hour="12-20/4", timezone="America/Sao_Paulo"),
+        args=[["overdue_deliveries"]],
         id="overdue_deliveries",
         name="Overdue Delivery Check",
     )
 
-    # Job 4: Delivery feedback - daily at 5pm BRT
+    # Delivery feedback - daily at 5pm BRT
     _scheduler.add_job(
-        _request_delivery_feedback,
+        _combined_sweep,
         CronTrigger(hour=17, timezone="America/Sao_Paulo"),
+        args=[["delivery_feedback"]],
         id="delivery_feedback",
         name="Delivery Feedback Request",
     )
 
-    # Job 5: Preference drip - weekly Monday 9am BRT
+    # Preference drip - weekly Monday 9am BRT
     _scheduler.add_job(
         _drip_preference_reminder,
         CronTrigger(day_of_week="mon", hour=9, timezone="America/Sao_Paulo"),
@@ -79,8 +89,17 @@ def init_heartbeat(telegram_bot):
         name="Preference Drip Reminder",
     )
 
+    # Engagement rescoring - nightly at 3am BRT, also covering restaurants
+    # that no drip response has rescored since their counters last changed
+    _scheduler.add_job(
+        _recalculate_engagement,
+        CronTrigger(hour=3, timezone="America/Sao_Paulo"),
+        id="engagement_recalculation",
+        name="Engagement Recalculation",
+    )
+
     _scheduler.start()
-    logger.info("Heartbeat scheduler started with 5 jobs")
+    logger.info("Heartbeat scheduler started with 6 jobs")
 
 
 def stop_heartbeat():
@@ -99,13 +118,16 @@ async def _get_restaurant_chat_ids() -> dict[int, list[str]]:
     Returns:
         dict mapping restaurant_id -> list of chat_id strings
     """
-    people = await fetch_many(Tables.RESTAURANT_PEOPLE)
+    people = await fetch_many(
+        Tables.RESTAURANT_PEOPLE, columns="restaurant_id, whatsapp_number"
+    )
     result: dict[int, list[str]] = {}
+    setdefault = result.setdefault
     for person in people:
         rid = person.get("restaurant_id")
         chat_id = person.get("whatsapp_number")  # stores Telegram chat_id as string
         if rid and chat_id:
-            result.setdefault(rid, []).append(chat_id)
+            setdefault(rid, []).append(chat_id)
     return result
 
 
@@ -124,318 +146,321 @@ async def _send_telegram_message(chat_id, message: str):
         logger.warning(f"No Telegram bot configured for heartbeat message to {chat_id}")
 
 
-async def _check_stale_prices():
-    """Job 1: Alert restaurants about products with outdated pricing (>30 days)."""
-    try:
-        config = get_config()
-        freshness_days = config.price_freshness_days
-        client = get_supabase_client()
+async def _combined_sweep(jobs: list[str]):
+    """
+    Run several checks as one sweep.
 
-        # Get all current prices (end_date IS NULL)
-        pricing_result = (
-            client.table(Tables.PRICING_HISTORY)
-            .select("id, effective_date, supplier_mapped_product_id")
-            .is_("end_date", "null")
-            .execute()
-        )
+    All checks share one Supabase client and run their queries concurrently;
+    the restaurant chat ID lookup is fetched once and reused by every check.
 
-        if not pricing_result.data:
-            return
+    Args:
+        jobs: Check names to run (keys of _SWEEP_CHECKS)
+    """
+    client = get_supabase_client()
+    now = datetime.now()
+    checks = [_SWEEP_CHECKS[job] for job in jobs]
 
-        now = datetime.now()
-        stale_smp_ids = []
+    chat_ids_map, *outcomes = await asyncio.gather(
+        _get_restaurant_chat_ids(),
+        *(asyncio.to_thread(collect, client, now) for collect, _ in checks),
+        return_exceptions=True,
+    )
 
-        for price in pricing_result.data:
-            effective = datetime.fromisoformat(
-                price["effective_date"].replace("Z", "+00:00")
-            ).replace(tzinfo=None)
-            days_old = (now - effective).days
-            if days_old > freshness_days:
-                stale_smp_ids.append(price["supplier_mapped_product_id"])
+    if isinstance(chat_ids_map, Exception):
+        logger.error(f"Error loading restaurant chat IDs for sweep {jobs}: {chat_ids_map}")
+        return
 
-        if not stale_smp_ids:
-            return
+    for (_, label), outcome in zip(checks, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"Error in {label.lower()}: {outcome}")
+            continue
 
-        # Get product names for stale prices
-        smp_result = (
-            client.table(Tables.SUPPLIER_MAPPED_PRODUCTS)
-            .select("id, master_list_id, supplier_id")
-            .in_("id", stale_smp_ids)
-            .execute()
-        )
+        for rid, messages in outcome.items():
+            for chat_id in chat_ids_map.get(rid, []):
+                for message in messages:
+                    await _send_telegram_message(chat_id, message)
 
-        if not smp_result.data:
-            return
+        logger.info(f"{label} complete: {len(outcome)} restaurants notified")
 
-        ml_ids = list(set(row["master_list_id"] for row in smp_result.data))
-        ml_result = (
-            client.table(Tables.MASTER_LIST)
-            .select("id, product_name, restaurant_id")
-            .in_("id", ml_ids)
-            .execute()
-        )
 
-        if not ml_result.data:
-            return
+def _collect_stale_prices(client, now: datetime) -> dict[int, list[str]]:
+    """Check 1: Alert restaurants about products with outdated pricing (>30 days)."""
+    freshness_days = get_config().price_freshness_days
+    # A price is stale once it is more than freshness_days whole days old
+    stale_before = now - timedelta(days=freshness_days + 1)
+    parse_date = datetime.fromisoformat
 
-        # Group stale products by restaurant
-        ml_map = {row["id"]: row for row in ml_result.data}
-        stale_by_restaurant: dict[int, list[str]] = {}
+    # Get all current prices (end_date IS NULL)
+    pricing_result = (
+        client.table(Tables.PRICING_HISTORY)
+        .select("id, effective_date, supplier_mapped_product_id")
+        .is_("end_date", "null")
+        .execute()
+    )
 
-        for smp in smp_result.data:
-            ml = ml_map.get(smp["master_list_id"])
-            if ml:
-                rid = ml["restaurant_id"]
-                product_name = ml["product_name"]
-                stale_by_restaurant.setdefault(rid, []).append(product_name)
+    if not pricing_result.data:
+        return {}
 
-        # Send alerts
-        chat_ids_map = await _get_restaurant_chat_ids()
+    stale_smp_ids = []
+    add_stale = stale_smp_ids.append
 
-        for rid, products in stale_by_restaurant.items():
-            chat_ids = chat_ids_map.get(rid, [])
-            if not chat_ids:
-                continue
+    for price in pricing_result.data:
+        effective = parse_date(
+            price["effective_date"].replace("Z", "+00:00")
+        ).replace(tzinfo=None)
+        if effective <= stale_before:
+            add_stale(price["supplier_mapped_product_id"])
 
-            unique_products = sorted(set(products))[:10]  # Cap at 10
-            product_list = "\n".join(f"  • {p}" for p in unique_products)
-            extra = ""
-            if len(set(products)) > 10:
-                extra = f"\n  ... e mais {len(set(products)) - 10} produtos"
-
-            message = (
-                f"⚠️ *Alerta de Preços Desatualizados*\n\n"
-                f"{len(set(products))} produto(s) com preços há mais de {freshness_days} dias:\n\n"
-                f"{product_list}{extra}\n\n"
-                f"Digite 2️⃣ para atualizar preços."
-            )
+    if not stale_smp_ids:
+        return {}
 
-            for chat_id in chat_ids:
-                await _send_telegram_message(chat_id, message)
+    # Get product names for stale prices
+    smp_result = (
+        client.table(Tables.SUPPLIER_MAPPED_PRODUCTS)
+        .select("id, master_list_id, supplier_id")
+        .in_("id", stale_smp_ids)
+        .execute()
+    )
 
-        logger.info(f"Stale price check complete: {len(stale_by_restaurant)} restaurants alerted")
+    if not smp_result.data:
+        return {}
 
-    except Exception as e:
-        logger.error(f"Error in stale price check: {e}")
+    ml_ids = list(set(row["master_list_id"] for row in smp_result.data))
+    ml_result = (
+        client.table(Tables.MASTER_LIST)
+        .select("id, product_name, restaurant_id")
+        .in_("id", ml_ids)
+        .execute()
+    )
 
+    if not ml_result.data:
+        return {}
 
-async def _check_unconfirmed_orders():
-    """Job 2: Remind restaurants about orders sent >24h ago without supplier confirmation."""
-    now = datetime.now()
-    if now.hour < 8 or now.hour > 20:
-        return  # Only during business hours
+    # Group stale products by restaurant
+    ml_map = {row["id"]: row for row in ml_result.data}
+    stale_by_restaurant: dict[int, list[str]] = {}
 
-    try:
-        client = get_supabase_client()
-        cutoff = (now - timedelta(hours=24)).isoformat()
-
-        # Get orders that are still 'sent' and older than 24h
-        orders_result = (
-            client.table(Tables.PURCHASE_ORDERS)
-            .select("id, restaurant_id, supplier_id, created_at, order_summary")
-            .eq("status", "sent")
-            .lt("created_at", cutoff)
-            .execute()
-        )
+    for smp in smp_result.data:
+        ml = ml_map.get(smp["master_list_id"])
+        if ml:
+            rid = ml["restaurant_id"]
+            product_name = ml["product_name"]
+            stale_by_restaurant.setdefault(rid, []).append(product_name)
 
-        if not orders_result.data:
-            return
+    messages: dict[int, list[str]] = {}
 
-        # Get supplier names
-        supplier_ids = list(set(o["supplier_id"] for o in orders_result.data if o.get("supplier_id")))
-        suppliers_map = {}
-        if supplier_ids:
-            suppliers_result = (
-                client.table(Tables.SUPPLIERS)
-                .select("id, company_name")
-                .in_("id", supplier_ids)
-                .execute()
-            )
-            suppliers_map = {s["id"]: s["company_name"] for s in (suppliers_result.data or [])}
+    for rid, products in stale_by_restaurant.items():
+        unique_products = sorted(set(products))[:10]  # Cap at 10
+        product_list = "\n".join(f"  • {p}" for p in unique_products)
+        extra = ""
+        if len(set(products)) > 10:
+            extra = f"\n  ... e mais {len(set(products)) - 10} produtos"
 
-        # Group by restaurant
-        by_restaurant: dict[int, list[dict]] = {}
-        for order in orders_result.data:
-            rid = order.get("restaurant_id")
-            if rid:
-                by_restaurant.setdefault(rid, []).append(order)
+        messages[rid] = [
+            f"⚠️ *Alerta de Preços Desatualizados*\n\n"
+            f"{len(set(products))} produto(s) com preços há mais de {freshness_days} dias:\n\n"
+            f"{product_list}{extra}\n\n"
+            f"Digite 2️⃣ para atualizar preços."
+        ]
 
-        chat_ids_map = await _get_restaurant_chat_ids()
+    return messages
 
-        for rid, orders in by_restaurant.items():
-            chat_ids = chat_ids_map.get(rid, [])
-            if not chat_ids:
-                continue
 
-            order_lines = []
-            for o in orders[:5]:  # Cap at 5
-                supplier_name = suppliers_map.get(o.get("supplier_id"), "Fornecedor")
-                order_lines.append(f"  • Pedido #{o['id']} — {supplier_name}")
-
-            order_list = "\n".join(order_lines)
-            extra = ""
-            if len(orders) > 5:
-                extra = f"\n  ... e mais {len(orders) - 5} pedido(s)"
-
-            message = (
-                f"🔔 *Pedidos Sem Confirmação*\n\n"
-                f"{len(orders)} pedido(s) enviados há mais de 24h sem confirmação:\n\n"
-                f"{order_list}{extra}\n\n"
-                f"Considere entrar em contato com o fornecedor."
-            )
+def _collect_unconfirmed_orders(client, now: datetime) -> dict[int, list[str]]:
+    """Check 2: Remind restaurants about orders sent >24h ago without supplier confirmation."""
+    if now.hour < 8 or now.hour > 20:
+        return {}  # Only during business hours
 
-            for chat_id in chat_ids:
-                await _send_telegram_message(chat_id, message)
+    cutoff = (now - timedelta(hours=24)).isoformat()
 
-        logger.info(f"Unconfirmed order check complete: {len(by_restaurant)} restaurants notified")
+    # Get orders that are still 'sent' and older than 24h
+    orders_result = (
+        client.table(Tables.PURCHASE_ORDERS)
+        .select("id, restaurant_id, supplier_id, created_at, order_summary")
+        .eq("status", "sent")
+        .lt("created_at", cutoff)
+        .execute()
+    )
 
-    except Exception as e:
-        logger.error(f"Error in unconfirmed order check: {e}")
+    if not orders_result.data:
+        return {}
+
+    # Get supplier names
+    supplier_ids = list(set(o["supplier_id"] for o in orders_result.data if o.get("supplier_id")))
+    suppliers_map = {}
+    if supplier_ids:
+        suppliers_result = (
+            client.table(Tables.SUPPLIERS)
+            .select("id, company_name")
+            .in_("id", supplier_ids)
+            .execute()
+        )
+        suppliers_map = {s["id"]: s["company_name"] for s in (suppliers_result.data or [])}
 
+    # Group by restaurant
+    by_restaurant: dict[int, list[dict]] = {}
+    for order in orders_result.data:
+        rid = order.get("restaurant_id")
+        if rid:
+            by_restaurant.setdefault(rid, []).append(order)
 
-async def _check_overdue_deliveries():
-    """Job 3: Alert restaurants about confirmed orders past expected delivery date."""
-    now = datetime.now()
-    if now.hour < 7 or now.hour > 21:
-        return  # Only during business hours
+    messages: dict[int, list[str]] = {}
 
-    try:
-        client = get_supabase_client()
-        today = now.date().isoformat()
-
-        # Get confirmed orders with past expected delivery date
-        orders_result = (
-            client.table(Tables.PURCHASE_ORDERS)
-            .select("id, restaurant_id, supplier_id, expected_delivery_date, order_summary")
-            .eq("status", "confirmed")
-            .lt("expected_delivery_date", today)
-            .execute()
-        )
+    for rid, orders in by_restaurant.items():
+        order_lines = []
+        for o in orders[:5]:  # Cap at 5
+            supplier_name = suppliers_map.get(o.get("supplier_id"), "Fornecedor")
+            order_lines.append(f"  • Pedido #{o['id']} — {supplier_name}")
 
-        if not orders_result.data:
-            return
+        order_list = "\n".join(order_lines)
+        extra = ""
+        if len(orders) > 5:
+            extra = f"\n  ... e mais {len(orders) - 5} pedido(s)"
 
-        # Get supplier info (name + phone for follow-up)
-        supplier_ids = list(set(o["supplier_id"] for o in orders_result.data if o.get("supplier_id")))
-        suppliers_map = {}
-        if supplier_ids:
-            suppliers_result = (
-                client.table(Tables.SUPPLIERS)
-                .select("id, company_name, contact_phone")
-                .in_("id", supplier_ids)
-                .execute()
-            )
-            suppliers_map = {s["id"]: s for s in (suppliers_result.data or [])}
+        messages[rid] = [
+            f"🔔 *Pedidos Sem Confirmação*\n\n"
+            f"{len(orders)} pedido(s) enviados há mais de 24h sem confirmação:\n\n"
+            f"{order_list}{extra}\n\n"
+            f"Considere entrar em contato com o fornecedor."
+        ]
 
-        # Group by restaurant
-        by_restaurant: dict[int, list[dict]] = {}
-        for order in orders_result.data:
-            rid = order.get("restaurant_id")
-            if rid:
-                by_restaurant.setdefault(rid, []).append(order)
+    return messages
 
-        chat_ids_map = await _get_restaurant_chat_ids()
 
-        for rid, orders in by_restaurant.items():
-            chat_ids = chat_ids_map.get(rid, [])
-            if not chat_ids:
-                continue
+def _collect_overdue_deliveries(client, now: datetime) -> dict[int, list[str]]:
+    """Check 3: Alert restaurants about confirmed orders past expected delivery date."""
+    if now.hour < 7 or now.hour > 21:
+        return {}  # Only during business hours
 
-            order_lines = []
-            for o in orders[:5]:
-                supplier = suppliers_map.get(o.get("supplier_id"), {})
-                supplier_name = supplier.get("company_name", "Fornecedor")
-                phone = supplier.get("contact_phone", "")
-                phone_info = f" ({phone})" if phone else ""
-                order_lines.append(
-                    f"  • Pedido #{o['id']} — {supplier_name}{phone_info}"
-                )
+    today = now.date().isoformat()
 
-            order_list = "\n".join(order_lines)
+    # Get confirmed orders with past expected delivery date
+    orders_result = (
+        client.table(Tables.PURCHASE_ORDERS)
+        .select("id, restaurant_id, supplier_id, expected_delivery_date, order_summary")
+        .eq("status", "confirmed")
+        .lt("expected_delivery_date", today)
+        .execute()
+    )
 
-            message = (
-                f"🚨 *Entregas Atrasadas*\n\n"
-                f"{len(orders)} entrega(s) com data prevista já passada:\n\n"
-                f"{order_list}\n\n"
-                f"Entre em contato com os fornecedores para atualização."
+    if not orders_result.data:
+        return {}
+
+    # Get supplier info (name + phone for follow-up)
+    supplier_ids = list(set(o["supplier_id"] for o in orders_result.data if o.get("supplier_id")))
+    suppliers_map = {}
+    if supplier_ids:
+        suppliers_result = (
+            client.table(Tables.SUPPLIERS)
+            .select("id, company_name, contact_phone")
+            .in_("id", supplier_ids)
+            .execute()
+        )
+        suppliers_map = {s["id"]: s for s in (suppliers_result.data or [])}
+
+    # Group by restaurant
+    by_restaurant: dict[int, list[dict]] = {}
+    for order in orders_result.data:
+        rid = order.get("restaurant_id")
+        if rid:
+            by_restaurant.setdefault(rid, []).append(order)
+
+    messages: dict[int, list[str]] = {}
+
+    for rid, orders in by_restaurant.items():
+        order_lines = []
+        for o in orders[:5]:
+            supplier = suppliers_map.get(o.get("supplier_id"), {})
+            supplier_name = supplier.get("company_name", "Fornecedor")
+            phone = supplier.get("contact_phone", "")
+            phone_info = f" ({phone})" if phone else ""
+            order_lines.append(
+                f"  • Pedido #{o['id']} — {supplier_name}{phone_info}"
             )
 
-            for chat_id in chat_ids:
-                await _send_telegram_message(chat_id, message)
+        order_list = "\n".join(order_lines)
 
-        logger.info(f"Overdue delivery check complete: {len(by_restaurant)} restaurants notified")
+        messages[rid] = [
+            f"🚨 *Entregas Atrasadas*\n\n"
+            f"{len(orders)} entrega(s) com data prevista já passada:\n\n"
+            f"{order_list}\n\n"
+            f"Entre em contato com os fornecedores para atualização."
+        ]
 
-    except Exception as e:
-        logger.error(f"Error in overdue delivery check: {e}")
+    return messages
 
 
-async def _request_delivery_feedback():
-    """Job 4: Ask for quality/delivery rating on recent deliveries (learning loop A1)."""
-    try:
-        client = get_supabase_client()
-        now = datetime.now()
-        cutoff = (now - timedelta(hours=48)).isoformat()
-
-        # Get delivered orders without quality rating, delivered within last 48h
-        orders_result = (
-            client.table(Tables.PURCHASE_ORDERS)
-            .select("id, restaurant_id, supplier_id, delivered_at")
-            .eq("status", "delivered")
-            .is_("quality_rating", "null")
-            .gt("delivered_at", cutoff)
-            .execute()
-        )
+def _collect_delivery_feedback(client, now: datetime) -> dict[int, list[str]]:
+    """Check 4: Ask for quality/delivery rating on recent deliveries (learning loop A1)."""
+    cutoff = (now - timedelta(hours=48)).isoformat()
 
-        if not orders_result.data:
-            return
+    # Get delivered orders without quality rating, delivered within last 48h
+    orders_result = (
+        client.table(Tables.PURCHASE_ORDERS)
+        .select("id, restaurant_id, supplier_id, delivered_at")
+        .eq("status", "delivered")
+        .is_("quality_rating", "null")
+        .gt("delivered_at", cutoff)
+        .execute()
+    )
 
-        # Get supplier names
-        supplier_ids = list(set(o["supplier_id"] for o in orders_result.data if o.get("supplier_id")))
-        suppliers_map = {}
-        if supplier_ids:
-            suppliers_result = (
-                client.table(Tables.SUPPLIERS)
-                .select("id, company_name")
-                .in_("id", supplier_ids)
-                .execute()
+    if not orders_result.data:
+        return {}
+
+    # Get supplier names
+    supplier_ids = list(set(o["supplier_id"] for o in orders_result.data if o.get("supplier_id")))
+    suppliers_map = {}
+    if supplier_ids:
+        suppliers_result = (
+            client.table(Tables.SUPPLIERS)
+            .select("id, company_name")
+            .in_("id", supplier_ids)
+            .execute()
+        )
+        suppliers_map = {s["id"]: s["company_name"] for s in (suppliers_result.data or [])}
+
+    # Group by restaurant
+    by_restaurant: dict[int, list[dict]] = {}
+    for order in orders_result.data:
+        rid = order.get("restaurant_id")
+        if rid:
+            by_restaurant.setdefault(rid, []).append(order)
+
+    messages: dict[int, list[str]] = {}
+
+    for rid, orders in by_restaurant.items():
+        for o in orders[:3]:  # Max 3 feedback requests per day
+            supplier_name = suppliers_map.get(o.get("supplier_id"), "Fornecedor")
+            messages.setdefault(rid, []).append(
+                f"⭐ *Avaliação de Entrega*\n\n"
+                f"Como foi a entrega do pedido #{o['id']} ({supplier_name})?\n\n"
+                f"Avalie de 1 a 5:\n"
+                f"1️⃣ Péssima\n"
+                f"2️⃣ Ruim\n"
+                f"3️⃣ Regular\n"
+                f"4️⃣ Boa\n"
+                f"5️⃣ Excelente\n\n"
+                f"Responda com o número e um comentário opcional."
             )
-            suppliers_map = {s["id"]: s["company_name"] for s in (suppliers_result.data or [])}
 
-        # Group by restaurant
-        by_restaurant: dict[int, list[dict]] = {}
-        for order in orders_result.data:
-            rid = order.get("restaurant_id")
-            if rid:
-                by_restaurant.setdefault(rid, []).append(order)
+    return messages
 
-        chat_ids_map = await _get_restaurant_chat_ids()
 
-        for rid, orders in by_restaurant.items():
-            chat_ids = chat_ids_map.get(rid, [])
-            if not chat_ids:
-                continue
+# Checks that can run inside a sweep: name -> (collector, log label)
+_SWEEP_CHECKS = {
+    "stale_prices": (_collect_stale_prices, "Stale price check"),
+    "unconfirmed_orders": (_collect_unconfirmed_orders, "Unconfirmed order check"),
+    "overdue_deliveries": (_collect_overdue_deliveries, "Overdue delivery check"),
+    "delivery_feedback": (_collect_delivery_feedback, "Delivery feedback request"),
+}
 
-            for o in orders[:3]:  # Max 3 feedback requests per day
-                supplier_name = suppliers_map.get(o.get("supplier_id"), "Fornecedor")
-                message = (
-                    f"⭐ *Avaliação de Entrega*\n\n"
-                    f"Como foi a entrega do pedido #{o['id']} ({supplier_name})?\n\n"
-                    f"Avalie de 1 a 5:\n"
-                    f"1️⃣ Péssima\n"
-                    f"2️⃣ Ruim\n"
-                    f"3️⃣ Regular\n"
-                    f"4️⃣ Boa\n"
-                    f"5️⃣ Excelente\n\n"
-                    f"Responda com o número e um comentário opcional."
-                )
-
-                for chat_id in chat_ids:
-                    await _send_telegram_message(chat_id, message)
-
-        logger.info(f"Delivery feedback request complete: {len(by_restaurant)} restaurants asked")
 
+async def _recalculate_engagement():
+    """Job 6: Rescore every restaurant's engagement profile."""
+    try:
+        await asyncio.to_thread(recalculate_engagement_bulk)
     except Exception as e:
-        logger.error(f"Error in delivery feedback request: {e}")
+        logger.error(f"Error in engagement recalculation: {e}")
 
 
 async def _drip_preference_reminder():
@@ -466,6 +491,7 @@ async def _drip_preference_reminder():
                 by_restaurant[rid] = item
 
         chat_ids_map = await _get_restaurant_chat_ids()
+        sent_ids = []
 
         for rid, item in by_restaurant.items():
             chat_ids = chat_ids_map.get(rid, [])
@@ -493,10 +519,13 @@ async def _drip_preference_reminder():
             for chat_id in chat_ids:
                 await _send_telegram_message(chat_id, message)
 
-            # Mark as sent
+            sent_ids.append(item["id"])
+
+        # Mark everything sent in this run with one timestamp and one UPDATE
+        if sent_ids:
             client.table(Tables.PREFERENCE_COLLECTION_QUEUE).update(
                 {"status": "sent", "sent_at": datetime.now().isoformat()}
-            ).eq("id", item["id"]).execute()
+            ).in_("id", sent_ids).execute()
 
         logger.info(f"Preference drip complete: {len(by_restaurant)} restaurants asked")
 
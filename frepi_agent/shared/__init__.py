@@ -9,6 +9,7 @@ from .supabase_client import (
     get_supabase_client,
     reset_client,
     Tables,
+    execute_async,
     fetch_one,
     fetch_many,
     insert_one,
@@ -18,6 +19,7 @@ from .supabase_client import (
 )
 from .user_identification import (
     identify_user,
+    invalidate_user_cache,
     UserType,
     UserIdentification,
 )
@@ -27,6 +29,7 @@ __all__ = [
     "get_supabase_client",
     "reset_client",
     "Tables",
+    "execute_async",
     "fetch_one",
     "fetch_many",
     "insert_one",
@@ -35,6 +38,7 @@ __all__ = [
     "test_connection",
     # User identification
     "identify_user",
+    "invalidate_user_cache",
     "UserType",
     "UserIdentification",
 ]
@@ -0,0 +1,130 @@
+"""
+Direct Postgres connection pool for hot read paths.
+
+The Supabase REST client (supabase-py) is synchronous and pays PostgREST
+overhead on every call. For the paths that run on every inbound message
+(user identification, drip questions) we talk to Postgres directly through
+an asyncpg pool instead.
+
+The pool is opt-in: it is only created when DATABASE_URL is configured.
+Callers must fall back to the Supabase REST client when get_db_pool()
+returns None.
+"""
+
+import json
+import logging
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+import asyncpg
+
+from frepi_agent.config import get_config
+
+logger = logging.getLogger(__name__)
+
+
+_pool: Optional[asyncpg.Pool] = None
+
+# Port of Supabase's transaction-mode pooler (Supavisor/pgbouncer)
+TRANSACTION_POOLER_PORT = 6543
+
+
+def _uses_transaction_pooler(dsn: str) -> bool:
+    """Whether the DSN points at a transaction-mode pooler."""
+    return urlparse(dsn).port == TRANSACTION_POOLER_PORT
+
+
+async def _init_connection(conn: asyncpg.Connection):
+    """Decode json/jsonb columns to Python objects, like the REST client does."""
+    for type_name in ("json", "jsonb"):
+        await conn.set_type_codec(
+            type_name,
+            encoder=json.dumps,
+            decoder=json.loads,
+            schema="pg_catalog",
+        )
+
+
+async def init_db_pool() -> Optional[asyncpg.Pool]:
+    """
+    Create the global connection pool (call once at startup).
+
+    Returns:
+        The pool, or None if DATABASE_URL is not configured
+    """
+    global _pool
+    if _pool is not None:
+        return _pool
+
+    config = get_config()
+    if not config.database_url:
+        logger.info("DATABASE_URL not set, hot paths will use the Supabase REST client")
+        return None
+
+    pool_kwargs = {}
+    if _uses_transaction_pooler(config.database_url):
+        # Transaction poolers hand each transaction to a different backend, so
+        # prepared statements cached per connection vanish between queries
+        # ("prepared statement __asyncpg_stmt_N__ does not exist").
+        pool_kwargs.update(
+            statement_cache_size=0,
+            max_cached_statement_lifetime=0,
+        )
+
+    _pool = await asyncpg.create_pool(
+        config.database_url,
+        min_size=10,
+        max_size=50,
+        max_inactive_connection_lifetime=300,
+        init=_init_connection,
+        server_settings={"jit": "off"},
+        **pool_kwargs,
+    )
+    logger.info(
+        f"Postgres connection pool ready "
+        f"(transaction pooler: {bool(pool_kwargs)})"
+    )
+    return _pool
+
+
+def get_db_pool() -> Optional[asyncpg.Pool]:
+    """Get the connection pool, or None if it was not initialized."""
+    return _pool
+
+
+async def close_db_pool():
+    """Close the connection pool."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+async def fetchrow(sql: str, *args: Any) -> Optional[dict]:
+    """
+    Fetch a single row.
+
+    Args:
+        sql: Query with $1, $2, ... placeholders
+        *args: Query parameters
+
+    Returns:
+        Row as a dict, or None if no row matched
+    """
+    row = await _pool.fetchrow(sql, *args)
+    return dict(row) if row is not None else None
+
+
+async def fetch(sql: str, *args: Any) -> list[dict]:
+    """
+    Fetch all matching rows.
+
+    Args:
+        sql: Query with $1, $2, ... placeholders
+        *args: Query parameters
+
+    Returns:
+        List of rows as dicts
+    """
+    rows = await _pool.fetch(sql, *args)
+    return [dict(row) for row in rows]
@@ -49,9 +49,125 @@ def recalculate_engagement(restaurant_id: int) -> Optional[dict]:
         return None
 
     profile = result.data[0]
+    engagement = _score_profile(profile)
+    score = engagement["score"]
+    level = engagement["level"]
+    drip_per_session = engagement["drip_per_session"]
+    signals = engagement["signals"]
 
-    # Calculate each signal
+    # Update profile
+    client.table(Tables.ENGAGEMENT_PROFILE).update({
+        "engagement_score": score,
+        "engagement_level": level,
+        "drip_questions_per_session": drip_per_session,
+    }).eq("restaurant_id", restaurant_id).execute()
+
+    logger.info(
+        f"Engagement recalculated for restaurant {restaurant_id}: "
+        f"score={score}, level={level}, drip={drip_per_session} "
+        f"(depth={signals['depth']:.2f}, drip_rate={signals['drip_rate']:.2f}, "
+        f"corrections={signals['corrections']:.2f}, "
+        f"sessions={signals['session_frequency']:.2f}, "
+        f"reasoning={signals['reasoning']:.2f})"
+    )
+
+    return engagement
+
+
+# Columns _score_profile reads, plus the key the scores are written back under
+SCORING_COLUMNS = (
+    "restaurant_id, onboarding_depth, drip_questions_answered, "
+    "drip_questions_skipped, total_corrections, sessions_last_30d, "
+    "corrections_with_reason"
+)
+
+# Profiles read and written per round-trip by recalculate_engagement_bulk
+BULK_PAGE_SIZE = 500
+
+
+def recalculate_engagement_bulk() -> int:
+    """
+    Recalculate the engagement score and level for every restaurant.
+
+    Profiles are read a page at a time, scored in a single pass and written
+    back with one call per page, instead of a select + update per restaurant.
+    Only the score columns are written, so counters bumped server-side while
+    the job runs are left alone.
+
+    Returns:
+        Number of profiles updated
+    """
+    client = get_supabase_client()
+    updated = 0
+    start = 0
+
+    while True:
+        result = (
+            client.table(Tables.ENGAGEMENT_PROFILE)
+            .select(SCORING_COLUMNS)
+            .order("restaurant_id")
+            .range(start, start + BULK_PAGE_SIZE - 1)
+            .execute()
+        )
+        profiles = result.data or []
+
+        rows = []
+        for profile in profiles:
+            engagement = _score_profile(profile)
+            rows.append({
+                "restaurant_id": profile["restaurant_id"],
+                "engagement_score": engagement["score"],
+                "engagement_level": engagement["level"],
+                "drip_questions_per_session": engagement["drip_per_session"],
+            })
+
+        if rows:
+            _write_engagement_scores(client, rows)
+            updated += len(rows)
+
+        if len(profiles) < BULK_PAGE_SIZE:
+            break
+        start += BULK_PAGE_SIZE
+
+    logger.info(f"Engagement recalculated for {updated} restaurants")
+    return updated
+
+
+def _write_engagement_scores(client, rows: list[dict]):
+    """Write the score columns of a page of profiles in one call."""
+    try:
+        # This function should exist in Supabase:
+        # CREATE OR REPLACE FUNCTION set_engagement_scores(rows jsonb)
+        # RETURNS void AS $$
+        #   UPDATE engagement_profile p SET
+        #     engagement_score = r.engagement_score,
+        #     engagement_level = r.engagement_level,
+        #     drip_questions_per_session = r.drip_questions_per_session
+        #   FROM jsonb_to_recordset(rows) AS r(
+        #     restaurant_id bigint, engagement_score numeric,
+        #     engagement_level text, drip_questions_per_session int)
+        #   WHERE p.restaurant_id = r.restaurant_id;
+        # $$ LANGUAGE sql;
+        client.rpc("set_engagement_scores", {"rows": rows}).execute()
+    except Exception as e:
+        # Fallback if RPC doesn't exist: the upsert only names the score
+        # columns, so ON CONFLICT leaves every other column untouched
+        logger.warning(f"RPC set_engagement_scores failed, using fallback: {e}")
+        client.table(Tables.ENGAGEMENT_PROFILE).upsert(
+            rows, on_conflict="restaurant_id"
+        ).execute()
+
+
+def _score_profile(profile: dict) -> dict:
+    """
+    Calculate the engagement score, level and signals for a profile row.
+
+    Args:
+        profile: An engagement_profile row
 
+    Returns:
+        Dict with score, level, drip_per_session and the individual signals
+    """
     # 1. Onboarding depth signal (0.15 weight)
     depth = profile.get("onboarding_depth", 0)
     depth_signal = {0: 0.0, 5: 0.5, 10: 1.0}.get(depth, 0.0)
@@ -101,21 +217,6 @@ def recalculate_engagement(restaurant_id: int) -> Optional[dict]:
         level = "dormant"
         drip_per_session = 0
 
-    # Update profile
-    client.table(Tables.ENGAGEMENT_PROFILE).update({
-        "engagement_score": score,
-        "engagement_level": level,
-        "drip_questions_per_session": drip_per_session,
-    }).eq("restaurant_id", restaurant_id).execute()
-
-    logger.info(
-        f"Engagement recalculated for restaurant {restaurant_id}: "
-        f"score={score}, level={level}, drip={drip_per_session} "
-        f"(depth={depth_signal:.2f}, drip_rate={drip_response_rate:.2f}, "
-        f"corrections={correction_signal:.2f}, sessions={session_frequency_signal:.2f}, "
-        f"reasoning={reasoning_signal:.2f})"
-    )
-
     return {
         "score": score,
         "level": level,
@@ -4,16 +4,42 @@ Preference Drip Service - Progressive preference collection after onboarding.
 Sneaks 1-2 preference questions into normal sessions based on engagement level.
 """
 
+import asyncio
 import logging
+import threading
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import List, Optional
 
+from postgrest.exceptions import APIError
+
+from frepi_agent.shared import db_pool
 from frepi_agent.shared.supabase_client import get_supabase_client, Tables
 from frepi_agent.shared.engagement_scoring import recalculate_engagement
 
 logger = logging.getLogger(__name__)
 
+# How long an engagement profile read is reused between sessions
+PROFILE_CACHE_TTL_SECONDS = 60
+
+# Drip question message pieces (Portuguese)
+_DRIP_PREFIX = "\n\n---\n💡 **Aproveitando, uma perguntinha rápida:**\n"
+_DRIP_SUFFIX = "\n_(Pode responder ou ignorar, sem problema!)_"
+_DRIP_TEMPLATES = {
+    "brand": (
+        "Sobre **{name}**: tem marca preferida? "
+        "(ex: pode ser qualquer marca ou prefere uma específica?)"
+    ),
+    "price_max": "Sobre **{name}**: qual o preço máximo aceitável?",
+    "quality": "Sobre **{name}**: prefere premium, padrão ou econômico?",
+    "supplier": "Sobre **{name}**: tem fornecedor preferido?",
+}
+_DRIP_PRICE_KNOWN_TEMPLATE = (
+    "Sobre **{name}**: o preço médio que vi foi R$ {price}. "
+    "Qual seria o máximo aceitável?"
+)
+
 
 @dataclass
 class DripQuestion:
@@ -36,6 +62,10 @@ class PreferenceDripService:
 
     def __init__(self):
         self.client = get_supabase_client()
+        # Strong references to fire-and-forget tasks so they are not GC'd mid-run
+        self._background_tasks: set = set()
+        # restaurant_id -> (loaded_at, engagement profile)
+        self._profile_cache: dict[int, tuple[float, dict]] = {}
 
     async def get_drip_questions(self, restaurant_id: int) -> List[DripQuestion]:
         """
@@ -45,14 +75,11 @@ class PreferenceDripService:
             List of DripQuestion objects (0-2 depending on engagement)
         """
         # Load engagement profile
-        profile_result = self.client.table(Tables.ENGAGEMENT_PROFILE).select(
-            "*"
-        ).eq("restaurant_id", restaurant_id).limit(1).execute()
+        profile = await self._fetch_profile(restaurant_id)
 
-        if not profile_result.data:
+        if not profile:
             return []
 
-        profile = profile_result.data[0]
         level = profile.get("engagement_level", "low")
         drip_per_session = profile.get("drip_questions_per_session", 0)
 
@@ -65,43 +92,15 @@ class PreferenceDripService:
         if level == "high":
             tier_filter.append("mid_tail")
 
-        queue_result = self.client.table(
-            Tables.PREFERENCE_COLLECTION_QUEUE
-        ).select("*").eq(
-            "restaurant_id", restaurant_id
-        ).in_(
-            "preference_status", ["pending", "asked_drip"]
-        ).in_(
-            "importance_tier", tier_filter
-        ).order(
-            "queue_position"
-        ).limit(drip_per_session).execute()
-
-        if not queue_result.data:
-            return []
+        queue_items = await self._fetch_queue_slice(
+            restaurant_id, tier_filter, drip_per_session
+        )
 
         questions = []
-        for item in queue_result.data:
-            # Get product name from master_list
-            product_result = self.client.table(Tables.MASTER_LIST).select(
-                "id, product_name, brand"
-            ).eq("id", item["master_list_id"]).limit(1).execute()
-
-            if not product_result.data:
-                continue
-
-            product = product_result.data[0]
-
-            # Get existing preferences to know what we already have
-            prefs_result = self.client.table(
-                Tables.RESTAURANT_PRODUCT_PREFERENCES
-            ).select("*").eq(
-                "restaurant_id", restaurant_id
-            ).eq("master_list_id", item["master_list_id"]).limit(1).execute()
-
+        for item, product, pref in queue_items:
+            # Existing preferences tell us what we already have
             known_info = {}
-            if prefs_result.data:
-                pref = prefs_result.data[0]
+            if pref:
                 if pref.get("brand_preferences"):
                     known_info["brand"] = pref["brand_preferences"]
                 if pref.get("price_preference"):
@@ -109,13 +108,12 @@ class PreferenceDripService:
                 if pref.get("quality_preference"):
                     known_info["quality"] = pref["quality_preference"]
 
-            # Determine what to ask about
-            pending = item.get("preferences_pending", [])
-            if not pending:
-                pending = ["brand", "price_max", "quality", "supplier"]
-
-            # Pick first pending preference type
-            pref_type = pending[0] if pending else "brand"
+            # Ask about the first pending preference type (brand if none are
+            # pending). The SQL path computes this server-side.
+            pref_type = item.get("next_pending_pref")
+            if pref_type is None:
+                pending = item.get("preferences_pending") or []
+                pref_type = pending[0] if pending else "brand"
 
             questions.append(DripQuestion(
                 product_name=product["product_name"],
@@ -126,16 +124,232 @@ class PreferenceDripService:
                 known_info=known_info,
             ))
 
-            # Mark as asked
-            now = datetime.now(timezone.utc).isoformat()
-            self.client.table(Tables.PREFERENCE_COLLECTION_QUEUE).update({
-                "preference_status": "asked_drip",
-                "asked_count": item.get("asked_count", 0) + 1,
-                "last_asked_at": now,
-            }).eq("id", item["id"]).execute()
+        if queue_items:
+            await asyncio.to_thread(
+                self._mark_asked, [item for item, _, _ in queue_items]
+            )
 
         return questions
 
+    def _mark_asked(self, items: List[dict]):
+        """Mark queue items as asked in one write, bumping their asked_count."""
+        try:
+            # This function should exist in Supabase:
+            # CREATE OR REPLACE FUNCTION mark_drip_asked(p_ids bigint[])
+            # RETURNS void AS $$
+            #   UPDATE preference_collection_queue
+            #   SET preference_status = 'asked_drip',
+            #       asked_count = COALESCE(asked_count, 0) + 1,
+            #       last_asked_at = now()
+            #   WHERE id = ANY(p_ids);
+            # $$ LANGUAGE sql;
+            self.client.rpc("mark_drip_asked", {
+                "p_ids": [item["id"] for item in items],
+            }).execute()
+        except Exception as e:
+            # Fallback if RPC doesn't exist
+            logger.warning(f"RPC mark_drip_asked failed, using fallback: {e}")
+            now = datetime.now(timezone.utc).isoformat()
+            for item in items:
+                self.client.table(Tables.PREFERENCE_COLLECTION_QUEUE).update({
+                    "preference_status": "asked_drip",
+                    "asked_count": (item.get("asked_count") or 0) + 1,
+                    "last_asked_at": now,
+                }).eq("id", item["id"]).execute()
+
+    async def _fetch_profile(self, restaurant_id: int) -> Optional[dict]:
+        """Load the engagement profile, cached for PROFILE_CACHE_TTL_SECONDS."""
+        now = time.monotonic()
+        cached = self._profile_cache.get(restaurant_id)
+        if cached and now - cached[0] < PROFILE_CACHE_TTL_SECONDS:
+            return cached[1]
+
+        profile = await self._load_profile(restaurant_id)
+        if profile:
+            self._profile_cache[restaurant_id] = (now, profile)
+        return profile
+
+    async def _load_profile(self, restaurant_id: int) -> Optional[dict]:
+        """Load the engagement profile, via the Postgres pool when available."""
+        if db_pool.get_db_pool() is not None:
+            return await db_pool.fetchrow(
+                """
+                SELECT engagement_level, drip_questions_per_session
+                FROM engagement_profile
+                WHERE restaurant_id = $1
+                LIMIT 1
+                """,
+                restaurant_id,
+            )
+
+        profile_result = await asyncio.to_thread(
+            self.client.table(Tables.ENGAGEMENT_PROFILE).select(
+                "*"
+            ).eq("restaurant_id", restaurant_id).limit(1).execute
+        )
+        return profile_result.data[0] if profile_result.data else None
+
+    async def _fetch_queue_slice(
+        self, restaurant_id: int, tier_filter: List[str], limit: int
+    ) -> List[tuple]:
+        """
+        Fetch the next pending queue items with their product and existing preference.
+
+        Uses one query through the Postgres pool when available, otherwise a
+        single PostgREST request that embeds master_list and the restaurant's
+        product preferences. Falls back to separate batched queries if the
+        embedded select is rejected (e.g. missing FK).
+
+        Returns:
+            List of (queue_item, product, preference_or_None) tuples
+        """
+        # All variants filter by restaurant and status, order by queue_position
+        # and take the first few rows. This index should exist in Supabase so
+        # the scan walks rows already in queue order and stops at the limit,
+        # without a sort step or heap fetches for these columns:
+        #
+        # CREATE INDEX preference_collection_queue_drip_idx
+        #   ON preference_collection_queue (restaurant_id, queue_position)
+        #   INCLUDE (importance_tier, master_list_id, asked_count, preferences_pending)
+        #   WHERE preference_status IN ('pending', 'asked_drip');
+        #
+        # importance_tier is an INCLUDE column rather than a key column: with
+        # an IN list on a key column before queue_position, Postgres would have
+        # to sort the merged ranges again.
+        if db_pool.get_db_pool() is not None:
+            return await self._fetch_queue_slice_pg(restaurant_id, tier_filter, limit)
+
+        try:
+            result = await asyncio.to_thread(self.client.table(
+                Tables.PREFERENCE_COLLECTION_QUEUE
+            ).select(
+                "id, master_list_id, queue_position, importance_tier, "
+                "preferences_pending, asked_count, "
+                "master_list!inner(id, product_name, brand, "
+                "restaurant_product_preferences(restaurant_id, brand_preferences, "
+                "price_preference, quality_preference))"
+            ).eq(
+                "restaurant_id", restaurant_id
+            ).eq(
+                "master_list.restaurant_product_preferences.restaurant_id", restaurant_id
+            ).in_(
+                "preference_status", ["pending", "asked_drip"]
+            ).in_(
+                "importance_tier", tier_filter
+            ).order(
+                "queue_position"
+            ).limit(limit).execute)
+        except APIError as e:
+            logger.warning(f"Embedded drip queue query failed, using fallback: {e}")
+            return await self._fetch_queue_slice_fallback(
+                restaurant_id, tier_filter, limit
+            )
+
+        items = []
+        for item in result.data or []:
+            product = item.pop("master_list")
+            prefs = product.pop("restaurant_product_preferences", None) or []
+            items.append((item, product, prefs[0] if prefs else None))
+        return items
+
+    async def _fetch_queue_slice_pg(
+        self, restaurant_id: int, tier_filter: List[str], limit: int
+    ) -> List[tuple]:
+        """Fetch the queue slice with product and preference in one SQL query."""
+        rows = await db_pool.fetch(
+            """
+            SELECT q.id, q.master_list_id, q.queue_position, q.importance_tier,
+                   COALESCE(q.preferences_pending[1], 'brand') AS next_pending_pref,
+                   q.asked_count,
+                   ml.product_name, ml.brand,
+                   p.id AS preference_id, p.brand_preferences,
+                   p.price_preference, p.quality_preference
+            FROM preference_collection_queue q
+            JOIN master_list ml ON ml.id = q.master_list_id
+            LEFT JOIN LATERAL (
+                SELECT id, brand_preferences, price_preference, quality_preference
+                FROM restaurant_product_preferences
+                WHERE restaurant_id = q.restaurant_id
+                  AND master_list_id = q.master_list_id
+                LIMIT 1
+            ) p ON true
+            WHERE q.restaurant_id = $1
+              AND q.preference_status = ANY($2::text[])
+              AND q.importance_tier = ANY($3::text[])
+            ORDER BY q.queue_position
+            LIMIT $4
+            """,
+            restaurant_id,
+            ["pending", "asked_drip"],
+            tier_filter,
+            limit,
+        )
+
+        items = []
+        for row in rows:
+            product = {
+                "id": row["master_list_id"],
+                "product_name": row.pop("product_name"),
+                "brand": row.pop("brand"),
+            }
+            pref = {
+                "brand_preferences": row.pop("brand_preferences"),
+                "price_preference": row.pop("price_preference"),
+                "quality_preference": row.pop("quality_preference"),
+            }
+            has_pref = row.pop("preference_id") is not None
+            items.append((row, product, pref if has_pref else None))
+        return items
+
+    async def _fetch_queue_slice_fallback(
+        self, restaurant_id: int, tier_filter: List[str], limit: int
+    ) -> List[tuple]:
+        """Fetch the queue slice, then its products and preferences concurrently."""
+        queue_result = await asyncio.to_thread(self.client.table(
+            Tables.PREFERENCE_COLLECTION_QUEUE
+        ).select("*").eq(
+            "restaurant_id", restaurant_id
+        ).in_(
+            "preference_status", ["pending", "asked_drip"]
+        ).in_(
+            "importance_tier", tier_filter
+        ).order(
+            "queue_position"
+        ).limit(limit).execute)
+
+        if not queue_result.data:
+            return []
+
+        # Fetch products and existing preferences for all queue items at once
+        # (one query per table instead of two per item)
+        master_list_ids = [item["master_list_id"] for item in queue_result.data]
+
+        products_result, prefs_result = await asyncio.gather(
+            asyncio.to_thread(
+                self.client.table(Tables.MASTER_LIST).select(
+                    "id, product_name, brand"
+                ).in_("id", master_list_ids).execute
+            ),
+            asyncio.to_thread(
+                self.client.table(
+                    Tables.RESTAURANT_PRODUCT_PREFERENCES
+                ).select("*").eq(
+                    "restaurant_id", restaurant_id
+                ).in_("master_list_id", master_list_ids).execute
+            ),
+        )
+        products = {row["id"]: row for row in products_result.data or []}
+        prefs = {}
+        for row in prefs_result.data or []:
+            prefs.setdefault(row["master_list_id"], row)
+
+        items = []
+        for item in queue_result.data:
+            product = products.get(item["master_list_id"])
+            if product:
+                items.append((item, product, prefs.get(item["master_list_id"])))
+        return items
+
     async def record_drip_response(
         self,
         restaurant_id: int,
@@ -154,6 +368,113 @@ class PreferenceDripService:
             value: The user's answer (None if skipped)
             skipped: Whether the user skipped
         """
+        try:
+            # Saves the preference, updates the queue item and bumps the
+            # engagement counters in one transaction. This function should
+            # exist in Supabase (restaurant_product_preferences needs a unique
+            # index on (restaurant_id, master_list_id)):
+            #
+            # CREATE OR REPLACE FUNCTION record_drip_response_v1(
+            #   p_restaurant_id bigint, p_master_list_id bigint,
+            #   p_pref_type text, p_value text, p_skipped boolean
+            # ) RETURNS void AS $$
+            # BEGIN
+            #   IF NOT p_skipped AND p_value <> ''
+            #      AND p_pref_type IN ('brand', 'price_max', 'quality') THEN
+            #     INSERT INTO restaurant_product_preferences
+            #       (restaurant_id, master_list_id, is_active)
+            #     VALUES (p_restaurant_id, p_master_list_id, true)
+            #     ON CONFLICT (restaurant_id, master_list_id) DO NOTHING;
+            #
+            #     UPDATE restaurant_product_preferences SET
+            #       brand_preferences = CASE WHEN p_pref_type = 'brand'
+            #         THEN jsonb_build_object('brand', p_value) ELSE brand_preferences END,
+            #       brand_preferences_source = CASE WHEN p_pref_type = 'brand'
+            #         THEN 'drip' ELSE brand_preferences_source END,
+            #       brand_preferences_added_at = CASE WHEN p_pref_type = 'brand'
+            #         THEN now() ELSE brand_preferences_added_at END,
+            #       price_preference = CASE WHEN p_pref_type = 'price_max'
+            #         THEN p_value ELSE price_preference END,
+            #       price_preference_source = CASE WHEN p_pref_type = 'price_max'
+            #         THEN 'drip' ELSE price_preference_source END,
+            #       price_preference_added_at = CASE WHEN p_pref_type = 'price_max'
+            #         THEN now() ELSE price_preference_added_at END,
+            #       quality_preference = CASE WHEN p_pref_type = 'quality'
+            #         THEN jsonb_build_object('quality', p_value) ELSE quality_preference END,
+            #       quality_preference_source = CASE WHEN p_pref_type = 'quality'
+            #         THEN 'drip' ELSE quality_preference_source END,
+            #       quality_preference_added_at = CASE WHEN p_pref_type = 'quality'
+            #         THEN now() ELSE quality_preference_added_at END
+            #     WHERE restaurant_id = p_restaurant_id
+            #       AND master_list_id = p_master_list_id;
+            #   END IF;
+            #
+            #   UPDATE preference_collection_queue SET
+            #     preferences_collected = CASE
+            #       WHEN p_skipped OR p_pref_type = ANY(coalesce(preferences_collected, '{}'))
+            #       THEN preferences_collected
+            #       ELSE array_append(coalesce(preferences_collected, '{}'), p_pref_type) END,
+            #     preferences_pending = CASE WHEN p_skipped THEN preferences_pending
+            #       ELSE array_remove(coalesce(preferences_pending, '{}'), p_pref_type) END,
+            #     preference_status = CASE
+            #       WHEN p_skipped THEN 'skipped'
+            #       WHEN cardinality(array_remove(coalesce(preferences_pending, '{}'), p_pref_type)) > 0
+            #       THEN 'asked_drip'
+            #       ELSE 'collected' END
+            #   WHERE restaurant_id = p_restaurant_id
+            #     AND master_list_id = p_master_list_id;
+            #
+            #   UPDATE engagement_profile SET
+            #     drip_questions_skipped = drip_questions_skipped + p_skipped::int,
+            #     drip_questions_answered = drip_questions_answered + (NOT p_skipped)::int
+            #   WHERE restaurant_id = p_restaurant_id;
+            # END;
+            # $$ LANGUAGE plpgsql;
+            await asyncio.to_thread(
+                self.client.rpc("record_drip_response_v1", {
+                    "p_restaurant_id": restaurant_id,
+                    "p_master_list_id": master_list_id,
+                    "p_pref_type": preference_type,
+                    "p_value": value,
+                    "p_skipped": skipped,
+                }).execute
+            )
+        except Exception as e:
+            # Fallback if RPC doesn't exist
+            logger.warning(f"RPC record_drip_response_v1 failed, using fallback: {e}")
+            await asyncio.to_thread(
+                self._record_drip_response_fallback,
+                restaurant_id, master_list_id, preference_type, value, skipped,
+            )
+
+        # Recalculate engagement score after drip response, in the background:
+        # the reply to the user does not depend on it
+        self._profile_cache.pop(restaurant_id, None)
+        task = asyncio.create_task(
+            asyncio.to_thread(recalculate_engagement, restaurant_id)
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(
+            lambda done: self._on_recalculate_done(done, restaurant_id)
+        )
+
+    def _on_recalculate_done(self, task: asyncio.Task, restaurant_id: int):
+        """Release a finished engagement recalculation task and log failures."""
+        self._background_tasks.discard(task)
+        # The recalculated level/drip rate must be picked up on the next read
+        self._profile_cache.pop(restaurant_id, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Failed to recalculate engagement: {task.exception()}")
+
+    def _record_drip_response_fallback(
+        self,
+        restaurant_id: int,
+        master_list_id: int,
+        preference_type: str,
+        value: Optional[str],
+        skipped: bool,
+    ):
+        """Record a drip response with individual REST calls."""
         now = datetime.now(timezone.utc).isoformat()
 
         if not skipped and value:
@@ -175,49 +496,81 @@ class PreferenceDripService:
                 pref_data["quality_preference_added_at"] = now
 
             if pref_data:
-                existing = self.client.table(
+                # INSERT ... ON CONFLICT DO UPDATE (needs the unique index on
+                # (restaurant_id, master_list_id) noted in record_drip_response)
+                pref_data["restaurant_id"] = restaurant_id
+                pref_data["master_list_id"] = master_list_id
+                pref_data["is_active"] = True
+                self.client.table(
                     Tables.RESTAURANT_PRODUCT_PREFERENCES
-                ).select("id").eq(
-                    "restaurant_id", restaurant_id
-                ).eq("master_list_id", master_list_id).limit(1).execute()
-
-                if existing.data:
-                    self.client.table(
-                        Tables.RESTAURANT_PRODUCT_PREFERENCES
-                    ).update(pref_data).eq("id", existing.data[0]["id"]).execute()
-                else:
-                    pref_data["restaurant_id"] = restaurant_id
-                    pref_data["master_list_id"] = master_list_id
-                    pref_data["is_active"] = True
-                    self.client.table(
-                        Tables.RESTAURANT_PRODUCT_PREFERENCES
-                    ).insert(pref_data).execute()
+                ).upsert(
+                    pref_data, on_conflict="restaurant_id,master_list_id"
+                ).execute()
 
         # Update queue status
-        new_status = "collected" if not skipped else "skipped"
-        queue_update = {"preference_status": new_status}
-
-        if not skipped:
-            # Move preference from pending to collected
-            queue_item = self.client.table(
-                Tables.PREFERENCE_COLLECTION_QUEUE
-            ).select("preferences_collected, preferences_pending").eq(
+        if skipped:
+            self.client.table(Tables.PREFERENCE_COLLECTION_QUEUE).update(
+                {"preference_status": "skipped"}
+            ).eq(
                 "restaurant_id", restaurant_id
-            ).eq("master_list_id", master_list_id).limit(1).execute()
-
-            if queue_item.data:
-                collected = queue_item.data[0].get("preferences_collected", [])
-                pending = queue_item.data[0].get("preferences_pending", [])
-                if preference_type not in collected:
-                    collected.append(preference_type)
-                if preference_type in pending:
-                    pending.remove(preference_type)
-                queue_update["preferences_collected"] = collected
-                queue_update["preferences_pending"] = pending
-
-                # Only mark as "collected" if all pending are done
-                if pending:
-                    queue_update["preference_status"] = "asked_drip"
+            ).eq("master_list_id", master_list_id).execute()
+        else:
+            self._collect_queue_preference(restaurant_id, master_list_id, preference_type)
+
+        # Update engagement profile counters
+        self._increment_drip_counter(restaurant_id, skipped)
+
+    def _collect_queue_preference(
+        self, restaurant_id: int, master_list_id: int, preference_type: str
+    ):
+        """Move a preference type from pending to collected on the queue item."""
+        try:
+            # This function should exist in Supabase:
+            # CREATE OR REPLACE FUNCTION collect_drip_preference(
+            #   p_restaurant_id bigint, p_master_list_id bigint, p_pref_type text
+            # ) RETURNS void AS $$
+            #   UPDATE preference_collection_queue SET
+            #     preferences_collected = CASE
+            #       WHEN p_pref_type = ANY(coalesce(preferences_collected, '{}'))
+            #       THEN preferences_collected
+            #       ELSE array_append(coalesce(preferences_collected, '{}'), p_pref_type) END,
+            #     preferences_pending = array_remove(coalesce(preferences_pending, '{}'), p_pref_type),
+            #     preference_status = CASE
+            #       WHEN cardinality(array_remove(coalesce(preferences_pending, '{}'), p_pref_type)) > 0
+            #       THEN 'asked_drip' ELSE 'collected' END
+            #   WHERE restaurant_id = p_restaurant_id AND master_list_id = p_master_list_id;
+            # $$ LANGUAGE sql;
+            self.client.rpc("collect_drip_preference", {
+                "p_restaurant_id": restaurant_id,
+                "p_master_list_id": master_list_id,
+                "p_pref_type": preference_type,
+            }).execute()
+            return
+        except Exception as e:
+            # Fallback if RPC doesn't exist (read-modify-write, not race-free)
+            logger.warning(f"RPC collect_drip_preference failed, using fallback: {e}")
+
+        queue_update = {"preference_status": "collected"}
+
+        queue_item = self.client.table(
+            Tables.PREFERENCE_COLLECTION_QUEUE
+        ).select("preferences_collected, preferences_pending").eq(
+            "restaurant_id", restaurant_id
+        ).eq("master_list_id", master_list_id).limit(1).execute()
+
+        if queue_item.data:
+            collected = queue_item.data[0].get("preferences_collected") or []
+            pending = queue_item.data[0].get("preferences_pending") or []
+            if preference_type not in collected:
+                collected.append(preference_type)
+            if preference_type in pending:
+                pending.remove(preference_type)
+            queue_update["preferences_collected"] = collected
+            queue_update["preferences_pending"] = pending
+
+            # Only mark as "collected" if all pending are done
+            if pending:
+                queue_update["preference_status"] = "asked_drip"
 
         self.client.table(Tables.PREFERENCE_COLLECTION_QUEUE).update(
             queue_update
@@ -225,27 +578,33 @@ class PreferenceDripService:
             "restaurant_id", restaurant_id
         ).eq("master_list_id", master_list_id).execute()
 
-        # Update engagement profile counters
-        profile = self.client.table(Tables.ENGAGEMENT_PROFILE).select(
-            "drip_questions_answered, drip_questions_skipped"
-        ).eq("restaurant_id", restaurant_id).limit(1).execute()
-
-        if profile.data:
-            p = profile.data[0]
-            if skipped:
-                self.client.table(Tables.ENGAGEMENT_PROFILE).update({
-                    "drip_questions_skipped": p["drip_questions_skipped"] + 1,
-                }).eq("restaurant_id", restaurant_id).execute()
-            else:
-                self.client.table(Tables.ENGAGEMENT_PROFILE).update({
-                    "drip_questions_answered": p["drip_questions_answered"] + 1,
-                }).eq("restaurant_id", restaurant_id).execute()
-
-        # Recalculate engagement score after drip response
+    def _increment_drip_counter(self, restaurant_id: int, skipped: bool):
+        """Bump drip_questions_answered or drip_questions_skipped atomically."""
         try:
-            recalculate_engagement(restaurant_id)
+            # This function should exist in Supabase:
+            # CREATE OR REPLACE FUNCTION increment_drip_counter(rid bigint, skipped boolean)
+            # RETURNS void AS $$
+            #   UPDATE engagement_profile SET
+            #     drip_questions_skipped = drip_questions_skipped + skipped::int,
+            #     drip_questions_answered = drip_questions_answered + (NOT skipped)::int
+            #   WHERE restaurant_id = rid;
+            # $$ LANGUAGE sql;
+            self.client.rpc("increment_drip_counter", {
+                "rid": restaurant_id,
+                "skipped": skipped,
+            }).execute()
         except Exception as e:
-            logger.warning(f"Failed to recalculate engagement: {e}")
+            # Fallback if RPC doesn't exist (read-modify-write, not race-free)
+            logger.warning(f"RPC increment_drip_counter failed, using fallback: {e}")
+            field = "drip_questions_skipped" if skipped else "drip_questions_answered"
+            profile = self.client.table(Tables.ENGAGEMENT_PROFILE).select(
+                field
+            ).eq("restaurant_id", restaurant_id).limit(1).execute()
+
+            if profile.data:
+                self.client.table(Tables.ENGAGEMENT_PROFILE).update({
+                    field: (profile.data[0].get(field) or 0) + 1,
+                }).eq("restaurant_id", restaurant_id).execute()
 
     def format_drip_questions(self, questions: List[DripQuestion]) -> str:
         """
@@ -257,45 +616,29 @@ class PreferenceDripService:
         if not questions:
             return ""
 
-        lines = ["\n\n---\n💡 **Aproveitando, uma perguntinha rápida:**\n"]
-
+        parts = []
         for q in questions:
-            if q.preference_type == "brand":
-                lines.append(
-                    f"Sobre **{q.product_name}**: tem marca preferida? "
-                    f"(ex: pode ser qualquer marca ou prefere uma específica?)"
-                )
-            elif q.preference_type == "price_max":
-                known_price = q.known_info.get("price_max")
-                if known_price:
-                    lines.append(
-                        f"Sobre **{q.product_name}**: o preço médio que vi foi R$ {known_price}. "
-                        f"Qual seria o máximo aceitável?"
-                    )
-                else:
-                    lines.append(
-                        f"Sobre **{q.product_name}**: qual o preço máximo aceitável?"
-                    )
-            elif q.preference_type == "quality":
-                lines.append(
-                    f"Sobre **{q.product_name}**: prefere premium, padrão ou econômico?"
-                )
-            elif q.preference_type == "supplier":
-                lines.append(
-                    f"Sobre **{q.product_name}**: tem fornecedor preferido?"
-                )
-
-        lines.append("\n_(Pode responder ou ignorar, sem problema!)_")
-        return "\n".join(lines)
+            template = _DRIP_TEMPLATES.get(q.preference_type)
+            if template is None:
+                continue
+            known_price = q.known_info.get("price_max")
+            if q.preference_type == "price_max" and known_price:
+                template = _DRIP_PRICE_KNOWN_TEMPLATE
+            parts.append(template.format(name=q.product_name, price=known_price))
+
+        return "\n".join([_DRIP_PREFIX, *parts, _DRIP_SUFFIX])
 
 
 # Singleton
 _drip_service: Optional[PreferenceDripService] = None
+_drip_service_lock = threading.Lock()
 
 
 def get_drip_service() -> PreferenceDripService:
-    """Get the drip service singleton."""
+    """Get the drip service singleton (created once, thread-safe)."""
     global _drip_service
     if _drip_service is None:
-        _drip_service = PreferenceDripService()
+        with _drip_service_lock:
+            if _drip_service is None:
+                _drip_service = PreferenceDripService()
     return _drip_service
@@ -4,29 +4,63 @@ Supabase client for database operations.
 Provides connection management and base operations for Frepi tables.
 """
 
-from typing import Any, Optional
-
-from supabase import create_client, Client
+import asyncio
+import sys
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Optional
 
 from frepi_agent.config import get_config
 
+if TYPE_CHECKING:
+    from supabase import Client
+
+
+_client: Optional["Client"] = None
+_client_lock = threading.Lock()
 
-_client: Optional[Client] = None
+# HTTP transport shared by the Supabase sub-clients: long-lived keep-alive
+# connections (HTTP/2) so requests skip TCP/TLS setup, sized for the worker
+# threads that run queries concurrently, and a request timeout well below
+# postgrest-py's 120s default.
+HTTP_TIMEOUT_SECONDS = 10.0
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 50
 
 
-def get_supabase_client() -> Client:
-    """Get the Supabase client instance."""
+def get_supabase_client() -> "Client":
+    """Get the Supabase client instance (created once, thread-safe)."""
     global _client
     if _client is None:
-        config = get_config()
-        _client = create_client(config.supabase_url, config.supabase_key)
+        with _client_lock:
+            if _client is None:
+                # Imported lazily: the supabase package is slow to import
+                import httpx
+                from supabase import ClientOptions, create_client
+
+                config = get_config()
+                http_client = httpx.Client(
+                    http2=True,
+                    follow_redirects=True,
+                    timeout=HTTP_TIMEOUT_SECONDS,
+                    limits=httpx.Limits(
+                        max_connections=HTTP_MAX_CONNECTIONS,
+                        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    ),
+                )
+                _client = create_client(
+                    config.supabase_url,
+                    config.supabase_key,
+                    options=ClientOptions(httpx_client=http_client),
+                )
     return _client
 
 
 def reset_client():
     """Reset the client (useful for testing)."""
     global _client
-    _client = None
+    with _client_lock:
+        _client = None
 
 
 # Table names as constants
@@ -57,25 +91,60 @@ class Tables:
     ENGAGEMENT_PROFILE = "engagement_profile"
     PREFERENCE_CORRECTIONS = "preference_corrections"
 
+    # Views
+    ACTIVE_DELIVERIES = "v_active_deliveries"
+
+
+# Parse a timestamp string from PostgREST. Python 3.11+ parses the trailing "Z"
+# PostgREST may send; older versions need it spelled out.
+if sys.version_info >= (3, 11):
+    parse_timestamp = datetime.fromisoformat
+else:
+    def parse_timestamp(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
 
-async def fetch_one(table: str, filters: dict[str, Any]) -> Optional[dict]:
+
+def quote_filter_value(value: str) -> str:
+    """Quote a value for a PostgREST or-filter (commas, dots and parentheses are reserved)."""
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+async def execute_async(query: Any) -> Any:
+    """
+    Execute a query built on the (synchronous) Supabase client without
+    blocking the event loop.
+
+    Args:
+        query: A query builder, e.g. client.table(...).select(...).eq(...)
+
+    Returns:
+        The query response
+    """
+    return await asyncio.to_thread(query.execute)
+
+
+async def fetch_one(
+    table: str, filters: dict[str, Any], columns: str = "*"
+) -> Optional[dict]:
     """
     Fetch a single record from a table.
 
     Args:
         table: Table name
         filters: Dictionary of column=value filters
+        columns: Columns to select (PostgREST select syntax), all by default
 
     Returns:
         Single record dict or None if not found
     """
     client = get_supabase_client()
-    query = client.table(table).select("*")
+    query = client.table(table).select(columns)
 
     for column, value in filters.items():
         query = query.eq(column, value)
 
-    result = query.limit(1).execute()
+    result = await execute_async(query.limit(1))
 
     if result.data:
         return result.data[0]
@@ -87,6 +156,7 @@ async def fetch_many(
     filters: Optional[dict[str, Any]] = None,
     order_by: Optional[str] = None,
     limit: Optional[int] = None,
+    columns: str = "*",
 ) -> list[dict]:
     """
     Fetch multiple records from a table.
@@ -96,12 +166,13 @@ async def fetch_many(
         filters: Optional dictionary of column=value filters
         order_by: Optional column name to order by (prefix with '-' for descending)
         limit: Optional limit on number of records
+        columns: Columns to select (PostgREST select syntax), all by default
 
     Returns:
         List of record dicts
     """
     client = get_supabase_client()
-    query = client.table(table).select("*")
+    query = client.table(table).select(columns)
 
     if filters:
         for column, value in filters.items():
@@ -119,7 +190,7 @@ async def fetch_many(
     if limit:
         query = query.limit(limit)
 
-    result = query.execute()
+    result = await execute_async(query)
     return result.data or []
 
 
@@ -135,7 +206,7 @@ async def insert_one(table: str, data: dict[str, Any]) -> dict:
         Inserted record dict
     """
     client = get_supabase_client()
-    result = client.table(table).insert(data).execute()
+    result = await execute_async(client.table(table).insert(data))
 
     if result.data:
         return result.data[0]
@@ -162,7 +233,7 @@ async def update_one(
     for column, value in filters.items():
         query = query.eq(column, value)
 
-    result = query.execute()
+    result = await execute_async(query)
 
     if result.data:
         return result.data[0]
@@ -181,7 +252,7 @@ async def execute_rpc(function_name: str, params: dict[str, Any]) -> Any:
         Function result
     """
     client = get_supabase_client()
-    result = client.rpc(function_name, params).execute()
+    result = await execute_async(client.rpc(function_name, params))
     return result.data
 
 
@@ -5,14 +5,17 @@ Determines whether an incoming message is from a restaurant user,
 supplier, or unknown user that needs onboarding.
 """
 
+import asyncio
 import logging
+import time
 from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
 
 from postgrest.exceptions import APIError
 
-from .supabase_client import get_supabase_client, Tables
+from . import db_pool
+from .supabase_client import get_supabase_client, Tables, execute_async
 
 logger = logging.getLogger(__name__)
 
@@ -36,12 +39,32 @@ class UserIdentification:
     onboarding_complete: bool = False  # True if onboarding_completed_at is set in DB
 
 
+# Short-lived cache of identify_user results, keyed by telegram_chat_id
+USER_CACHE_TTL_SECONDS = 60
+USER_CACHE_MAX_SIZE = 10_000
+_user_cache: dict[int, tuple[float, UserIdentification]] = {}
+
+
+def invalidate_user_cache(telegram_chat_id: Optional[int] = None):
+    """
+    Drop cached identifications.
+
+    Args:
+        telegram_chat_id: Chat to drop, or None to clear the whole cache
+    """
+    if telegram_chat_id is None:
+        _user_cache.clear()
+    else:
+        _user_cache.pop(telegram_chat_id, None)
+
+
 async def identify_user(telegram_chat_id: int) -> UserIdentification:
     """
     Identify a user by their Telegram chat ID.
 
     Checks both restaurant_people and suppliers tables to determine
-    if this is a known user and what type they are.
+    if this is a known user and what type they are. Results are cached
+    for USER_CACHE_TTL_SECONDS.
 
     Args:
         telegram_chat_id: The Telegram chat ID of the sender
@@ -49,61 +72,162 @@ async def identify_user(telegram_chat_id: int) -> UserIdentification:
     Returns:
         UserIdentification with user type and details
     """
-    client = get_supabase_client()
-    chat_id_str = str(telegram_chat_id)
-
-    # Check if this is a restaurant user
-    # Look in restaurant_people table for matching whatsapp_number or telegram_chat_id
-    restaurant_user = await _find_restaurant_user(client, chat_id_str)
-    if restaurant_user:
-        # Check if onboarding is complete (from joined restaurants table)
-        restaurants_data = restaurant_user.get("restaurants", {})
-        onboarding_completed_at = restaurants_data.get("onboarding_completed_at") if restaurants_data else None
-
-        return UserIdentification(
-            user_type=UserType.RESTAURANT,
-            user_id=restaurant_user["id"],
-            restaurant_id=restaurant_user.get("restaurant_id"),
-            name=restaurant_user.get("first_name") or restaurant_user.get("full_name"),
-            is_new_user=False,
-            onboarding_complete=onboarding_completed_at is not None,
-        )
+    now = time.monotonic()
+    cached = _user_cache.get(telegram_chat_id)
+    if cached and now - cached[0] < USER_CACHE_TTL_SECONDS:
+        return cached[1]
 
-    # Check if this is a supplier
-    # Look in suppliers table for matching whatsapp_number or telegram_chat_id
-    supplier = await _find_supplier(client, chat_id_str)
-    if supplier:
-        return UserIdentification(
-            user_type=UserType.SUPPLIER,
-            user_id=supplier["id"],
-            supplier_id=supplier["id"],
-            name=supplier.get("company_name") or supplier.get("primary_contact_name"),
-            is_new_user=False,
-        )
+    identification = await _user_loader.load(telegram_chat_id)
 
-    # Unknown user - needs onboarding
-    return UserIdentification(
-        user_type=UserType.UNKNOWN,
-        is_new_user=True,
-    )
+    if len(_user_cache) >= USER_CACHE_MAX_SIZE:
+        # Evict the oldest entry (dicts keep insertion order)
+        _user_cache.pop(next(iter(_user_cache)))
+    _user_cache.pop(telegram_chat_id, None)
+    _user_cache[telegram_chat_id] = (now, identification)
+
+    return identification
+
+
+class _UserLoader:
+    """
+    Coalesces identify_user lookups issued in the same event-loop tick.
+
+    Telegram updates arrive in bursts; instead of two queries per update,
+    every chat ID requested before the loop gets to run the scheduled flush
+    is resolved with one query per table.
+    """
 
+    def __init__(self):
+        self._pending: dict[int, asyncio.Future] = {}
+        self._scheduled = False
+        # Strong references to running flushes so they are not GC'd mid-run
+        self._flush_tasks: set = set()
+
+    def load(self, telegram_chat_id: int) -> asyncio.Future:
+        """
+        Queue a chat ID for the next flush.
+
+        Returns an awaitable for its identification. Callers asking for the
+        same chat ID share one lookup, so each gets a shielded view of it:
+        cancelling one caller does not cancel the others.
+        """
+        future = self._pending.get(telegram_chat_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[telegram_chat_id] = future
+            if not self._scheduled:
+                self._scheduled = True
+                loop.call_soon(self._start_flush)
+        return asyncio.shield(future)
+
+    def _start_flush(self):
+        task = asyncio.get_running_loop().create_task(self._flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self):
+        batch, self._pending = self._pending, {}
+        self._scheduled = False
+        try:
+            identifications = await _lookup_users(list(batch))
+        except BaseException as e:
+            # Never leave callers waiting, even if the flush itself is cancelled
+            for future in batch.values():
+                if future.done():
+                    continue
+                if isinstance(e, Exception):
+                    future.set_exception(e)
+                else:
+                    future.cancel()
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        for chat_id, future in batch.items():
+            if not future.done():
+                future.set_result(identifications[chat_id])
+
+
+_user_loader = _UserLoader()
+
+
+async def _lookup_users(telegram_chat_ids: list[int]) -> dict[int, UserIdentification]:
+    """Identify a batch of users by their Telegram chat IDs (uncached)."""
+    client = get_supabase_client()
+    chat_id_strs = [str(chat_id) for chat_id in telegram_chat_ids]
+    use_pool = db_pool.get_db_pool() is not None
+
+    # Check which of them are restaurant users
+    # Look in restaurant_people table for matching whatsapp_number
+    if use_pool:
+        restaurant_users = await _find_restaurant_users_pg(chat_id_strs)
+    else:
+        restaurant_users = await _find_restaurant_users(client, chat_id_strs)
+
+    # Only the rest can be suppliers
+    remaining = [chat_id_str for chat_id_str in chat_id_strs if chat_id_str not in restaurant_users]
+    suppliers = {}
+    if remaining:
+        if use_pool:
+            suppliers = await _find_suppliers_pg(remaining)
+        else:
+            suppliers = await _find_suppliers(client, remaining)
+
+    identifications = {}
+    for chat_id, chat_id_str in zip(telegram_chat_ids, chat_id_strs):
+        restaurant_user = restaurant_users.get(chat_id_str)
+        supplier = suppliers.get(chat_id_str)
+
+        if restaurant_user:
+            # Check if onboarding is complete (from joined restaurants table)
+            restaurants_data = restaurant_user.get("restaurants", {})
+            onboarding_completed_at = restaurants_data.get("onboarding_completed_at") if restaurants_data else None
+
+            identifications[chat_id] = UserIdentification(
+                user_type=UserType.RESTAURANT,
+                user_id=restaurant_user["id"],
+                restaurant_id=restaurant_user.get("restaurant_id"),
+                name=restaurant_user.get("first_name") or restaurant_user.get("full_name"),
+                is_new_user=False,
+                onboarding_complete=onboarding_completed_at is not None,
+            )
+        elif supplier:
+            identifications[chat_id] = UserIdentification(
+                user_type=UserType.SUPPLIER,
+                user_id=supplier["id"],
+                supplier_id=supplier["id"],
+                name=supplier.get("company_name") or supplier.get("primary_contact_name"),
+                is_new_user=False,
+            )
+        else:
+            # Unknown user - needs onboarding
+            identifications[chat_id] = UserIdentification(
+                user_type=UserType.UNKNOWN,
+                is_new_user=True,
+            )
+
+    return identifications
+
+
+async def _find_restaurant_users(client, chat_id_strs: list[str]) -> dict[str, dict]:
+    """Find restaurant users by Telegram chat ID and check onboarding status."""
+    # whatsapp_number stores the telegram chat ID, with or without a + prefix;
+    # match both formats in one query
+    numbers = _whatsapp_numbers(chat_id_strs)
 
-async def _find_restaurant_user(client, chat_id_str: str) -> Optional[dict]:
-    """Find a restaurant user by Telegram chat ID and check onboarding status."""
-    # Try to find by whatsapp_number (which stores the telegram chat ID)
     # Try with JOIN first, fall back to simple query if column doesn't exist
     try:
-        result = (
+        result = await execute_async(
             client.table(Tables.RESTAURANT_PEOPLE)
             .select("id, restaurant_id, first_name, last_name, full_name, whatsapp_number, restaurants(onboarding_completed_at)")
-            .eq("whatsapp_number", chat_id_str)
+            .in_("whatsapp_number", numbers)
             .eq("is_active", True)
-            .limit(1)
-            .execute()
         )
-        if result.data:
-            logger.info(f"Found restaurant user with JOIN: {result.data[0]}")
-            return result.data[0]
+        users = _rows_by_chat_id(result.data)
+        if users:
+            logger.info(f"Found {len(users)} restaurant user(s) with JOIN")
+        return users
     except APIError as e:
         # Column might not exist yet - fall back to simple query
         logger.warning(f"JOIN query failed (column may not exist): {e}")
@@ -112,63 +236,73 @@ async def _find_restaurant_user(client, chat_id_str: str) -> Optional[dict]:
         logger.warning(f"Unexpected error in JOIN query: {type(e).__name__}: {e}")
 
     # Simple query without JOIN (for when onboarding_completed_at column doesn't exist)
-    result = (
-        client.table(Tables.RESTAURANT_PEOPLE)
-        .select("id, restaurant_id, first_name, last_name, full_name, whatsapp_number")
-        .eq("whatsapp_number", chat_id_str)
-        .eq("is_active", True)
-        .limit(1)
-        .execute()
-    )
-
-    if result.data:
-        return result.data[0]
-
-    # Fallback: Try with + prefix for phone numbers
-    result = (
+    result = await execute_async(
         client.table(Tables.RESTAURANT_PEOPLE)
         .select("id, restaurant_id, first_name, last_name, full_name, whatsapp_number")
-        .eq("whatsapp_number", f"+{chat_id_str}")
+        .in_("whatsapp_number", numbers)
         .eq("is_active", True)
-        .limit(1)
-        .execute()
     )
 
-    if result.data:
-        return result.data[0]
+    return _rows_by_chat_id(result.data)
 
-    return None
 
-
-async def _find_supplier(client, chat_id_str: str) -> Optional[dict]:
-    """Find a supplier by Telegram chat ID (stored in whatsapp_number field)."""
-    # Try to find by whatsapp_number (which stores the telegram chat ID)
-    result = (
+async def _find_suppliers(client, chat_id_strs: list[str]) -> dict[str, dict]:
+    """Find suppliers by Telegram chat ID (stored in whatsapp_number field)."""
+    result = await execute_async(
         client.table(Tables.SUPPLIERS)
         .select("id, company_name, primary_contact_name, whatsapp_number")
-        .eq("whatsapp_number", chat_id_str)
+        .in_("whatsapp_number", _whatsapp_numbers(chat_id_strs))
         .eq("is_active", True)
-        .limit(1)
-        .execute()
     )
 
-    if result.data:
-        return result.data[0]
+    return _rows_by_chat_id(result.data)
 
-    # Fallback: Try with + prefix for phone numbers
-    result = (
-        client.table(Tables.SUPPLIERS)
-        .select("id, company_name, primary_contact_name, whatsapp_number")
-        .eq("whatsapp_number", f"+{chat_id_str}")
-        .eq("is_active", True)
-        .limit(1)
-        .execute()
-    )
 
-    if result.data:
-        return result.data[0]
+def _whatsapp_numbers(chat_id_strs: list[str]) -> list[str]:
+    """Stored whatsapp_number values to match: each chat ID with and without a + prefix."""
+    return chat_id_strs + [f"+{chat_id_str}" for chat_id_str in chat_id_strs]
 
-    return None
+
+def _rows_by_chat_id(rows: Optional[list]) -> dict[str, dict]:
+    """Key rows by chat ID, preferring the row stored without the + prefix."""
+    by_chat_id = {}
+    for row in rows or []:
+        number = row.get("whatsapp_number") or ""
+        chat_id_str = number.lstrip("+")
+        if chat_id_str not in by_chat_id or number == chat_id_str:
+            by_chat_id[chat_id_str] = row
+    return by_chat_id
+
+
+async def _find_restaurant_users_pg(chat_id_strs: list[str]) -> dict[str, dict]:
+    """Find restaurant users through the Postgres pool (one query for the whole batch)."""
+    users = await db_pool.fetch(
+        """
+        SELECT rp.id, rp.restaurant_id, rp.first_name, rp.last_name, rp.full_name,
+               rp.whatsapp_number, r.onboarding_completed_at
+        FROM restaurant_people rp
+        LEFT JOIN restaurants r ON r.id = rp.restaurant_id
+        WHERE rp.whatsapp_number = ANY($1::text[]) AND rp.is_active
+        """,
+        _whatsapp_numbers(chat_id_strs),
+    )
+    for user in users:
+        # Same shape as the PostgREST embedded join
+        user["restaurants"] = {"onboarding_completed_at": user.pop("onboarding_completed_at")}
+    return _rows_by_chat_id(users)
+
+
+async def _find_suppliers_pg(chat_id_strs: list[str]) -> dict[str, dict]:
+    """Find suppliers through the Postgres pool (one query for the whole batch)."""
+    suppliers = await db_pool.fetch(
+        """
+        SELECT id, company_name, primary_contact_name, whatsapp_number
+        FROM suppliers
+        WHERE whatsapp_number = ANY($1::text[]) AND is_active
+        """,
+        _whatsapp_numbers(chat_id_strs),
+    )
+    return _rows_by_chat_id(suppliers)
 
 
 async def register_user_role(
@@ -193,6 +327,8 @@ async def register_user_role(
     if user_type == UserType.UNKNOWN:
         raise ValueError("Cannot register user as UNKNOWN type")
 
+    invalidate_user_cache(telegram_chat_id)
+
     # For now, return a placeholder - actual registration will be
     # handled by the respective onboarding subagents
     return UserIdentification(
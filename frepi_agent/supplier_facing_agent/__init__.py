@@ -11,13 +11,19 @@ Handles all interactions with suppliers including:
 from .agent import (
     SupplierAgent,
     SupplierConversationContext,
+    close_supplier_agent,
     get_supplier_agent,
     supplier_chat,
+    supplier_chat_many,
+    supplier_chat_stream,
 )
 
 __all__ = [
     "SupplierAgent",
     "SupplierConversationContext",
+    "close_supplier_agent",
     "get_supplier_agent",
     "supplier_chat",
+    "supplier_chat_many",
+    "supplier_chat_stream",
 ]
@@ -4,12 +4,20 @@ Supplier Facing Agent - GPT-4 powered supplier assistant.
 Handles all supplier interactions including quotations, orders, and deliveries.
 """
 
-import json
-from typing import Optional
+import asyncio
+import logging
+import math
+import re
+import time
+from contextlib import aclosing
+from functools import lru_cache
+from typing import AsyncGenerator, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
 
-from openai import OpenAI
+import httpx
+import orjson
+from openai import AsyncOpenAI
 
 from frepi_agent.config import get_config
 from .prompts.supplier_agent import SUPPLIER_AGENT_PROMPT
@@ -33,6 +41,8 @@ from .tools.delivery_status import (
     DeliveryStatus,
 )
 
+logger = logging.getLogger(__name__)
+
 
 # Define tools for GPT-4 function calling
 SUPPLIER_TOOLS = [
@@ -217,17 +227,358 @@ SUPPLIER_TOOLS = [
             }
         }
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_supplier_dashboard",
+            "description": "Get pending quotations, pending orders and active deliveries at once. Use this for overview questions like 'o que tenho pendente?' instead of calling the three list tools separately.",
+            "parameters": {
+                "type": "object",
+                "properties": {},
+                "required": []
+            }
+        }
+    },
 ]
 
+# Tools grouped by workflow. Each turn only sends the schemas of the groups
+# the supplier's message is about; the system prompt describes all of them.
+TOOL_GROUPS = {
+    "quotations": ("get_pending_quotations", "submit_price", "search_product_to_quote"),
+    "orders": ("get_pending_orders", "confirm_order", "reject_order"),
+    "deliveries": ("get_active_deliveries", "update_delivery_status", "report_delivery_issue"),
+    "overview": ("get_supplier_dashboard",),
+}
+
+_TOOL_GROUP_KEYWORDS = {
+    # Also bare price answers: "45 reais", "42,90", "R$ 12", "10 o kg"
+    "quotations": re.compile(
+        r"cota|pre[çc]o|r\$|valor|produto|reais|\bkg\b|\bquilo|\d+[.,]\d{2}\b|\d\s*(?:reais|conto)"
+    ),
+    "orders": re.compile(r"pedido|confirm|rejeit|recus|aceit"),
+    "deliveries": re.compile(r"entreg|tr[âa]nsito|atras|rota|caminh[ãa]o|problema|avaria|danific"),
+    "overview": re.compile(r"pendent|resumo|geral|tudo"),
+}
+
+# Main menu options (see SUPPLIER_AGENT_PROMPT)
+_MENU_TOOL_GROUPS = {"1": "quotations", "2": "quotations", "3": "orders", "4": "deliveries"}
+
+_TOOLS_BY_NAME = {tool["function"]["name"]: tool for tool in SUPPLIER_TOOLS}
+
+
+_ALL_TOOL_GROUPS = frozenset(TOOL_GROUPS)
 
-@dataclass
-class Message:
-    """A message in the conversation."""
-    role: str  # 'user', 'assistant', 'system', 'tool'
-    content: str
-    tool_call_id: Optional[str] = None
-    tool_calls: Optional[list] = None
-    name: Optional[str] = None
+
+def _select_tool_groups(user_message: str) -> frozenset[str]:
+    """
+    Tool groups a supplier message refers to.
+
+    Empty if no keyword matches (e.g. "sim"), so the caller keeps the
+    previous groups; all groups if the message touches more than one
+    workflow, since a partial match could leave out a tool the turn needs.
+    """
+    text = user_message.strip().lower()
+    menu_group = _MENU_TOOL_GROUPS.get(text[:1]) if text[1:] in ("", "️⃣") else None
+    if menu_group:
+        return frozenset((menu_group,))
+    groups = frozenset(
+        group for group, keywords in _TOOL_GROUP_KEYWORDS.items()
+        if keywords.search(text)
+    )
+    return _ALL_TOOL_GROUPS if len(groups) > 1 else groups
+
+
+# JSON Schema types used in SUPPLIER_TOOLS parameters
+_JSON_SCHEMA_TYPES = {"integer": int, "number": float, "string": str}
+
+
+def _compile_args_parser(parameters: dict):
+    """
+    Build a parser for one tool's arguments from its JSON Schema.
+
+    The parser decodes the raw arguments string, checks required fields,
+    types and enums, fills schema defaults and drops undeclared fields.
+    It raises ValueError on bad input.
+    """
+    properties = parameters.get("properties", {})
+    required = tuple(parameters.get("required", ()))
+    defaults = {name: spec["default"] for name, spec in properties.items() if "default" in spec}
+    fields = [
+        (name, _JSON_SCHEMA_TYPES[spec["type"]], spec.get("enum"))
+        for name, spec in properties.items()
+    ]
+
+    def parse(raw: str) -> dict:
+        data = orjson.loads(raw or "{}")
+        if not isinstance(data, dict):
+            raise ValueError("Argumentos devem ser um objeto JSON")
+
+        missing = [name for name in required if data.get(name) is None]
+        if missing:
+            raise ValueError(f"Parâmetros obrigatórios ausentes: {', '.join(missing)}")
+
+        args = dict(defaults)
+        for name, expected, enum in fields:
+            value = data.get(name)
+            if value is None:
+                continue
+            if isinstance(value, (bool, list, dict)) or (
+                expected is int and isinstance(value, float) and not value.is_integer()
+            ):
+                raise ValueError(f"Parâmetro '{name}' inválido: {value!r}")
+            try:
+                # The model sometimes sends numbers as strings ("42.90") or IDs as numbers
+                value = expected(value)
+            except ValueError:
+                raise ValueError(f"Parâmetro '{name}' inválido: {value!r}")
+            if expected is float and not math.isfinite(value):
+                # float() accepts "nan" and "inf", which are never valid prices
+                raise ValueError(f"Parâmetro '{name}' inválido: {value!r}")
+            if enum and value not in enum:
+                raise ValueError(f"Parâmetro '{name}' deve ser um de: {', '.join(enum)}")
+            args[name] = value
+        return args
+
+    return parse
+
+
+_ARGS_PARSERS = {
+    tool["function"]["name"]: _compile_args_parser(tool["function"]["parameters"])
+    for tool in SUPPLIER_TOOLS
+}
+
+
+def _table_cell(value) -> str:
+    """Render one _to_table cell; nested or ambiguous values are JSON-encoded."""
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return orjson.dumps(value).decode()
+    text = str(value)
+    if "|" in text or "\n" in text:
+        return orjson.dumps(text).decode()
+    return text
+
+
+def _to_table(name: str, rows: list[dict]) -> str:
+    """
+    Encode tool result rows as a compact table for the model.
+
+    Field names are listed once in a `Name{a|b|c}` header instead of being
+    repeated in every row's JSON object; each following line is one row.
+    """
+    if not rows:
+        return f"{name}{{}}"
+    fields = list(rows[0])
+    return "\n".join([
+        f"{name}{{{'|'.join(fields)}}}",
+        *("|".join(_table_cell(row.get(field)) for field in fields) for row in rows),
+    ])
+
+
+@lru_cache(maxsize=4096)
+def _system_prompt_for(base_prompt: str, supplier_id: Optional[int], supplier_name: Optional[str]) -> str:
+    """
+    System prompt for a supplier's conversation.
+
+    The supplier identity goes after the shared prompt so every conversation
+    starts with the same long prefix, which OpenAI's prompt caching can reuse.
+    """
+    if not supplier_name:
+        return base_prompt
+    return f"{base_prompt}\n\nO fornecedor atual é: {supplier_name} (ID: {supplier_id})"
+
+
+@lru_cache(maxsize=None)
+def _tools_body(groups: frozenset[str]) -> dict:
+    """
+    Request-body fragment carrying the tool schemas for some groups (all if empty).
+
+    The SDK deep-transforms typed params (tools=...) on every call, which for
+    these schemas costs more than the JSON encoding itself; extra_body is sent
+    as-is.
+    """
+    if not groups:
+        return {"tools": SUPPLIER_TOOLS}
+    return {"tools": [
+        _TOOLS_BY_NAME[name]
+        for group in TOOL_GROUPS if group in groups
+        for name in TOOL_GROUPS[group]
+    ]}
+
+# Opening-turn replies that needed no tools (greetings, menu questions) are
+# reused for the same supplier and message for this long
+RESPONSE_CACHE_TTL_SECONDS = 600
+RESPONSE_CACHE_MAX_SIZE = 1_000
+
+# Per-request timeout for GPT-4 calls; timeouts, rate limits and connection
+# errors are retried by the SDK with jittered exponential backoff
+REQUEST_TIMEOUT_SECONDS = 15.0
+MAX_RETRIES = 2
+# Send a second, identical request if the first has produced nothing by then
+HEDGE_AFTER_SECONDS = 5.0
+
+# Conversations supplier_chat_many runs at once
+SUPPLIER_CHAT_CONCURRENCY = 20
+
+# Reply used when the model keeps asking for tools past max_tool_rounds
+TOOL_ROUNDS_EXCEEDED_MESSAGE = (
+    "Desculpe, não consegui concluir essa solicitação. "
+    "Pode reformular ou tentar novamente?"
+)
+
+
+# Tool handlers: (supplier_id, parsed args) -> result dict
+
+
+async def _handle_get_pending_quotations(supplier_id: int, args: dict) -> dict:
+    quotations = await get_pending_quotations(supplier_id)
+    return {
+        "quotations_table": _to_table("Quotation", [q.to_dict() for q in quotations]),
+        "count": len(quotations),
+    }
+
+
+async def _handle_submit_price(supplier_id: int, args: dict) -> dict:
+    result = await submit_price(
+        supplier_id=supplier_id,
+        supplier_mapped_product_id=args["supplier_mapped_product_id"],
+        unit_price=args["unit_price"],
+        unit=args["unit"],
+        notes=args.get("notes"),
+    )
+    return result.to_dict()
+
+
+async def _handle_search_product_to_quote(supplier_id: int, args: dict) -> dict:
+    product = await get_product_for_quotation(
+        supplier_id=supplier_id,
+        product_name=args["product_name"],
+    )
+    if product:
+        return {
+            "found": True,
+            "product": product,
+        }
+    return {
+        "found": False,
+        "message": f"Produto '{args['product_name']}' não encontrado.",
+    }
+
+
+async def _handle_get_pending_orders(supplier_id: int, args: dict) -> dict:
+    orders = await get_pending_orders(supplier_id)
+    return {
+        "orders_table": _to_table("Order", [o.to_dict() for o in orders]),
+        "count": len(orders),
+    }
+
+
+async def _handle_confirm_order(supplier_id: int, args: dict) -> dict:
+    delivery_date = None
+    if args.get("estimated_delivery_date"):
+        try:
+            delivery_date = datetime.fromisoformat(args["estimated_delivery_date"])
+        except ValueError:
+            pass
+
+    return await confirm_order(
+        supplier_id=supplier_id,
+        order_id=args["order_id"],
+        estimated_delivery_date=delivery_date,
+        notes=args.get("notes"),
+    )
+
+
+async def _handle_reject_order(supplier_id: int, args: dict) -> dict:
+    return await reject_order(
+        supplier_id=supplier_id,
+        order_id=args["order_id"],
+        reason=args["reason"],
+    )
+
+
+async def _handle_get_active_deliveries(supplier_id: int, args: dict) -> dict:
+    deliveries = await get_active_deliveries(supplier_id)
+    return {
+        "deliveries_table": _to_table("Delivery", [d.to_dict() for d in deliveries]),
+        "count": len(deliveries),
+    }
+
+
+async def _handle_get_supplier_dashboard(supplier_id: int, args: dict) -> dict:
+    quotations, orders, deliveries = await asyncio.gather(
+        get_pending_quotations(supplier_id),
+        get_pending_orders(supplier_id),
+        get_active_deliveries(supplier_id),
+    )
+    return {
+        "quotations_table": _to_table("Quotation", [q.to_dict() for q in quotations]),
+        "orders_table": _to_table("Order", [o.to_dict() for o in orders]),
+        "deliveries_table": _to_table("Delivery", [d.to_dict() for d in deliveries]),
+        "counts": {
+            "quotations": len(quotations),
+            "orders": len(orders),
+            "deliveries": len(deliveries),
+        },
+    }
+
+
+async def _handle_update_delivery_status(supplier_id: int, args: dict) -> dict:
+    # The status enum was already validated against the schema
+    return await update_delivery_status(
+        supplier_id=supplier_id,
+        order_id=args["order_id"],
+        status=DeliveryStatus(args["status"]),
+        notes=args.get("notes"),
+    )
+
+
+async def _handle_report_delivery_issue(supplier_id: int, args: dict) -> dict:
+    return await report_delivery_issue(
+        supplier_id=supplier_id,
+        order_id=args["order_id"],
+        issue_type=args["issue_type"],
+        description=args["description"],
+    )
+
+
+_TOOL_HANDLERS = {
+    "get_pending_quotations": _handle_get_pending_quotations,
+    "submit_price": _handle_submit_price,
+    "search_product_to_quote": _handle_search_product_to_quote,
+    "get_pending_orders": _handle_get_pending_orders,
+    "confirm_order": _handle_confirm_order,
+    "reject_order": _handle_reject_order,
+    "get_active_deliveries": _handle_get_active_deliveries,
+    "get_supplier_dashboard": _handle_get_supplier_dashboard,
+    "update_delivery_status": _handle_update_delivery_status,
+    "report_delivery_issue": _handle_report_delivery_issue,
+}
+
+# Tool name -> (arguments parser, handler)
+_TOOL_DISPATCH = {
+    name: (_ARGS_PARSERS[name], handler)
+    for name, handler in _TOOL_HANDLERS.items()
+}
+
+
+# One HTTP/2 connection pool shared by every SupplierAgent's OpenAI client,
+# so new agents reuse warm TLS connections. Created on first use, inside the
+# event loop that uses it, and closed by close_supplier_agent.
+_shared_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_shared_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it if needed."""
+    global _shared_http_client
+    if _shared_http_client is None or _shared_http_client.is_closed:
+        _shared_http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            timeout=httpx.Timeout(30.0, connect=5.0),
+        )
+    return _shared_http_client
 
 
 @dataclass
@@ -235,25 +586,32 @@ class SupplierConversationContext:
     """Context for a supplier conversation session."""
     supplier_id: Optional[int] = None
     supplier_name: Optional[str] = None
-    messages: list[Message] = field(default_factory=list)
+    # Kept in OpenAI message format so it can be sent as-is on every call
+    messages: list[dict] = field(default_factory=list)
+    # Tool groups used so far in this conversation, kept for follow-ups like "sim"
+    tool_groups: frozenset[str] = frozenset()
 
-    def add_message(self, role: str, content: str, **kwargs):
+    def add_message(
+        self,
+        role: str,
+        content: str,
+        tool_call_id: Optional[str] = None,
+        tool_calls: Optional[list] = None,
+        name: Optional[str] = None,
+    ):
         """Add a message to the conversation."""
-        self.messages.append(Message(role=role, content=content, **kwargs))
+        message = {"role": role, "content": content}
+        if tool_call_id:
+            message["tool_call_id"] = tool_call_id
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        if name:
+            message["name"] = name
+        self.messages.append(message)
 
     def to_openai_messages(self) -> list[dict]:
-        """Convert to OpenAI message format."""
-        result = []
-        for msg in self.messages:
-            m = {"role": msg.role, "content": msg.content}
-            if msg.tool_call_id:
-                m["tool_call_id"] = msg.tool_call_id
-            if msg.tool_calls:
-                m["tool_calls"] = msg.tool_calls
-            if msg.name:
-                m["name"] = msg.name
-            result.append(m)
-        return result
+        """Get the conversation in OpenAI message format."""
+        return self.messages
 
 
 class SupplierAgent:
@@ -261,9 +619,16 @@ class SupplierAgent:
 
     def __init__(self):
         config = get_config()
-        self.client = OpenAI(api_key=config.openai_api_key)
+        self.client = AsyncOpenAI(
+            api_key=config.openai_api_key,
+            http_client=_get_shared_http_client(),
+            max_retries=MAX_RETRIES,
+        )
         self.model = config.chat_model
         self.system_prompt = SUPPLIER_AGENT_PROMPT
+        self._response_cache: dict[tuple, tuple[float, str]] = {}
+        # Model calls per turn that may run tools before giving up
+        self.max_tool_rounds = 5
 
     async def process_message(
         self,
@@ -280,70 +645,206 @@ class SupplierAgent:
         Returns:
             The agent's response text
         """
+        async for _ in self.process_message_stream(user_message, context):
+            pass
+        return context.messages[-1]["content"]
+
+    async def process_message_stream(
+        self,
+        user_message: str,
+        context: SupplierConversationContext,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Process a supplier message, yielding the response text as it is generated.
+
+        Tool calls are run between model calls; only the assembled messages
+        are stored in the context.
+
+        Args:
+            user_message: The supplier's message
+            context: The conversation context
+
+        Yields:
+            Chunks of the agent's response text
+        """
         # Add system prompt if this is a new conversation
         if not context.messages:
-            system_prompt = self.system_prompt
-            if context.supplier_name:
-                system_prompt = f"O fornecedor atual é: {context.supplier_name} (ID: {context.supplier_id})\n\n{system_prompt}"
-            context.add_message("system", system_prompt)
+            context.add_message(
+                "system",
+                _system_prompt_for(self.system_prompt, context.supplier_id, context.supplier_name),
+            )
+
+        # Only opening turns are cacheable: later replies depend on the history
+        cache_key = None
+        if len(context.messages) == 1:
+            cache_key = (context.supplier_id, " ".join(user_message.lower().split()))
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                context.add_message("user", user_message)
+                context.add_message("assistant", cached)
+                yield cached
+                return
 
         # Add user message
         context.add_message("user", user_message)
 
-        # Call GPT-4
-        response = await self._call_gpt4(context)
-
-        # Handle tool calls if any
-        while response.choices[0].message.tool_calls:
-            tool_calls = response.choices[0].message.tool_calls
+        # Groups only accumulate within a conversation: a follow-up may still
+        # need the tools of an earlier step (empty until then means all)
+        context.tool_groups |= _select_tool_groups(user_message)
+        tools_body = _tools_body(context.tool_groups)
+
+        tool_rounds = 0
+        while True:
+            # Call GPT-4, streaming text out and assembling tool calls
+            content_parts = []
+            tool_calls: dict[int, dict] = {}
+            async with aclosing(self._stream_gpt4(context, tools_body)) as chunks:
+                async for chunk in chunks:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    if delta.content:
+                        content_parts.append(delta.content)
+                        yield delta.content
+                    for tc in delta.tool_calls or []:
+                        call = tool_calls.setdefault(tc.index, {
+                            "id": "",
+                            "type": "function",
+                            "function": {"name": "", "arguments": ""},
+                        })
+                        if tc.id:
+                            call["id"] = tc.id
+                        if tc.function:
+                            call["function"]["name"] += tc.function.name or ""
+                            call["function"]["arguments"] += tc.function.arguments or ""
+            content = "".join(content_parts)
+
+            if not tool_calls:
+                break
+            if tool_rounds >= self.max_tool_rounds:
+                logger.warning(
+                    f"Supplier {context.supplier_id}: still requesting tools after "
+                    f"{tool_rounds} rounds, giving up"
+                )
+                content += TOOL_ROUNDS_EXCEEDED_MESSAGE
+                yield TOOL_ROUNDS_EXCEEDED_MESSAGE
+                break
+            tool_rounds += 1
+            tool_calls_list = [tool_calls[index] for index in sorted(tool_calls)]
 
             # Add assistant message with tool calls
-            context.messages.append(Message(
-                role="assistant",
-                content=response.choices[0].message.content or "",
-                tool_calls=[{
-                    "id": tc.id,
-                    "type": "function",
-                    "function": {
-                        "name": tc.function.name,
-                        "arguments": tc.function.arguments,
-                    }
-                } for tc in tool_calls]
-            ))
-
-            # Execute each tool call
-            for tool_call in tool_calls:
-                result = await self._execute_tool(
-                    tool_call.function.name,
-                    json.loads(tool_call.function.arguments),
+            context.add_message("assistant", content, tool_calls=tool_calls_list)
+
+            # Execute the tool calls concurrently, recording results in call order
+            results = await asyncio.gather(*[
+                self._execute_tool(
+                    tool_call["function"]["name"],
+                    tool_call["function"]["arguments"],
                     context,
                 )
-                context.messages.append(Message(
-                    role="tool",
-                    content=json.dumps(result, ensure_ascii=False),
-                    tool_call_id=tool_call.id,
-                    name=tool_call.function.name,
-                ))
-
-            # Call GPT-4 again with tool results
-            response = await self._call_gpt4(context)
-
-        # Get final response
-        assistant_message = response.choices[0].message.content or ""
+                for tool_call in tool_calls_list
+            ])
+            for tool_call, result in zip(tool_calls_list, results):
+                context.add_message(
+                    "tool",
+                    orjson.dumps(result).decode(),
+                    tool_call_id=tool_call["id"],
+                    name=tool_call["function"]["name"],
+                )
+
+        # Store final response
+        assistant_message = content
         context.add_message("assistant", assistant_message)
 
-        return assistant_message
+        if tool_rounds:
+            logger.info(f"Supplier {context.supplier_id}: turn used {tool_rounds} tool round(s)")
+            # Tools may have changed the supplier's quotations/orders/deliveries
+            self._invalidate_cached_responses(context.supplier_id)
+        elif cache_key is not None:
+            self._cache_response(cache_key, assistant_message)
+
+    def _get_cached_response(self, key: tuple) -> Optional[str]:
+        """Get a cached opening-turn reply, if still fresh."""
+        cached = self._response_cache.get(key)
+        if cached and time.monotonic() - cached[0] < RESPONSE_CACHE_TTL_SECONDS:
+            return cached[1]
+        return None
+
+    def _cache_response(self, key: tuple, assistant_message: str):
+        """Cache an opening-turn reply."""
+        if len(self._response_cache) >= RESPONSE_CACHE_MAX_SIZE:
+            # Evict the oldest entry (dicts keep insertion order)
+            self._response_cache.pop(next(iter(self._response_cache)))
+        self._response_cache.pop(key, None)
+        self._response_cache[key] = (time.monotonic(), assistant_message)
+
+    def _invalidate_cached_responses(self, supplier_id: Optional[int]):
+        """Drop all cached replies for a supplier."""
+        for key in [key for key in self._response_cache if key[0] == supplier_id]:
+            del self._response_cache[key]
+
+    async def _stream_gpt4(self, context: SupplierConversationContext, tools_body: dict):
+        """
+        Stream GPT-4 completion chunks, hedging slow starts.
+
+        If no chunk has arrived after HEDGE_AFTER_SECONDS, an identical second
+        request is sent; whichever produces a chunk first is used and the
+        other is cancelled.
+        """
+        pending = {asyncio.create_task(self._open_stream(context, tools_body))}
+        done, pending = await asyncio.wait(pending, timeout=HEDGE_AFTER_SECONDS)
+        if not done:
+            pending.add(asyncio.create_task(self._open_stream(context, tools_body)))
 
-    async def _call_gpt4(self, context: SupplierConversationContext):
-        """Make a call to GPT-4."""
+        winner = None
+        try:
+            while winner is None:
+                if not done:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                task = done.pop()
+                # A failed request only loses if the other one can still win
+                if task.exception() is None or not (done or pending):
+                    winner = task
+        finally:
+            # Both requests may have finished in the same wait: drop every
+            # one but the winner, closing its stream if it was opened
+            await _discard_stream_tasks(done | pending)
+
+        stream, first_chunk = winner.result()
+        try:
+            if first_chunk is None:
+                return
+            yield first_chunk
+            async for chunk in stream:
+                yield chunk
+        finally:
+            # Also when the consumer stops early
+            await stream.close()
+
+    async def _open_stream(self, context: SupplierConversationContext, tools_body: dict):
+        """Start a streaming call and wait for its first chunk (None if empty)."""
+        stream = await self._call_gpt4(context, tools_body)
+        try:
+            return stream, await stream.__anext__()
+        except StopAsyncIteration:
+            return stream, None
+        except BaseException:
+            # Includes cancellation when the hedged request lost
+            await stream.close()
+            raise
+
+    async def _call_gpt4(self, context: SupplierConversationContext, tools_body: dict):
+        """Make a streaming call to GPT-4."""
         messages = context.to_openai_messages()
 
-        response = self.client.chat.completions.create(
+        response = await self.client.chat.completions.create(
             model=self.model,
             messages=messages,
-            tools=SUPPLIER_TOOLS,
             tool_choice="auto",
             temperature=0.7,
+            stream=True,
+            extra_body=tools_body,
+            timeout=REQUEST_TIMEOUT_SECONDS,
         )
 
         return response
@@ -351,116 +852,36 @@ class SupplierAgent:
     async def _execute_tool(
         self,
         tool_name: str,
-        args: dict,
+        arguments: str,
         context: SupplierConversationContext,
     ) -> dict:
-        """Execute a tool and return the result."""
+        """Parse a tool call's raw JSON arguments, execute it and return the result."""
         supplier_id = context.supplier_id
 
         if not supplier_id:
             return {"error": "Fornecedor não identificado"}
 
-        try:
-            if tool_name == "get_pending_quotations":
-                quotations = await get_pending_quotations(supplier_id)
-                return {
-                    "quotations": [q.to_dict() for q in quotations],
-                    "count": len(quotations),
-                }
-
-            elif tool_name == "submit_price":
-                result = await submit_price(
-                    supplier_id=supplier_id,
-                    supplier_mapped_product_id=args["supplier_mapped_product_id"],
-                    unit_price=args["unit_price"],
-                    unit=args.get("unit", "kg"),
-                    notes=args.get("notes"),
-                )
-                return result.to_dict()
-
-            elif tool_name == "search_product_to_quote":
-                product = await get_product_for_quotation(
-                    supplier_id=supplier_id,
-                    product_name=args["product_name"],
-                )
-                if product:
-                    return {
-                        "found": True,
-                        "product": product,
-                    }
-                return {
-                    "found": False,
-                    "message": f"Produto '{args['product_name']}' não encontrado.",
-                }
-
-            elif tool_name == "get_pending_orders":
-                orders = await get_pending_orders(supplier_id)
-                return {
-                    "orders": [o.to_dict() for o in orders],
-                    "count": len(orders),
-                }
-
-            elif tool_name == "confirm_order":
-                delivery_date = None
-                if args.get("estimated_delivery_date"):
-                    try:
-                        delivery_date = datetime.fromisoformat(args["estimated_delivery_date"])
-                    except:
-                        pass
-
-                return await confirm_order(
-                    supplier_id=supplier_id,
-                    order_id=args["order_id"],
-                    estimated_delivery_date=delivery_date,
-                    notes=args.get("notes"),
-                )
-
-            elif tool_name == "reject_order":
-                return await reject_order(
-                    supplier_id=supplier_id,
-                    order_id=args["order_id"],
-                    reason=args["reason"],
-                )
-
-            elif tool_name == "get_active_deliveries":
-                deliveries = await get_active_deliveries(supplier_id)
-                return {
-                    "deliveries": [d.to_dict() for d in deliveries],
-                    "count": len(deliveries),
-                }
-
-            elif tool_name == "update_delivery_status":
-                status_map = {
-                    "preparing": DeliveryStatus.PREPARING,
-                    "in_transit": DeliveryStatus.IN_TRANSIT,
-                    "delivered": DeliveryStatus.DELIVERED,
-                    "delayed": DeliveryStatus.DELAYED,
-                    "failed": DeliveryStatus.FAILED,
-                }
-                status = status_map.get(args["status"], DeliveryStatus.PREPARING)
-
-                return await update_delivery_status(
-                    supplier_id=supplier_id,
-                    order_id=args["order_id"],
-                    status=status,
-                    notes=args.get("notes"),
-                )
-
-            elif tool_name == "report_delivery_issue":
-                return await report_delivery_issue(
-                    supplier_id=supplier_id,
-                    order_id=args["order_id"],
-                    issue_type=args["issue_type"],
-                    description=args["description"],
-                )
-
-            else:
-                return {"error": f"Ferramenta desconhecida: {tool_name}"}
+        tool = _TOOL_DISPATCH.get(tool_name)
+        if tool is None:
+            return {"error": f"Ferramenta desconhecida: {tool_name}"}
+        parse_args, handler = tool
 
+        try:
+            return await handler(supplier_id, parse_args(arguments))
         except Exception as e:
             return {"error": str(e)}
 
 
+async def _discard_stream_tasks(tasks: set[asyncio.Task]):
+    """Cancel _open_stream tasks and close the streams of those that already opened one."""
+    for task in tasks:
+        task.cancel()
+    for result in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(result, tuple):
+            stream, _ = result
+            await stream.close()
+
+
 # Global agent instance
 _supplier_agent: Optional[SupplierAgent] = None
 
@@ -473,6 +894,20 @@ def get_supplier_agent() -> SupplierAgent:
     return _supplier_agent
 
 
+async def close_supplier_agent():
+    """
+    Close the shared HTTP client and drop the global agent.
+
+    Call on shutdown, or before the event loop goes away; the next
+    get_supplier_agent builds a fresh agent and client.
+    """
+    global _supplier_agent, _shared_http_client
+    _supplier_agent = None
+    if _shared_http_client is not None:
+        await _shared_http_client.aclose()
+        _shared_http_client = None
+
+
 async def supplier_chat(
     user_message: str,
     context: SupplierConversationContext,
@@ -489,3 +924,54 @@ async def supplier_chat(
     """
     agent = get_supplier_agent()
     return await agent.process_message(user_message, context)
+
+
+async def supplier_chat_many(
+    requests: list[tuple[str, SupplierConversationContext]],
+) -> list[str | BaseException]:
+    """
+    Chat with many suppliers concurrently (e.g. outbound reminder jobs).
+
+    At most SUPPLIER_CHAT_CONCURRENCY conversations run at a time. A failing
+    conversation does not abort the others.
+
+    Args:
+        requests: (message, context) pairs, one per conversation
+
+    Returns:
+        The agent's response or the raised exception for each request,
+        in request order
+    """
+    agent = get_supplier_agent()
+    semaphore = asyncio.Semaphore(SUPPLIER_CHAT_CONCURRENCY)
+
+    async def run(user_message: str, context: SupplierConversationContext) -> str:
+        async with semaphore:
+            return await agent.process_message(user_message, context)
+
+    results = await asyncio.gather(
+        *(run(message, context) for message, context in requests),
+        return_exceptions=True,
+    )
+    for (_, context), result in zip(requests, results):
+        if isinstance(result, Exception):
+            logger.error(f"Supplier chat failed for supplier {context.supplier_id}: {result}")
+    return results
+
+
+def supplier_chat_stream(
+    user_message: str,
+    context: SupplierConversationContext,
+) -> AsyncGenerator[str, None]:
+    """
+    Convenience function to chat with the supplier agent, streaming the reply.
+
+    Args:
+        user_message: The supplier's message
+        context: The conversation context
+
+    Returns:
+        Async iterator over chunks of the agent's response
+    """
+    agent = get_supplier_agent()
+    return agent.process_message_stream(user_message, context)
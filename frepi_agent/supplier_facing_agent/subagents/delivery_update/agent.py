@@ -5,6 +5,7 @@ Handles delivery status updates and issue reporting.
 """
 
 from dataclasses import dataclass
+from itertools import chain
 from typing import Optional
 from datetime import datetime
 
@@ -15,6 +16,83 @@ from frepi_agent.supplier_facing_agent.tools.delivery_status import (
     DeliveryInfo,
     DeliveryStatus,
 )
+from frepi_agent.supplier_facing_agent.subagents.menu import MAIN_MENU
+
+
+# (icon, display name) per delivery status
+STATUS_META = {
+    DeliveryStatus.PREPARING: ("📦", "Preparando"),
+    DeliveryStatus.IN_TRANSIT: ("🚚", "Em Trânsito"),
+    DeliveryStatus.DELIVERED: ("✅", "Entregue"),
+    DeliveryStatus.DELAYED: ("⚠️", "Atrasado"),
+    DeliveryStatus.FAILED: ("❌", "Falhou"),
+}
+_UNKNOWN_STATUS_META = ("📦", "Desconhecido")
+
+# Headlines for a successful status update, keyed by the new status value
+STATUS_MESSAGES = {
+    "preparing": "📦 Status: Preparando",
+    "in_transit": "🚚 Status: Em Trânsito",
+    "delivered": "✅ Entrega Concluída!",
+    "delayed": "⚠️ Status: Atrasado",
+    "failed": "❌ Status: Falhou",
+}
+
+_NO_DELIVERIES_MESSAGE = f"""
+✨ Você não tem entregas em andamento no momento.
+
+Quando houver pedidos confirmados para entregar, você verá aqui.
+
+{MAIN_MENU}
+""".strip()
+
+_UPDATE_SUCCESS_TEMPLATE = f"""
+{{msg}}
+
+📦 Pedido: {{order_id}}
+
+O restaurante será notificado.
+
+{MAIN_MENU}
+""".strip()
+
+_UPDATE_ERROR_TEMPLATE = f"""
+❌ **Erro ao atualizar status**
+
+{{message}}
+
+{MAIN_MENU}
+""".strip()
+
+_ISSUE_SUCCESS_TEMPLATE = f"""
+⚠️ **Problema Reportado**
+
+📦 Pedido: {{order_id}}
+📝 Tipo: {{issue_type}}
+
+O restaurante será notificado sobre o problema.
+
+{MAIN_MENU}
+""".strip()
+
+_ISSUE_ERROR_TEMPLATE = f"""
+❌ **Erro ao reportar problema**
+
+{{message}}
+
+{MAIN_MENU}
+""".strip()
+
+_DELIVERIES_HEADER = "🚚 **Entregas em Andamento**\n"
+
+_DELIVERY_COMMANDS_HELP = "\n".join([
+    "\nPara atualizar status:",
+    "• 'em transito [ID]' - Saiu para entrega",
+    "• 'entregue [ID]' - Entrega concluída",
+    "• 'atrasado [ID]' - Entrega atrasada",
+    "\nPara reportar problema:",
+    "• 'problema [ID] [descrição]'",
+])
 
 
 class DeliveryUpdateSubagent:
@@ -102,57 +180,28 @@ class DeliveryUpdateSubagent:
             Formatted string for display
         """
         if not deliveries:
-            return """
-✨ Você não tem entregas em andamento no momento.
-
-Quando houver pedidos confirmados para entregar, você verá aqui.
-
-1️⃣ Ver pedidos de cotação pendentes
-2️⃣ Enviar cotação de preços
-3️⃣ Confirmar pedido recebido
-4️⃣ Atualizar status de entrega
-            """.strip()
-
-        status_icons = {
-            DeliveryStatus.PREPARING: "📦",
-            DeliveryStatus.IN_TRANSIT: "🚚",
-            DeliveryStatus.DELIVERED: "✅",
-            DeliveryStatus.DELAYED: "⚠️",
-            DeliveryStatus.FAILED: "❌",
-        }
-
-        status_names = {
-            DeliveryStatus.PREPARING: "Preparando",
-            DeliveryStatus.IN_TRANSIT: "Em Trânsito",
-            DeliveryStatus.DELIVERED: "Entregue",
-            DeliveryStatus.DELAYED: "Atrasado",
-            DeliveryStatus.FAILED: "Falhou",
-        }
-
-        lines = ["🚚 **Entregas em Andamento**\n"]
-
-        for i, delivery in enumerate(deliveries, 1):
-            icon = status_icons.get(delivery.status, "📦")
-            status_name = status_names.get(delivery.status, "Desconhecido")
-
-            lines.append(f"**{i}. Pedido {delivery.order_id}**")
-            lines.append(f"   {icon} Status: {status_name}")
-            lines.append(f"   Restaurante: {delivery.restaurant_name}")
-
-            if delivery.confirmed_delivery_date:
-                lines.append(f"   Entrega prevista: {delivery.confirmed_delivery_date.strftime('%d/%m/%Y')}")
-
-            lines.append(f"   Itens: {delivery.total_items}")
-            lines.append("")
-
-        lines.append("\nPara atualizar status:")
-        lines.append("• 'em transito [ID]' - Saiu para entrega")
-        lines.append("• 'entregue [ID]' - Entrega concluída")
-        lines.append("• 'atrasado [ID]' - Entrega atrasada")
-        lines.append("\nPara reportar problema:")
-        lines.append("• 'problema [ID] [descrição]'")
-
-        return "\n".join(lines)
+            return _NO_DELIVERIES_MESSAGE
+
+        return "\n".join(chain(
+            (_DELIVERIES_HEADER,),
+            (self._format_delivery(i, delivery) for i, delivery in enumerate(deliveries, 1)),
+            (_DELIVERY_COMMANDS_HELP,),
+        ))
+
+    def _format_delivery(self, index: int, delivery: DeliveryInfo) -> str:
+        """Format one delivery block (ends with a blank line)."""
+        expected = ""
+        if delivery.formatted_delivery_date:
+            expected = f"   Entrega prevista: {delivery.formatted_delivery_date}\n"
+
+        icon, status_name = STATUS_META.get(delivery.status, _UNKNOWN_STATUS_META)
+        return (
+            f"**{index}. Pedido {delivery.order_id}**\n"
+            f"   {icon} Status: {status_name}\n"
+            f"   Restaurante: {delivery.restaurant_name}\n"
+            f"{expected}"
+            f"   Itens: {delivery.total_items}\n"
+        )
 
     def format_update_result(self, result: dict) -> str:
         """
@@ -165,40 +214,12 @@ Quando houver pedidos confirmados para entregar, você verá aqui.
             Formatted string for display
         """
         if result.get("success"):
-            status_messages = {
-                "preparing": "📦 Status: Preparando",
-                "in_transit": "🚚 Status: Em Trânsito",
-                "delivered": "✅ Entrega Concluída!",
-                "delayed": "⚠️ Status: Atrasado",
-                "failed": "❌ Status: Falhou",
-            }
-
             status = result.get("new_status", "")
-            msg = status_messages.get(status, result.get("message", "Status atualizado"))
-
-            return f"""
-{msg}
-
-📦 Pedido: {result.get('order_id')}
-
-O restaurante será notificado.
+            msg = STATUS_MESSAGES.get(status, result.get("message", "Status atualizado"))
 
-1️⃣ Ver pedidos de cotação pendentes
-2️⃣ Enviar cotação de preços
-3️⃣ Confirmar pedido recebido
-4️⃣ Atualizar status de entrega
-            """.strip()
+            return _UPDATE_SUCCESS_TEMPLATE.format(msg=msg, order_id=result.get("order_id"))
         else:
-            return f"""
-❌ **Erro ao atualizar status**
-
-{result.get('message', 'Erro desconhecido')}
-
-1️⃣ Ver pedidos de cotação pendentes
-2️⃣ Enviar cotação de preços
-3️⃣ Confirmar pedido recebido
-4️⃣ Atualizar status de entrega
-            """.strip()
+            return _UPDATE_ERROR_TEMPLATE.format(message=result.get("message", "Erro desconhecido"))
 
     def format_issue_result(self, result: dict) -> str:
         """
@@ -211,27 +232,9 @@ O restaurante será notificado.
             Formatted string for display
         """
         if result.get("success"):
-            return f"""
-⚠️ **Problema Reportado**
-
-📦 Pedido: {result.get('order_id')}
-📝 Tipo: {result.get('issue_type')}
-
-O restaurante será notificado sobre o problema.
-
-1️⃣ Ver pedidos de cotação pendentes
-2️⃣ Enviar cotação de preços
-3️⃣ Confirmar pedido recebido
-4️⃣ Atualizar status de entrega
-            """.strip()
+            return _ISSUE_SUCCESS_TEMPLATE.format(
+                order_id=result.get("order_id"),
+                issue_type=result.get("issue_type"),
+            )
         else:
-            return f"""
-❌ **Erro ao reportar problema**
-
-{result.get('message', 'Erro desconhecido')}
-
-1️⃣ Ver pedidos de cotação pendentes
-2️⃣ Enviar cotação de preços
-3️⃣ Confirmar pedido recebido
-4️⃣ Atualizar status de entrega
-            """.strip()
+            return _ISSUE_ERROR_TEMPLATE.format(message=result.get("message", "Erro desconhecido"))
@@ -0,0 +1,8 @@
+"""Main menu shown to suppliers, shared by the subagents' replies."""
+
+MAIN_MENU = """
+1️⃣ Ver pedidos de cotação pendentes
+2️⃣ Enviar cotação de preços
+3️⃣ Confirmar pedido recebido
+4️⃣ Atualizar status de entrega
+""".strip()
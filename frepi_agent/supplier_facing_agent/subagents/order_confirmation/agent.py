@@ -7,6 +7,7 @@ Handles order confirmations and rejections from suppliers.
 from dataclasses import dataclass
 from typing import Optional
 from datetime import datetime
+from itertools import islice
 
 from frepi_agent.supplier_facing_agent.tools.order_management import (
     get_pending_orders,
@@ -14,6 +15,63 @@ from frepi_agent.supplier_facing_agent.tools.order_management import (
     reject_order,
     PendingOrder,
 )
+from frepi_agent.supplier_facing_agent.subagents.menu import MAIN_MENU
+
+
+_EMPTY_PENDING_MSG = f"""
+✨ Você não tem pedidos pendentes no momento.
+
+Quando restaurantes fizerem pedidos, você verá aqui.
+
+{MAIN_MENU}
+""".strip()
+
+_CONFIRM_SUCCESS_TEMPLATE = f"""
+✅ **Pedido Confirmado!**
+
+📦 Pedido: {{order_id}}
+
+O restaurante será notificado sobre a confirmação.
+
+{MAIN_MENU}
+""".strip()
+
+_CONFIRM_ERROR_TEMPLATE = f"""
+❌ **Erro ao confirmar pedido**
+
+{{message}}
+
+{MAIN_MENU}
+""".strip()
+
+_REJECT_SUCCESS_TEMPLATE = f"""
+⚠️ **Pedido Rejeitado**
+
+📦 Pedido: {{order_id}}
+📝 Motivo: {{reason}}
+
+O restaurante será notificado.
+
+{MAIN_MENU}
+""".strip()
+
+_REJECT_ERROR_TEMPLATE = f"""
+❌ **Erro ao rejeitar pedido**
+
+{{message}}
+
+{MAIN_MENU}
+""".strip()
+
+_PENDING_ORDERS_TRAILER = "\n".join([
+    "\nPara confirmar um pedido, digite:",
+    "'confirmar [ID do pedido]'",
+    "\nPara rejeitar:",
+    "'rejeitar [ID do pedido] [motivo]'",
+])
+
+# Products shown per order in the pending orders list
+PREVIEW_LINE_ITEMS = 3
 
 
 class OrderConfirmationSubagent:
@@ -98,47 +156,38 @@ class OrderConfirmationSubagent:
             Formatted string for display
         """
         if not orders:
-            return """
-✨ Você não tem pedidos pendentes no momento.
-
-Quando restaurantes fizerem pedidos, você verá aqui.
+            return _EMPTY_PENDING_MSG
 
-1️⃣ Ver pedidos de cotação pendentes
-2️⃣ Enviar cotação de preços
-3️⃣ Confirmar pedido recebido
-4️⃣ Atualizar status de entrega
-            """.strip()
+        return "\n".join(self._iter_pending_order_lines(orders))
 
-        lines = ["📦 **Pedidos Pendentes**\n"]
+    def _iter_pending_order_lines(self, orders: list[PendingOrder]):
+        """Yield the lines of the pending orders list."""
+        yield "📦 **Pedidos Pendentes**\n"
 
         for i, order in enumerate(orders, 1):
-            lines.append(f"**{i}. Pedido {order.order_id}**")
-            lines.append(f"   Restaurante: {order.restaurant_name}")
-            lines.append(f"   Data: {order.order_date.strftime('%d/%m/%Y')}")
-            lines.append(f"   Itens: {order.total_items}")
-            lines.append(f"   Total: R$ {order.total_amount:,.2f}")
+            yield f"**{i}. Pedido {order.order_id}**"
+            yield f"   Restaurante: {order.restaurant_name}"
+            yield f"   Data: {order.formatted_date}"
+            yield f"   Itens: {order.total_items}"
+            yield f"   Total: R$ {order.formatted_total}"
 
             if order.requested_delivery_date:
-                lines.append(f"   Entrega solicitada: {order.requested_delivery_date.strftime('%d/%m/%Y')}")
+                yield f"   Entrega solicitada: {order.requested_delivery_date.strftime('%d/%m/%Y')}"
 
-            if order.line_items:
-                lines.append("   Produtos:")
-                for item in order.line_items[:3]:  # Show first 3 items
+            item_count = len(order.line_items)
+            if item_count:
+                yield "   Produtos:"
+                for item in islice(order.line_items, PREVIEW_LINE_ITEMS):
                     name = item.get("product_name", "Produto")
                     qty = item.get("quantity", 0)
                     unit = item.get("unit", "un")
-                    lines.append(f"     • {name}: {qty} {unit}")
-                if len(order.line_items) > 3:
-                    lines.append(f"     ... +{len(order.line_items) - 3} itens")
-
-            lines.append("")
+                    yield f"     • {name}: {qty} {unit}"
+                if item_count > PREVIEW_LINE_ITEMS:
+                    yield f"     ... +{item_count - PREVIEW_LINE_ITEMS} itens"
 
-        lines.append("\nPara confirmar um pedido, digite:")
-        lines.append("'confirmar [ID do pedido]'")
-        lines.append("\nPara rejeitar:")
-        lines.append("'rejeitar [ID do pedido] [motivo]'")
+            yield ""
 
-        return "\n".join(lines)
+        yield _PENDING_ORDERS_TRAILER
 
     def format_confirmation_result(self, result: dict) -> str:
         """
@@ -151,29 +200,9 @@ Quando restaurantes fizerem pedidos, você verá aqui.
             Formatted string for display
         """
         if result.get("success"):
-            return f"""
-✅ **Pedido Confirmado!**
-
-📦 Pedido: {result.get('order_id')}
-
-O restaurante será notificado sobre a confirmação.
-
-1️⃣ Ver pedidos de cotação pendentes
-2️⃣ Enviar cotação de preços
-3️⃣ Confirmar pedido recebido
-4️⃣ Atualizar status de entrega
-            """.strip()
+            return _CONFIRM_SUCCESS_TEMPLATE.format(order_id=result.get("order_id"))
         else:
-            return f"""
-❌ **Erro ao confirmar pedido**
-
-{result.get('message', 'Erro desconhecido')}
-
-1️⃣ Ver pedidos de cotação pendentes
-2️⃣ Enviar cotação de preços
-3️⃣ Confirmar pedido recebido
-4️⃣ Atualizar status de entrega
-            """.strip()
+            return _CONFIRM_ERROR_TEMPLATE.format(message=result.get("message", "Erro desconhecido"))
 
     def format_rejection_result(self, result: dict) -> str:
         """
@@ -186,27 +215,9 @@ O restaurante será notificado sobre a confirmação.
             Formatted string for display
         """
         if result.get("success"):
-            return f"""
-⚠️ **Pedido Rejeitado**
-
-📦 Pedido: {result.get('order_id')}
-📝 Motivo: {result.get('reason')}
-
-O restaurante será notificado.
-
-1️⃣ Ver pedidos de cotação pendentes
-2️⃣ Enviar cotação de preços
-3️⃣ Confirmar pedido recebido
-4️⃣ Atualizar status de entrega
-            """.strip()
+            return _REJECT_SUCCESS_TEMPLATE.format(
+                order_id=result.get("order_id"),
+                reason=result.get("reason"),
+            )
         else:
-            return f"""
-❌ **Erro ao rejeitar pedido**
-
-{result.get('message', 'Erro desconhecido')}
-
-1️⃣ Ver pedidos de cotação pendentes
-2️⃣ Enviar cotação de preços
-3️⃣ Confirmar pedido recebido
-4️⃣ Atualizar status de entrega
-            """.strip()
+            return _REJECT_ERROR_TEMPLATE.format(message=result.get("message", "Erro desconhecido"))
@@ -18,6 +18,45 @@ from frepi_agent.supplier_facing_agent.tools.price_submission import (
     get_product_for_quotation,
     PriceSubmission,
 )
+from frepi_agent.supplier_facing_agent.subagents.menu import MAIN_MENU
+
+
+_EMPTY_PENDING_MSG = f"""
+✨ Você não tem cotações pendentes no momento.
+
+Quando restaurantes solicitarem preços, você verá aqui.
+
+{MAIN_MENU}
+""".strip()
+
+_SUBMISSION_SUCCESS_TEMPLATE = f"""
+✅ **Cotação Registrada!**
+
+📦 Produto: {{product_name}}
+💰 Preço: R$ {{unit_price:.2f}}/{{unit}}
+📅 Data: {{effective_date:%d/%m/%Y}}
+
+O restaurante será notificado sobre sua cotação.
+
+{MAIN_MENU}
+""".strip()
+
+_SUBMISSION_ERROR_TEMPLATE = f"""
+❌ **Erro ao registrar cotação**
+
+{{message}}
+
+Por favor, verifique os dados e tente novamente.
+
+{MAIN_MENU}
+""".strip()
+
+_PENDING_QUOTATIONS_TRAILER = "\n".join([
+    "\nPara enviar cotação, informe:",
+    "- ID do produto",
+    "- Preço por unidade (ex: 42.90)",
+    "- Unidade (kg, un, cx)",
+])
 
 
 class QuotationSubagent:
@@ -99,33 +138,23 @@ class QuotationSubagent:
             Formatted string for display
         """
         if not quotations:
-            return """
-✨ Você não tem cotações pendentes no momento.
-
-Quando restaurantes solicitarem preços, você verá aqui.
+            return _EMPTY_PENDING_MSG
 
-1️⃣ Ver pedidos de cotação pendentes
-2️⃣ Enviar cotação de preços
-3️⃣ Confirmar pedido recebido
-4️⃣ Atualizar status de entrega
-            """.strip()
+        return "\n".join(self._iter_pending_quotation_lines(quotations))
 
-        lines = ["📋 **Cotações Pendentes**\n"]
+    def _iter_pending_quotation_lines(self, quotations: list[QuotationRequest]):
+        """Yield the lines of the pending quotations list."""
+        yield "📋 **Cotações Pendentes**\n"
 
         for i, q in enumerate(quotations, 1):
-            lines.append(f"{i}. **{q.product_name}**")
+            yield f"{i}. **{q.product_name}**"
             if q.quantity and q.unit:
-                lines.append(f"   Quantidade: {q.quantity} {q.unit}")
-            lines.append(f"   Restaurante: {q.restaurant_name}")
-            lines.append(f"   ID do Produto: {q.id}")
-            lines.append("")
-
-        lines.append("\nPara enviar cotação, informe:")
-        lines.append("- ID do produto")
-        lines.append("- Preço por unidade (ex: 42.90)")
-        lines.append("- Unidade (kg, un, cx)")
+                yield f"   Quantidade: {q.quantity} {q.unit}"
+            yield f"   Restaurante: {q.restaurant_name}"
+            yield f"   ID do Produto: {q.id}"
+            yield ""
 
-        return "\n".join(lines)
+        yield _PENDING_QUOTATIONS_TRAILER
 
     def format_submission_result(self, result: PriceSubmission) -> str:
         """
@@ -138,30 +167,11 @@ Quando restaurantes solicitarem preços, você verá aqui.
             Formatted string for display
         """
         if result.success:
-            return f"""
-✅ **Cotação Registrada!**
-
-📦 Produto: {result.product_name}
-💰 Preço: R$ {result.unit_price:.2f}/{result.unit}
-📅 Data: {result.effective_date.strftime('%d/%m/%Y')}
-
-O restaurante será notificado sobre sua cotação.
-
-1️⃣ Ver pedidos de cotação pendentes
-2️⃣ Enviar cotação de preços
-3️⃣ Confirmar pedido recebido
-4️⃣ Atualizar status de entrega
-            """.strip()
+            return _SUBMISSION_SUCCESS_TEMPLATE.format(
+                product_name=result.product_name,
+                unit_price=result.unit_price,
+                unit=result.unit,
+                effective_date=result.effective_date,
+            )
         else:
-            return f"""
-❌ **Erro ao registrar cotação**
-
-{result.message}
-
-Por favor, verifique os dados e tente novamente.
-
-1️⃣ Ver pedidos de cotação pendentes
-2️⃣ Enviar cotação de preços
-3️⃣ Confirmar pedido recebido
-4️⃣ Atualizar status de entrega
-            """.strip()
+            return _SUBMISSION_ERROR_TEMPLATE.format(message=result.message)
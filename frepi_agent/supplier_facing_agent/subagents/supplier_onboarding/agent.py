@@ -5,6 +5,7 @@ Handles registration of new suppliers, collecting company information
 and initial product catalog setup.
 """
 
+import asyncio
 from dataclasses import dataclass
 from typing import Optional
 from datetime import datetime
@@ -12,9 +13,64 @@ from datetime import datetime
 from frepi_agent.shared.supabase_client import (
     get_supabase_client,
     Tables,
+    execute_async,
+    quote_filter_value,
     insert_one,
     fetch_one,
 )
+from frepi_agent.supplier_facing_agent.subagents.menu import MAIN_MENU
+
+
+# Onboarding messages per step
+_ONBOARDING_PROMPTS = {
+    "start": """
+Olá! Bem-vindo ao Frepi!
+
+Vou te ajudar a se cadastrar como fornecedor.
+
+Por favor, me informe o **nome da sua empresa**:
+    """.strip(),
+
+    "ask_contact": """
+Ótimo! Agora preciso de algumas informações de contato:
+
+• **Nome do responsável**
+• **Telefone** (se diferente do WhatsApp)
+• **Email**
+
+Me envie essas informações:
+    """.strip(),
+
+    "ask_cnpj": """
+Perfeito! Por último, poderia informar o **CNPJ** da empresa?
+
+(Se preferir pular, digite "pular")
+    """.strip(),
+
+    "confirm": """
+Excelente! Vou confirmar os dados:
+
+📋 **Dados do Cadastro**
+• Empresa: {company_name}
+• Contato: {contact_name}
+• Telefone: {phone}
+• Email: {email}
+• CNPJ: {cnpj}
+
+Os dados estão corretos? (sim/não)
+    """.strip(),
+
+    "success": f"""
+✅ **Cadastro Concluído!**
+
+Bem-vindo ao Frepi, {{company_name}}!
+
+Agora você pode:
+{MAIN_MENU}
+
+Como posso ajudar?
+    """.strip(),
+}
 
 
 @dataclass
@@ -53,46 +109,72 @@ class SupplierOnboardingSubagent:
         Returns:
             Supplier dict if found, None otherwise
         """
-        client = get_supabase_client()
+        # The name lookup is only a fallback, but it is the slow one (ilike
+        # scan), so start it alongside the exact lookup instead of after it
+        name_task = (
+            asyncio.create_task(self._find_supplier_by_name(company_name))
+            if company_name
+            else None
+        )
 
-        # Try to find by CNPJ first (most unique)
-        if cnpj:
-            result = (
-                client.table(Tables.SUPPLIERS)
-                .select("*")
-                .eq("company_registration", cnpj)
-                .limit(1)
-                .execute()
-            )
-            if result.data:
-                return result.data[0]
+        try:
+            supplier = await self._find_supplier_by_identifiers(cnpj, whatsapp_number)
+        except BaseException:
+            if name_task is not None:
+                name_task.cancel()
+            raise
 
-        # Try by WhatsApp number
-        if whatsapp_number:
-            result = (
-                client.table(Tables.SUPPLIERS)
-                .select("*")
-                .eq("whatsapp_number", whatsapp_number)
-                .limit(1)
-                .execute()
-            )
-            if result.data:
-                return result.data[0]
-
-        # Try by company name (fuzzy match)
-        if company_name:
-            result = (
-                client.table(Tables.SUPPLIERS)
-                .select("*")
-                .ilike("company_name", f"%{company_name}%")
-                .limit(1)
-                .execute()
-            )
-            if result.data:
-                return result.data[0]
+        if supplier is not None:
+            if name_task is not None:
+                name_task.cancel()
+            return supplier
+
+        if name_task is not None:
+            return await name_task
 
         return None
 
+    async def _find_supplier_by_identifiers(
+        self,
+        cnpj: Optional[str],
+        whatsapp_number: Optional[str],
+    ) -> Optional[dict]:
+        """Exact match on CNPJ or WhatsApp number; CNPJ wins over WhatsApp number."""
+        exact_filters = []
+        if cnpj:
+            exact_filters.append(f"company_registration.eq.{quote_filter_value(cnpj)}")
+        if whatsapp_number:
+            exact_filters.append(f"whatsapp_number.eq.{quote_filter_value(whatsapp_number)}")
+
+        if not exact_filters:
+            return None
+
+        client = get_supabase_client()
+        result = await execute_async(
+            client.table(Tables.SUPPLIERS)
+            .select("id, company_name, company_registration")
+            .or_(",".join(exact_filters))
+            .limit(2)
+        )
+        if not result.data:
+            return None
+
+        for supplier in result.data:
+            if cnpj and supplier.get("company_registration") == cnpj:
+                return supplier
+        return result.data[0]
+
+    async def _find_supplier_by_name(self, company_name: str) -> Optional[dict]:
+        """Fuzzy match on company name."""
+        client = get_supabase_client()
+        result = await execute_async(
+            client.table(Tables.SUPPLIERS)
+            .select("id, company_name")
+            .ilike("company_name", f"%{company_name}%")
+            .limit(1)
+        )
+        return result.data[0] if result.data else None
+
     async def register_supplier(
         self,
         company_name: str,
@@ -145,21 +227,17 @@ class SupplierOnboardingSubagent:
             "created_at": datetime.now().isoformat(),
         }
 
-        # Add optional fields
-        if telegram_chat_id:
-            supplier_data["telegram_chat_id"] = str(telegram_chat_id)
-        if cnpj:
-            supplier_data["company_registration"] = cnpj
-        if primary_contact_name:
-            supplier_data["primary_contact_name"] = primary_contact_name
-        if primary_email:
-            supplier_data["primary_email"] = primary_email
-        if primary_phone:
-            supplier_data["primary_phone"] = primary_phone
-        if street_address:
-            supplier_data["street_address"] = street_address
-        if city:
-            supplier_data["city"] = city
+        # Add optional fields that were provided
+        optional_fields = {
+            "telegram_chat_id": str(telegram_chat_id) if telegram_chat_id else None,
+            "company_registration": cnpj,
+            "primary_contact_name": primary_contact_name,
+            "primary_email": primary_email,
+            "primary_phone": primary_phone,
+            "street_address": street_address,
+            "city": city,
+        }
+        supplier_data.update({key: value for key, value in optional_fields.items() if value})
 
         try:
             # Insert supplier
@@ -198,10 +276,10 @@ class SupplierOnboardingSubagent:
         client = get_supabase_client()
 
         try:
-            client.table(Tables.SUPPLIERS).update({
+            await execute_async(client.table(Tables.SUPPLIERS).update({
                 "telegram_chat_id": str(telegram_chat_id),
                 "updated_at": datetime.now().isoformat(),
-            }).eq("id", supplier_id).execute()
+            }).eq("id", supplier_id))
 
             return True
 
@@ -218,57 +296,4 @@ class SupplierOnboardingSubagent:
         Returns:
             Message to send to the supplier
         """
-        prompts = {
-            "start": """
-Olá! Bem-vindo ao Frepi!
-
-Vou te ajudar a se cadastrar como fornecedor.
-
-Por favor, me informe o **nome da sua empresa**:
-            """.strip(),
-
-            "ask_contact": """
-Ótimo! Agora preciso de algumas informações de contato:
-
-• **Nome do responsável**
-• **Telefone** (se diferente do WhatsApp)
-• **Email**
-
-Me envie essas informações:
-            """.strip(),
-
-            "ask_cnpj": """
-Perfeito! Por último, poderia informar o **CNPJ** da empresa?
-
-(Se preferir pular, digite "pular")
-            """.strip(),
-
-            "confirm": """
-Excelente! Vou confirmar os dados:
-
-📋 **Dados do Cadastro**
-• Empresa: {company_name}
-• Contato: {contact_name}
-• Telefone: {phone}
-• Email: {email}
-• CNPJ: {cnpj}
-
-Os dados estão corretos? (sim/não)
-            """.strip(),
-
-            "success": """
-✅ **Cadastro Concluído!**
-
-Bem-vindo ao Frepi, {company_name}!
-
-Agora você pode:
-1️⃣ Ver pedidos de cotação pendentes
-2️⃣ Enviar cotação de preços
-3️⃣ Confirmar pedido recebido
-4️⃣ Atualizar status de entrega
-
-Como posso ajudar?
-            """.strip(),
-        }
-
-        return prompts.get(step, prompts["start"])
+        return _ONBOARDING_PROMPTS.get(step, _ONBOARDING_PROMPTS["start"])
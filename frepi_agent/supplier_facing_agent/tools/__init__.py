@@ -19,6 +19,7 @@ from .order_management import (
 from .delivery_status import (
     get_active_deliveries,
     update_delivery_status,
+    bulk_update_delivery_status,
     report_delivery_issue,
     DeliveryInfo,
     DeliveryStatus,
@@ -41,6 +42,7 @@ __all__ = [
     # Delivery
     "get_active_deliveries",
     "update_delivery_status",
+    "bulk_update_delivery_status",
     "report_delivery_issue",
     "DeliveryInfo",
     "DeliveryStatus",
@@ -4,7 +4,9 @@ Delivery status tools for suppliers.
 Handles tracking and updating delivery status for orders.
 """
 
-from dataclasses import dataclass
+import asyncio
+import logging
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import Optional
@@ -12,9 +14,12 @@ from typing import Optional
 from frepi_agent.shared.supabase_client import (
     get_supabase_client,
     Tables,
-    update_one,
+    execute_async,
+    parse_timestamp,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class DeliveryStatus(str, Enum):
     """Delivery status options."""
@@ -25,7 +30,7 @@ class DeliveryStatus(str, Enum):
     FAILED = "failed"  # Falhou
 
 
-@dataclass
+@dataclass(slots=True)
 class DeliveryInfo:
     """Information about a delivery."""
 
@@ -38,6 +43,13 @@ class DeliveryInfo:
     line_items: list[dict]
     total_items: int
     notes: Optional[str]
+    # Display string, computed once from confirmed_delivery_date
+    formatted_delivery_date: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.formatted_delivery_date = (
+            self.confirmed_delivery_date.strftime("%d/%m/%Y") if self.confirmed_delivery_date else ""
+        )
 
     def to_dict(self) -> dict:
         """Convert to dictionary."""
@@ -54,19 +66,89 @@ class DeliveryInfo:
         }
 
 
-async def get_active_deliveries(supplier_id: int) -> list[DeliveryInfo]:
+# Database delivery_status values of active deliveries, mapped to the enum
+_DB_DELIVERY_STATUSES = {
+    "pending": DeliveryStatus.PREPARING,
+    "preparing": DeliveryStatus.PREPARING,
+    "in_transit": DeliveryStatus.IN_TRANSIT,
+    "delayed": DeliveryStatus.DELAYED,
+}
+
+
+def _parse_row_timestamp(row: dict, column: str) -> Optional[datetime]:
+    """Parse an optional timestamp column, logging (not raising) on bad values."""
+    value = row.get(column)
+    if not value:
+        return None
+    try:
+        return parse_timestamp(value)
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Invalid {column} on order {row.get('order_id')}: {value!r} ({e})")
+        return None
+
+
+# Columns of v_active_deliveries, in the order DeliveryInfo takes them
+_ACTIVE_DELIVERY_COLUMNS = (
+    "order_id, restaurant_id, restaurant_name, status, confirmed_delivery_date, "
+    "actual_delivery_date, line_items, total_items, notes"
+)
+
+# Active deliveries are fetched in pages of this size, several pages at a time
+ACTIVE_DELIVERIES_PAGE_SIZE = 20
+ACTIVE_DELIVERIES_PAGE_CONCURRENCY = 4
+
+# Default cap on the number of active deliveries listed
+ACTIVE_DELIVERIES_MAX_ROWS = 100
+
+
+def _fetch_active_delivery_page(
+    supplier_id: int,
+    start: int,
+    end: int,
+    with_count: bool = False,
+) -> tuple[list[dict], Optional[int]]:
     """
-    Get active deliveries for a supplier.
+    One page (rows start..end, inclusive) of a supplier's active deliveries.
 
-    Args:
-        supplier_id: The supplier's ID
+    Pages are fetched by separate queries, so rows are ordered by delivery
+    date and then by the unique order_id; ties in the date alone have no
+    stable order, and pages could overlap or miss rows.
 
-    Returns:
-        List of DeliveryInfo objects
+    Rows are shaped like v_active_deliveries rows. The total number of
+    active deliveries is returned too when with_count is set, else None.
     """
     client = get_supabase_client()
+    count = "exact" if with_count else None
+
+    try:
+        # This view should exist in Supabase:
+        # CREATE VIEW v_active_deliveries AS
+        #   SELECT po.order_id, po.supplier_id, po.restaurant_id, r.restaurant_name,
+        #     CASE po.delivery_status WHEN 'pending' THEN 'preparing'
+        #       ELSE po.delivery_status END AS status,
+        #     po.confirmed_delivery_date, po.actual_delivery_date,
+        #     po.line_items, po.total_items, po.notes
+        #   FROM purchase_orders po
+        #   LEFT JOIN restaurants r ON r.id = po.restaurant_id
+        #   WHERE po.order_status = 'confirmed'
+        #     AND po.delivery_status IN ('pending', 'preparing', 'in_transit', 'delayed');
+        # CREATE INDEX idx_purchase_orders_active_deliveries
+        #   ON purchase_orders (supplier_id, order_status, delivery_status,
+        #     confirmed_delivery_date, order_id);
+        result = (
+            client.table(Tables.ACTIVE_DELIVERIES)
+            .select(_ACTIVE_DELIVERY_COLUMNS, count=count)
+            .eq("supplier_id", supplier_id)
+            .order("confirmed_delivery_date")
+            .order("order_id")
+            .range(start, end)
+            .execute()
+        )
+        return result.data or [], result.count
+    except Exception as e:
+        # Fallback if the view doesn't exist
+        logger.warning(f"View {Tables.ACTIVE_DELIVERIES} failed, using fallback: {e}")
 
-    # Get confirmed orders that haven't been delivered yet
     result = (
         client.table(Tables.PURCHASE_ORDERS)
         .select("""
@@ -79,55 +161,96 @@ async def get_active_deliveries(supplier_id: int) -> list[DeliveryInfo]:
             total_items,
             notes,
             restaurants(restaurant_name)
-        """)
+        """, count=count)
         .eq("supplier_id", supplier_id)
         .eq("order_status", "confirmed")
-        .in_("delivery_status", ["pending", "preparing", "in_transit", "delayed"])
+        .in_("delivery_status", list(_DB_DELIVERY_STATUSES))
         .order("confirmed_delivery_date")
-        .limit(20)
+        .order("order_id")
+        .range(start, end)
         .execute()
     )
 
-    deliveries = []
-    for row in result.data or []:
-        restaurant = row.get("restaurants", {})
-
-        confirmed_date = None
-        if row.get("confirmed_delivery_date"):
-            try:
-                confirmed_date = datetime.fromisoformat(row["confirmed_delivery_date"].replace("Z", "+00:00"))
-            except:
-                pass
-
-        actual_date = None
-        if row.get("actual_delivery_date"):
-            try:
-                actual_date = datetime.fromisoformat(row["actual_delivery_date"].replace("Z", "+00:00"))
-            except:
-                pass
-
-        # Map database status to enum
-        status_map = {
-            "pending": DeliveryStatus.PREPARING,
-            "preparing": DeliveryStatus.PREPARING,
-            "in_transit": DeliveryStatus.IN_TRANSIT,
-            "delayed": DeliveryStatus.DELAYED,
-        }
-        status = status_map.get(row.get("delivery_status"), DeliveryStatus.PREPARING)
+    rows = result.data or []
+    for row in rows:
+        row["restaurant_name"] = (row.pop("restaurants", None) or {}).get("restaurant_name")
+        row["status"] = _DB_DELIVERY_STATUSES.get(
+            row.pop("delivery_status", None), DeliveryStatus.PREPARING
+        ).value
+    return rows, result.count
+
+
+async def _fetch_active_delivery_rows(supplier_id: int, max_rows: int) -> list[dict]:
+    """All active delivery rows of a supplier, up to max_rows."""
+    first_end = min(ACTIVE_DELIVERIES_PAGE_SIZE, max_rows) - 1
+    rows, total = await asyncio.to_thread(
+        _fetch_active_delivery_page, supplier_id, 0, first_end, True
+    )
+
+    total = min(total or 0, max_rows)
+    if total <= len(rows):
+        return rows
+
+    # The first page was full and there are more: fetch the rest concurrently
+    semaphore = asyncio.Semaphore(ACTIVE_DELIVERIES_PAGE_CONCURRENCY)
+
+    async def fetch_page(start: int) -> list[dict]:
+        end = min(start + ACTIVE_DELIVERIES_PAGE_SIZE, total) - 1
+        async with semaphore:
+            page, _ = await asyncio.to_thread(
+                _fetch_active_delivery_page, supplier_id, start, end
+            )
+        return page
+
+    pages = await asyncio.gather(*(
+        fetch_page(start)
+        for start in range(len(rows), total, ACTIVE_DELIVERIES_PAGE_SIZE)
+    ))
+    for page in pages:
+        rows.extend(page)
+    return rows
+
+
+async def get_active_deliveries(
+    supplier_id: int,
+    max_rows: int = ACTIVE_DELIVERIES_MAX_ROWS,
+) -> list[DeliveryInfo]:
+    """
+    Get active deliveries for a supplier.
 
-        deliveries.append(DeliveryInfo(
+    Args:
+        supplier_id: The supplier's ID
+        max_rows: Maximum number of deliveries to return
+
+    Returns:
+        List of DeliveryInfo objects, earliest delivery date first
+    """
+    rows = await _fetch_active_delivery_rows(supplier_id, max_rows)
+
+    return [
+        DeliveryInfo(
             order_id=row["order_id"],
-            restaurant_id=row.get("restaurant_id", 0),
-            restaurant_name=restaurant.get("restaurant_name", "Desconhecido"),
-            status=status,
-            confirmed_delivery_date=confirmed_date,
-            actual_delivery_date=actual_date,
-            line_items=row.get("line_items", []),
-            total_items=row.get("total_items", 0),
+            restaurant_id=row.get("restaurant_id") or 0,
+            restaurant_name=row.get("restaurant_name") or "Desconhecido",
+            status=DeliveryStatus(row.get("status") or DeliveryStatus.PREPARING),
+            confirmed_delivery_date=_parse_row_timestamp(row, "confirmed_delivery_date"),
+            actual_delivery_date=_parse_row_timestamp(row, "actual_delivery_date"),
+            line_items=row.get("line_items") or [],
+            total_items=row.get("total_items") or 0,
             notes=row.get("notes"),
-        ))
+        )
+        for row in rows
+    ]
 
-    return deliveries
+
+# Result message for each new delivery status
+_STATUS_UPDATE_MESSAGES = {
+    DeliveryStatus.PREPARING: "Status atualizado: Preparando pedido",
+    DeliveryStatus.IN_TRANSIT: "Status atualizado: Em trânsito",
+    DeliveryStatus.DELIVERED: "Entrega confirmada com sucesso!",
+    DeliveryStatus.DELAYED: "Status atualizado: Entrega atrasada",
+    DeliveryStatus.FAILED: "Status atualizado: Entrega falhou",
+}
 
 
 async def update_delivery_status(
@@ -148,25 +271,54 @@ async def update_delivery_status(
     Returns:
         Result dict with success status and message
     """
-    client = get_supabase_client()
-    now = datetime.now()
+    result = await bulk_update_delivery_status(supplier_id, [order_id], status, notes)
 
-    # Verify the order belongs to this supplier
-    order_result = (
-        client.table(Tables.PURCHASE_ORDERS)
-        .select("order_id, supplier_id, order_status")
-        .eq("order_id", order_id)
-        .eq("supplier_id", supplier_id)
-        .limit(1)
-        .execute()
-    )
+    if not result["success"]:
+        return {
+            "success": False,
+            "message": result["message"],
+        }
 
-    if not order_result.data:
+    if not result["updated"]:
         return {
             "success": False,
             "message": "Pedido não encontrado ou não pertence a este fornecedor.",
         }
 
+    return {
+        "success": True,
+        "message": _STATUS_UPDATE_MESSAGES.get(status, "Status atualizado"),
+        "order_id": order_id,
+        "new_status": status.value,
+    }
+
+
+async def bulk_update_delivery_status(
+    supplier_id: int,
+    order_ids: list[str],
+    status: DeliveryStatus,
+    notes: Optional[str] = None,
+) -> dict:
+    """
+    Update the delivery status of several orders in one write.
+
+    The supplier filter is part of the update itself, so orders that do
+    not belong to this supplier are simply not touched; the returned rows
+    tell which ones were updated.
+
+    Args:
+        supplier_id: The supplier's ID
+        order_ids: The order IDs
+        status: New delivery status
+        notes: Optional notes
+
+    Returns:
+        Result dict with success status, the updated order IDs and the
+        IDs that were not found for this supplier
+    """
+    client = get_supabase_client()
+    now = datetime.now()
+
     # Build update data
     update_data = {
         "delivery_status": status.value,
@@ -182,33 +334,29 @@ async def update_delivery_status(
         update_data["notes"] = notes
 
     try:
-        result = await update_one(
-            Tables.PURCHASE_ORDERS,
-            {"order_id": order_id},
-            update_data,
+        result = await execute_async(
+            client.table(Tables.PURCHASE_ORDERS)
+            .update(update_data)
+            .eq("supplier_id", supplier_id)
+            .in_("order_id", order_ids)
         )
-
-        status_messages = {
-            DeliveryStatus.PREPARING: "Status atualizado: Preparando pedido",
-            DeliveryStatus.IN_TRANSIT: "Status atualizado: Em trânsito",
-            DeliveryStatus.DELIVERED: "Entrega confirmada com sucesso!",
-            DeliveryStatus.DELAYED: "Status atualizado: Entrega atrasada",
-            DeliveryStatus.FAILED: "Status atualizado: Entrega falhou",
-        }
-
-        return {
-            "success": True,
-            "message": status_messages.get(status, "Status atualizado"),
-            "order_id": order_id,
-            "new_status": status.value,
-        }
-
     except Exception as e:
         return {
             "success": False,
             "message": f"Erro ao atualizar status: {str(e)}",
+            "updated": [],
+            "not_found": [],
         }
 
+    updated = {str(row["order_id"]) for row in result.data or []}
+    return {
+        "success": True,
+        "message": _STATUS_UPDATE_MESSAGES.get(status, "Status atualizado"),
+        "new_status": status.value,
+        "updated": [order_id for order_id in order_ids if str(order_id) in updated],
+        "not_found": [order_id for order_id in order_ids if str(order_id) not in updated],
+    }
+
 
 async def report_delivery_issue(
     supplier_id: int,
@@ -228,61 +376,99 @@ async def report_delivery_issue(
     Returns:
         Result dict with success status and message
     """
-    client = get_supabase_client()
     now = datetime.now()
-
-    # Verify the order belongs to this supplier
-    order_result = (
-        client.table(Tables.PURCHASE_ORDERS)
-        .select("order_id, supplier_id, issues_reported")
-        .eq("order_id", order_id)
-        .eq("supplier_id", supplier_id)
-        .limit(1)
-        .execute()
-    )
-
-    if not order_result.data:
-        return {
-            "success": False,
-            "message": "Pedido não encontrado ou não pertence a este fornecedor.",
-        }
-
-    order = order_result.data[0]
-    existing_issues = order.get("issues_reported") or []
-
-    # Add new issue
     new_issue = {
         "type": issue_type,
         "description": description,
         "reported_at": now.isoformat(),
         "reported_by": "supplier",
     }
-    existing_issues.append(new_issue)
-
-    # Update the order
-    update_data = {
-        "issues_reported": existing_issues,
-        "delivery_status": "delayed" if issue_type == "delay" else "failed",
-        "issue_resolved": False,
-        "updated_at": now.isoformat(),
-    }
+    delivery_status = "delayed" if issue_type == "delay" else "failed"
 
     try:
-        result = await update_one(
-            Tables.PURCHASE_ORDERS,
-            {"order_id": order_id},
-            update_data,
+        found = await asyncio.to_thread(
+            _append_issue, supplier_id, order_id, new_issue, delivery_status
         )
-
+    except Exception as e:
         return {
-            "success": True,
-            "message": "Problema reportado. O restaurante será notificado.",
-            "order_id": order_id,
-            "issue_type": issue_type,
+            "success": False,
+            "message": f"Erro ao reportar problema: {str(e)}",
         }
 
-    except Exception as e:
+    if not found:
         return {
             "success": False,
-            "message": f"Erro ao reportar problema: {str(e)}",
+            "message": "Pedido não encontrado ou não pertence a este fornecedor.",
         }
+
+    return {
+        "success": True,
+        "message": "Problema reportado. O restaurante será notificado.",
+        "order_id": order_id,
+        "issue_type": issue_type,
+    }
+
+
+def _append_issue(
+    supplier_id: int,
+    order_id: str,
+    issue: dict,
+    delivery_status: str,
+) -> bool:
+    """Append an issue to the supplier's order; False if no such order."""
+    client = get_supabase_client()
+
+    try:
+        # This function should exist in Supabase:
+        # CREATE OR REPLACE FUNCTION append_issue(
+        #   p_order_id text, p_supplier_id bigint, p_issue jsonb, p_delivery_status text
+        # ) RETURNS boolean AS $$
+        #   WITH updated AS (
+        #     UPDATE purchase_orders SET
+        #       issues_reported = COALESCE(issues_reported, '[]'::jsonb) || jsonb_build_array(p_issue),
+        #       delivery_status = p_delivery_status,
+        #       issue_resolved = false,
+        #       updated_at = now()
+        #     WHERE order_id::text = p_order_id AND supplier_id = p_supplier_id
+        #     RETURNING 1
+        #   )
+        #   SELECT EXISTS (SELECT 1 FROM updated);
+        # $$ LANGUAGE sql;
+        result = client.rpc("append_issue", {
+            "p_order_id": str(order_id),
+            "p_supplier_id": supplier_id,
+            "p_issue": issue,
+            "p_delivery_status": delivery_status,
+        }).execute()
+        return bool(result.data)
+    except Exception as e:
+        # Fallback if RPC doesn't exist (read-modify-write, not race-free)
+        logger.warning(f"RPC append_issue failed, using fallback: {e}")
+
+    order_result = (
+        client.table(Tables.PURCHASE_ORDERS)
+        .select("issues_reported")
+        .eq("order_id", order_id)
+        .eq("supplier_id", supplier_id)
+        .limit(1)
+        .execute()
+    )
+    if not order_result.data:
+        return False
+
+    issues = order_result.data[0].get("issues_reported") or []
+    issues.append(issue)
+
+    result = (
+        client.table(Tables.PURCHASE_ORDERS)
+        .update({
+            "issues_reported": issues,
+            "delivery_status": delivery_status,
+            "issue_resolved": False,
+            "updated_at": issue["reported_at"],
+        })
+        .eq("order_id", order_id)
+        .eq("supplier_id", supplier_id)
+        .execute()
+    )
+    return bool(result.data)
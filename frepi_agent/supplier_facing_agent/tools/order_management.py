@@ -4,19 +4,22 @@ Order management tools for suppliers.
 Handles viewing, confirming, and rejecting purchase orders.
 """
 
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Optional
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Optional
 
+from frepi_agent.shared import db_pool
 from frepi_agent.shared.supabase_client import (
     get_supabase_client,
     Tables,
+    execute_async,
+    parse_timestamp,
     fetch_many,
-    update_one,
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class PendingOrder:
     """A pending order awaiting supplier confirmation."""
 
@@ -29,6 +32,13 @@ class PendingOrder:
     total_items: int
     total_amount: float
     notes: Optional[str]
+    # Display strings, computed once from the fields above
+    formatted_date: str = field(init=False, repr=False)
+    formatted_total: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.formatted_date = self.order_date.strftime("%d/%m/%Y") if self.order_date else ""
+        self.formatted_total = f"{self.total_amount:,.2f}"
 
     def to_dict(self) -> dict:
         """Convert to dictionary."""
@@ -45,6 +55,69 @@ class PendingOrder:
         }
 
 
+# Pending orders per supplier, reused when the list is reopened shortly after.
+# confirm_order and reject_order drop the supplier's entry.
+PENDING_CACHE_TTL_SECONDS = 90
+_pending_cache: dict[int, tuple[float, list[PendingOrder]]] = {}
+
+
+def invalidate_pending_orders_cache(supplier_id: int):
+    """Drop the cached pending orders of a supplier (e.g. after confirming one)."""
+    _pending_cache.pop(supplier_id, None)
+
+
+# Read-only default for orders whose restaurant embed is missing
+_EMPTY: dict = {}
+
+# Order statuses that still await the supplier's confirmation.
+# The pending-order lookups (REST and pool) are served by this index:
+# CREATE INDEX CONCURRENTLY idx_po_supplier_status_date
+#   ON purchase_orders (supplier_id, order_status, order_date DESC)
+#   INCLUDE (order_id, total_items, total_amount);
+PENDING_ORDER_STATUSES = ["pending", "awaiting_confirmation", "submitted"]
+
+# PostgREST projection of a pending order with its restaurant name
+_PENDING_ORDER_SELECT = (
+    "order_id,restaurant_id,order_date,requested_delivery_date,line_items,"
+    "total_items,total_amount,notes,restaurants(restaurant_name)"
+)
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    """Timestamp column as a datetime (the Postgres pool already returns one)."""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    try:
+        return parse_timestamp(value)
+    except (ValueError, TypeError):
+        return None
+
+
+async def _fetch_pending_order_rows_pg(supplier_id: int) -> list[dict]:
+    """Pending orders through the Postgres pool, shaped like the REST rows."""
+    rows = await db_pool.fetch(
+        """
+        SELECT po.order_id, po.restaurant_id, po.order_date, po.requested_delivery_date,
+               po.line_items, po.total_items, po.total_amount, po.notes, r.restaurant_name
+        FROM purchase_orders po
+        LEFT JOIN restaurants r ON r.id = po.restaurant_id
+        WHERE po.supplier_id = $1 AND po.order_status = ANY($2::text[])
+        ORDER BY po.order_date DESC
+        LIMIT 20
+        """,
+        supplier_id,
+        PENDING_ORDER_STATUSES,
+    )
+    for row in rows:
+        # Same shape as the PostgREST embedded join
+        row["restaurants"] = {"restaurant_name": row.pop("restaurant_name")}
+    return rows
+
+
 async def get_pending_orders(supplier_id: int) -> list[PendingOrder]:
     """
     Get orders pending confirmation from this supplier.
@@ -55,46 +128,34 @@ async def get_pending_orders(supplier_id: int) -> list[PendingOrder]:
     Returns:
         List of PendingOrder objects
     """
-    client = get_supabase_client()
-
-    # Get orders with status 'pending' or 'awaiting_confirmation'
-    result = (
-        client.table(Tables.PURCHASE_ORDERS)
-        .select("""
-            order_id,
-            restaurant_id,
-            order_date,
-            requested_delivery_date,
-            line_items,
-            total_items,
-            total_amount,
-            notes,
-            restaurants(restaurant_name)
-        """)
-        .eq("supplier_id", supplier_id)
-        .in_("order_status", ["pending", "awaiting_confirmation", "submitted"])
-        .order("order_date", desc=True)
-        .limit(20)
-        .execute()
-    )
+    now = time.monotonic()
+    cached = _pending_cache.get(supplier_id)
+    if cached and now - cached[0] < PENDING_CACHE_TTL_SECONDS:
+        # A copy, so callers can't alter the cached list
+        return list(cached[1])
+
+    if db_pool.get_db_pool() is not None:
+        rows = await _fetch_pending_order_rows_pg(supplier_id)
+    else:
+        client = get_supabase_client()
+
+        # Get orders with status 'pending' or 'awaiting_confirmation'
+        result = await execute_async(
+            client.table(Tables.PURCHASE_ORDERS)
+            .select(_PENDING_ORDER_SELECT)
+            .eq("supplier_id", supplier_id)
+            .in_("order_status", PENDING_ORDER_STATUSES)
+            .order("order_date", desc=True)
+            .limit(20)
+        )
+        rows = result.data or []
 
     orders = []
-    for row in result.data or []:
-        restaurant = row.get("restaurants", {})
-
-        order_date = None
-        if row.get("order_date"):
-            try:
-                order_date = datetime.fromisoformat(row["order_date"].replace("Z", "+00:00"))
-            except:
-                pass
-
-        delivery_date = None
-        if row.get("requested_delivery_date"):
-            try:
-                delivery_date = datetime.fromisoformat(row["requested_delivery_date"].replace("Z", "+00:00"))
-            except:
-                pass
+    for row in rows:
+        restaurant = row.get("restaurants") or _EMPTY
+
+        order_date = _as_datetime(row.get("order_date"))
+        delivery_date = _as_datetime(row.get("requested_delivery_date"))
 
         orders.append(PendingOrder(
             order_id=row["order_id"],
@@ -108,7 +169,40 @@ async def get_pending_orders(supplier_id: int) -> list[PendingOrder]:
             notes=row.get("notes"),
         ))
 
-    return orders
+    _pending_cache[supplier_id] = (now, orders)
+    return list(orders)
+
+
+async def _unmatched_order_result(supplier_id: int, order_id: str, action: str) -> dict:
+    """
+    Failure result for a status update that matched no order.
+
+    Looks the order up to tell a missing order apart from one that is no
+    longer pending.
+
+    Args:
+        supplier_id: The supplier's ID
+        order_id: The order ID
+        action: Past participle for the message ("confirmado", "rejeitado")
+    """
+    client = get_supabase_client()
+    order_result = await execute_async(
+        client.table(Tables.PURCHASE_ORDERS)
+        .select("order_status")
+        .eq("order_id", order_id)
+        .eq("supplier_id", supplier_id)
+        .limit(1)
+    )
+
+    if not order_result.data:
+        return {
+            "success": False,
+            "message": "Pedido não encontrado ou não pertence a este fornecedor.",
+        }
+    return {
+        "success": False,
+        "message": f"Pedido não pode ser {action}. Status atual: {order_result.data[0].get('order_status')}",
+    }
 
 
 async def confirm_order(
@@ -132,29 +226,6 @@ async def confirm_order(
     client = get_supabase_client()
     now = datetime.now()
 
-    # Verify the order belongs to this supplier
-    order_result = (
-        client.table(Tables.PURCHASE_ORDERS)
-        .select("order_id, supplier_id, order_status")
-        .eq("order_id", order_id)
-        .eq("supplier_id", supplier_id)
-        .limit(1)
-        .execute()
-    )
-
-    if not order_result.data:
-        return {
-            "success": False,
-            "message": "Pedido não encontrado ou não pertence a este fornecedor.",
-        }
-
-    order = order_result.data[0]
-    if order.get("order_status") not in ["pending", "awaiting_confirmation", "submitted"]:
-        return {
-            "success": False,
-            "message": f"Pedido não pode ser confirmado. Status atual: {order.get('order_status')}",
-        }
-
     # Update the order
     update_data = {
         "order_status": "confirmed",
@@ -169,12 +240,18 @@ async def confirm_order(
         update_data["notes"] = notes
 
     try:
-        result = await update_one(
-            Tables.PURCHASE_ORDERS,
-            {"order_id": order_id},
-            update_data,
+        # Only the supplier's own orders that still await confirmation match
+        result = await execute_async(
+            client.table(Tables.PURCHASE_ORDERS)
+            .update(update_data)
+            .eq("order_id", order_id)
+            .eq("supplier_id", supplier_id)
+            .in_("order_status", PENDING_ORDER_STATUSES)
         )
 
+        if not result.data:
+            return await _unmatched_order_result(supplier_id, order_id, "confirmado")
+
         return {
             "success": True,
             "message": "Pedido confirmado com sucesso!",
@@ -186,6 +263,9 @@ async def confirm_order(
             "success": False,
             "message": f"Erro ao confirmar pedido: {str(e)}",
         }
+    finally:
+        # Even a failed update may mean the order is no longer pending
+        invalidate_pending_orders_cache(supplier_id)
 
 
 async def reject_order(
@@ -207,22 +287,6 @@ async def reject_order(
     client = get_supabase_client()
     now = datetime.now()
 
-    # Verify the order belongs to this supplier
-    order_result = (
-        client.table(Tables.PURCHASE_ORDERS)
-        .select("order_id, supplier_id, order_status")
-        .eq("order_id", order_id)
-        .eq("supplier_id", supplier_id)
-        .limit(1)
-        .execute()
-    )
-
-    if not order_result.data:
-        return {
-            "success": False,
-            "message": "Pedido não encontrado ou não pertence a este fornecedor.",
-        }
-
     # Update the order
     update_data = {
         "order_status": "rejected",
@@ -232,12 +296,18 @@ async def reject_order(
     }
 
     try:
-        result = await update_one(
-            Tables.PURCHASE_ORDERS,
-            {"order_id": order_id},
-            update_data,
+        # Only the supplier's own orders that still await confirmation match
+        result = await execute_async(
+            client.table(Tables.PURCHASE_ORDERS)
+            .update(update_data)
+            .eq("order_id", order_id)
+            .eq("supplier_id", supplier_id)
+            .in_("order_status", PENDING_ORDER_STATUSES)
         )
 
+        if not result.data:
+            return await _unmatched_order_result(supplier_id, order_id, "rejeitado")
+
         return {
             "success": True,
             "message": "Pedido rejeitado.",
@@ -250,3 +320,6 @@ async def reject_order(
             "success": False,
             "message": f"Erro ao rejeitar pedido: {str(e)}",
         }
+    finally:
+        # Even a failed update may mean the order is no longer pending
+        invalidate_pending_orders_cache(supplier_id)
@@ -4,18 +4,40 @@ Price submission tools for suppliers.
 Handles submitting and updating prices for products.
 """
 
+import asyncio
+import logging
+import time
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
+from frepi_agent.shared import db_pool
 from frepi_agent.shared.supabase_client import (
     get_supabase_client,
     Tables,
-    insert_one,
+    execute_async,
 )
+from .quotation_request import invalidate_pending_quotations_cache
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+
+# Short-lived cache of get_product_for_quotation results, keyed by
+# (supplier_id, normalized product name). Misses expire sooner so a newly
+# mapped product shows up quickly.
+PRODUCT_CACHE_TTL_SECONDS = 60
+PRODUCT_CACHE_MISS_TTL_SECONDS = 15
+PRODUCT_CACHE_MAX_SIZE = 1_024
+_product_cache: dict[tuple[int, str], tuple[float, Optional[dict]]] = {}
+
+
+def invalidate_product_cache(supplier_id: int):
+    """Drop cached product lookups of a supplier (e.g. after a price change)."""
+    for key in [key for key in _product_cache if key[0] == supplier_id]:
+        del _product_cache[key]
+
+
+@dataclass(slots=True)
 class PriceSubmission:
     """Result of a price submission."""
 
@@ -62,20 +84,29 @@ async def submit_price(
     Returns:
         PriceSubmission result
     """
-    client = get_supabase_client()
     now = datetime.now()
 
-    # Verify the supplier owns this product mapping
-    smp_result = (
-        client.table(Tables.SUPPLIER_MAPPED_PRODUCTS)
-        .select("id, supplier_id, supplier_product_name, master_list(product_name)")
-        .eq("id", supplier_mapped_product_id)
-        .eq("supplier_id", supplier_id)
-        .limit(1)
-        .execute()
-    )
+    try:
+        product_name = await asyncio.to_thread(
+            _record_price, supplier_id, supplier_mapped_product_id, unit_price, unit, notes, now
+        )
+    except Exception as e:
+        return PriceSubmission(
+            success=False,
+            supplier_mapped_product_id=supplier_mapped_product_id,
+            product_name="",
+            unit_price=unit_price,
+            unit=unit,
+            effective_date=now,
+            message=f"Erro ao registrar preço: {str(e)}",
+        )
 
-    if not smp_result.data:
+    # The cached lookups carry current_unit_price, and a priced product
+    # leaves the pending quotations
+    invalidate_product_cache(supplier_id)
+    invalidate_pending_quotations_cache(supplier_id)
+
+    if product_name is None:
         return PriceSubmission(
             success=False,
             supplier_mapped_product_id=supplier_mapped_product_id,
@@ -86,13 +117,97 @@ async def submit_price(
             message="Produto não encontrado ou não pertence a este fornecedor.",
         )
 
+    return PriceSubmission(
+        success=True,
+        supplier_mapped_product_id=supplier_mapped_product_id,
+        product_name=product_name,
+        unit_price=unit_price,
+        unit=unit,
+        effective_date=now,
+        message=f"Preço de R$ {unit_price:.2f}/{unit} registrado com sucesso!",
+    )
+
+
+def _record_price(
+    supplier_id: int,
+    supplier_mapped_product_id: int,
+    unit_price: float,
+    unit: str,
+    notes: Optional[str],
+    now: datetime,
+) -> Optional[str]:
+    """
+    Make the new price the current one for the supplier's product.
+
+    Returns:
+        The product name, or None if the supplier does not own the product
+    """
+    client = get_supabase_client()
+
+    try:
+        # This function should exist in Supabase:
+        # CREATE OR REPLACE FUNCTION submit_price_rpc(
+        #   p_supplier_id bigint, p_smp_id bigint, p_unit_price numeric,
+        #   p_unit text, p_notes text, p_effective_date timestamptz
+        # ) RETURNS text AS $$
+        # DECLARE
+        #   v_product_name text;
+        # BEGIN
+        #   SELECT COALESCE(ml.product_name, smp.supplier_product_name, 'Produto')
+        #   INTO v_product_name
+        #   FROM supplier_mapped_products smp
+        #   LEFT JOIN master_list ml ON ml.id = smp.master_list_id
+        #   WHERE smp.id = p_smp_id AND smp.supplier_id = p_supplier_id
+        #   FOR UPDATE OF smp;
+        #   IF NOT FOUND THEN
+        #     RETURN NULL;
+        #   END IF;
+        #   UPDATE pricing_history SET end_date = p_effective_date
+        #   WHERE supplier_mapped_product_id = p_smp_id AND end_date IS NULL;
+        #   INSERT INTO pricing_history (supplier_id, supplier_mapped_product_id, unit_price,
+        #     unit, effective_date, end_date, data_source, notes)
+        #   VALUES (p_supplier_id, p_smp_id, p_unit_price, p_unit, p_effective_date,
+        #     NULL, 'supplier_submission', p_notes);
+        #   UPDATE supplier_mapped_products
+        #   SET current_unit_price = p_unit_price, price_last_updated = p_effective_date
+        #   WHERE id = p_smp_id;
+        #   RETURN v_product_name;
+        # END;
+        # $$ LANGUAGE plpgsql;
+        result = client.rpc("submit_price_rpc", {
+            "p_supplier_id": supplier_id,
+            "p_smp_id": supplier_mapped_product_id,
+            "p_unit_price": unit_price,
+            "p_unit": unit,
+            "p_notes": notes,
+            "p_effective_date": now.isoformat(),
+        }).execute()
+        return result.data
+    except Exception as e:
+        # Fallback if RPC doesn't exist (separate writes, not atomic)
+        logger.warning(f"RPC submit_price_rpc failed, using fallback: {e}")
+
+    # Verify the supplier owns this product mapping
+    smp_result = (
+        client.table(Tables.SUPPLIER_MAPPED_PRODUCTS)
+        .select("id, supplier_product_name, master_list(product_name)")
+        .eq("id", supplier_mapped_product_id)
+        .eq("supplier_id", supplier_id)
+        .limit(1)
+        .execute()
+    )
+
+    if not smp_result.data:
+        return None
+
     smp = smp_result.data[0]
     product_name = (
-        smp.get("master_list", {}).get("product_name")
+        (smp.get("master_list") or {}).get("product_name")
         or smp.get("supplier_product_name", "Produto")
     )
 
-    # Close any existing active price
+    # Close any existing active price (at most one: idx_ph_active_price is
+    # unique on supplier_mapped_product_id WHERE end_date IS NULL)
     client.table(Tables.PRICING_HISTORY).update(
         {"end_date": now.isoformat()}
     ).eq(
@@ -102,49 +217,28 @@ async def submit_price(
     ).execute()
 
     # Insert new price
-    try:
-        new_price = await insert_one(
-            Tables.PRICING_HISTORY,
-            {
-                "supplier_id": supplier_id,
-                "supplier_mapped_product_id": supplier_mapped_product_id,
-                "unit_price": unit_price,
-                "unit": unit,
-                "effective_date": now.isoformat(),
-                "end_date": None,
-                "data_source": "supplier_submission",
-                "notes": notes,
-            }
-        )
+    result = client.table(Tables.PRICING_HISTORY).insert({
+        "supplier_id": supplier_id,
+        "supplier_mapped_product_id": supplier_mapped_product_id,
+        "unit_price": unit_price,
+        "unit": unit,
+        "effective_date": now.isoformat(),
+        "end_date": None,
+        "data_source": "supplier_submission",
+        "notes": notes,
+    }).execute()
+    if not result.data:
+        raise Exception(f"Insert failed: {result}")
 
-        # Update the current price in supplier_mapped_products
-        client.table(Tables.SUPPLIER_MAPPED_PRODUCTS).update(
-            {
-                "current_unit_price": unit_price,
-                "price_last_updated": now.isoformat(),
-            }
-        ).eq("id", supplier_mapped_product_id).execute()
+    # Update the current price in supplier_mapped_products
+    client.table(Tables.SUPPLIER_MAPPED_PRODUCTS).update(
+        {
+            "current_unit_price": unit_price,
+            "price_last_updated": now.isoformat(),
+        }
+    ).eq("id", supplier_mapped_product_id).execute()
 
-        return PriceSubmission(
-            success=True,
-            supplier_mapped_product_id=supplier_mapped_product_id,
-            product_name=product_name,
-            unit_price=unit_price,
-            unit=unit,
-            effective_date=now,
-            message=f"Preço de R$ {unit_price:.2f}/{unit} registrado com sucesso!",
-        )
-
-    except Exception as e:
-        return PriceSubmission(
-            success=False,
-            supplier_mapped_product_id=supplier_mapped_product_id,
-            product_name=product_name,
-            unit_price=unit_price,
-            unit=unit,
-            effective_date=now,
-            message=f"Erro ao registrar preço: {str(e)}",
-        )
+    return product_name
 
 
 async def get_product_for_quotation(
@@ -154,6 +248,8 @@ async def get_product_for_quotation(
     """
     Search for a product to quote by name.
 
+    Results (including "not found") are cached briefly per supplier and name.
+
     Args:
         supplier_id: The supplier's ID
         product_name: Product name to search for
@@ -161,10 +257,34 @@ async def get_product_for_quotation(
     Returns:
         Product info dict or None if not found
     """
+    key = (supplier_id, product_name.strip().lower())
+    now = time.monotonic()
+    cached = _product_cache.get(key)
+    if cached:
+        cached_at, product = cached
+        ttl = PRODUCT_CACHE_TTL_SECONDS if product is not None else PRODUCT_CACHE_MISS_TTL_SECONDS
+        if now - cached_at < ttl:
+            return product
+
+    product = await _find_product_for_quotation(supplier_id, product_name)
+
+    if len(_product_cache) >= PRODUCT_CACHE_MAX_SIZE:
+        # Dicts keep insertion order, so the first key is the oldest
+        _product_cache.pop(next(iter(_product_cache)))
+    _product_cache.pop(key, None)
+    _product_cache[key] = (now, product)
+    return product
+
+
+async def _find_product_for_quotation(supplier_id: int, product_name: str) -> Optional[dict]:
+    """Uncached product search for get_product_for_quotation."""
+    if db_pool.get_db_pool() is not None:
+        return await _find_product_for_quotation_pg(supplier_id, product_name)
+
     client = get_supabase_client()
 
     # Search in supplier's mapped products
-    result = (
+    result = await execute_async(
         client.table(Tables.SUPPLIER_MAPPED_PRODUCTS)
         .select("""
             id,
@@ -176,12 +296,14 @@ async def get_product_for_quotation(
         .eq("is_active", True)
         .ilike("supplier_product_name", f"%{product_name}%")
         .limit(5)
-        .execute()
     )
 
     if not result.data:
-        # Try searching in master_list product_name
-        result = (
+        # Try searching in master_list product_name (filtered in the database;
+        # both name columns are served by pg_trgm GIN indexes:
+        # CREATE INDEX ON supplier_mapped_products USING gin (supplier_product_name gin_trgm_ops);
+        # CREATE INDEX ON master_list USING gin (product_name gin_trgm_ops);)
+        result = await execute_async(
             client.table(Tables.SUPPLIER_MAPPED_PRODUCTS)
             .select("""
                 id,
@@ -191,17 +313,56 @@ async def get_product_for_quotation(
             """)
             .eq("supplier_id", supplier_id)
             .eq("is_active", True)
-            .execute()
+            .ilike("master_list.product_name", f"%{product_name}%")
+            .limit(1)
         )
 
-        # Filter by master_list product name
-        matching = [
-            smp for smp in (result.data or [])
-            if product_name.lower() in smp.get("master_list", {}).get("product_name", "").lower()
-        ]
+    return result.data[0] if result.data else None
+
 
-        if matching:
-            return matching[0]
+async def _find_product_for_quotation_pg(
+    supplier_id: int, product_name: str
+) -> Optional[dict]:
+    """
+    Same search as the REST path in one round trip, preferring a match on the
+    supplier's own product name over one on the master list name.
+    """
+    row = await db_pool.fetchrow(
+        """
+        SELECT smp.id,
+               smp.supplier_product_name,
+               smp.current_unit_price::float8 AS current_unit_price,
+               ml.id AS ml_id,
+               ml.product_name AS ml_product_name,
+               ml.brand AS ml_brand,
+               ml.specifications AS ml_specifications
+        FROM supplier_mapped_products smp
+        LEFT JOIN master_list ml ON ml.id = smp.master_list_id
+        WHERE smp.supplier_id = $1
+          AND smp.is_active
+          AND (smp.supplier_product_name ILIKE '%' || $2 || '%'
+               OR ml.product_name ILIKE '%' || $2 || '%')
+        ORDER BY (smp.supplier_product_name ILIKE '%' || $2 || '%') DESC
+        LIMIT 1
+        """,
+        supplier_id,
+        product_name,
+    )
+    if row is None:
         return None
 
-    return result.data[0] if result.data else None
+    # Same shape as the PostgREST embedded join
+    master_list = None
+    if row["ml_id"] is not None:
+        master_list = {
+            "id": row["ml_id"],
+            "product_name": row["ml_product_name"],
+            "brand": row["ml_brand"],
+            "specifications": row["ml_specifications"],
+        }
+    return {
+        "id": row["id"],
+        "supplier_product_name": row["supplier_product_name"],
+        "current_unit_price": row["current_unit_price"],
+        "master_list": master_list,
+    }
@@ -4,18 +4,34 @@ Quotation request tools for suppliers.
 Handles fetching pending quotation requests from restaurants.
 """
 
+import asyncio
+import time
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
+from frepi_agent.shared import db_pool
 from frepi_agent.shared.supabase_client import (
     get_supabase_client,
     Tables,
+    execute_async,
     fetch_many,
 )
 
 
-@dataclass
+# Read-only default for a missing embedded master_list/restaurants row
+_EMPTY: dict = {}
+
+# PostgREST projection of a supplier-mapped product with its master list
+# product and restaurant, shared by the list and detail queries
+_QUOTATION_SELECT = (
+    "id,master_list_id,supplier_product_name,"
+    "master_list!inner(id,product_name,brand,specifications,restaurant_id,"
+    "restaurants(id,restaurant_name))"
+)
+
+
+@dataclass(slots=True)
 class QuotationRequest:
     """A quotation request from a restaurant."""
 
@@ -46,19 +62,24 @@ class QuotationRequest:
         }
 
 
-async def get_pending_quotations(supplier_id: int) -> list[QuotationRequest]:
-    """
-    Get pending quotation requests for a supplier.
+# Product ids per open-price lookup in _fetch_unpriced_products. Keeps the
+# GET URL short and each response well under PostgREST's max-rows (1000 by
+# default), past which rows would be dropped without an error.
+PRICED_LOOKUP_CHUNK_SIZE = 200
 
-    Finds products that restaurants want to purchase from this supplier
-    but don't have current pricing for.
+# Pending quotations per supplier, reused when the list is reopened shortly
+# after. submit_price drops the supplier's entry.
+PENDING_CACHE_TTL_SECONDS = 90
+_pending_cache: dict[int, tuple[float, list[QuotationRequest]]] = {}
 
-    Args:
-        supplier_id: The supplier's ID
 
-    Returns:
-        List of QuotationRequest objects
-    """
+def invalidate_pending_quotations_cache(supplier_id: int):
+    """Drop the cached pending quotations of a supplier (e.g. after a price change)."""
+    _pending_cache.pop(supplier_id, None)
+
+
+def _fetch_unpriced_products(supplier_id: int) -> list[dict]:
+    """Active mapped products of a supplier that have no current price."""
     client = get_supabase_client()
 
     # Get supplier's mapped products that need pricing
@@ -70,19 +91,7 @@ async def get_pending_quotations(supplier_id: int) -> list[QuotationRequest]:
     # Query for products this supplier can provide
     smp_result = (
         client.table(Tables.SUPPLIER_MAPPED_PRODUCTS)
-        .select("""
-            id,
-            master_list_id,
-            supplier_product_name,
-            master_list!inner(
-                id,
-                product_name,
-                brand,
-                specifications,
-                restaurant_id,
-                restaurants(id, restaurant_name)
-            )
-        """)
+        .select(_QUOTATION_SELECT)
         .eq("supplier_id", supplier_id)
         .eq("is_active", True)
         .execute()
@@ -91,38 +100,101 @@ async def get_pending_quotations(supplier_id: int) -> list[QuotationRequest]:
     if not smp_result.data:
         return []
 
-    # Find products without current pricing
-    quotations = []
-    for smp in smp_result.data:
-        # Check if there's a current price
+    # Find products without current pricing, PRICED_LOOKUP_CHUNK_SIZE ids per
+    # lookup. Served by this partial index, which also allows one open price
+    # per product (so no lookup returns more rows than it was given ids):
+    # CREATE UNIQUE INDEX CONCURRENTLY idx_ph_active_price
+    #   ON pricing_history (supplier_mapped_product_id) WHERE end_date IS NULL;
+    smp_ids = [smp["id"] for smp in smp_result.data]
+    priced = set()
+    for start in range(0, len(smp_ids), PRICED_LOOKUP_CHUNK_SIZE):
         price_result = (
             client.table(Tables.PRICING_HISTORY)
-            .select("id")
-            .eq("supplier_mapped_product_id", smp["id"])
+            .select("supplier_mapped_product_id")
+            .in_("supplier_mapped_product_id", smp_ids[start:start + PRICED_LOOKUP_CHUNK_SIZE])
             .is_("end_date", "null")
-            .limit(1)
             .execute()
         )
+        priced.update(row["supplier_mapped_product_id"] for row in price_result.data or [])
+    return [smp for smp in smp_result.data if smp["id"] not in priced]
+
+
+async def _fetch_unpriced_products_pg(supplier_id: int) -> list[dict]:
+    """Unpriced products through the Postgres pool, shaped like the REST rows."""
+    rows = await db_pool.fetch(
+        """
+        SELECT smp.id, smp.master_list_id, smp.supplier_product_name,
+               ml.product_name, ml.brand, ml.specifications, ml.restaurant_id,
+               r.restaurant_name
+        FROM supplier_mapped_products smp
+        JOIN master_list ml ON ml.id = smp.master_list_id
+        LEFT JOIN restaurants r ON r.id = ml.restaurant_id
+        WHERE smp.supplier_id = $1 AND smp.is_active
+          AND NOT EXISTS (
+            SELECT 1 FROM pricing_history ph
+            WHERE ph.supplier_mapped_product_id = smp.id AND ph.end_date IS NULL
+          )
+        """,
+        supplier_id,
+    )
+    for row in rows:
+        # Same shape as the PostgREST embedded join
+        restaurant_name = row.pop("restaurant_name")
+        row["master_list"] = {
+            "id": row["master_list_id"],
+            "product_name": row.pop("product_name"),
+            "brand": row.pop("brand"),
+            "specifications": row.pop("specifications"),
+            "restaurant_id": row["restaurant_id"],
+            "restaurants": {"id": row.pop("restaurant_id"), "restaurant_name": restaurant_name},
+        }
+    return rows
 
-        # If no current price, add to quotation requests
-        if not price_result.data:
-            master = smp.get("master_list", {})
-            restaurant = master.get("restaurants", {})
 
-            quotations.append(QuotationRequest(
-                id=smp["id"],
-                restaurant_id=master.get("restaurant_id", 0),
-                restaurant_name=restaurant.get("restaurant_name", "Desconhecido"),
-                product_id=master.get("id", 0),
-                product_name=master.get("product_name") or smp.get("supplier_product_name", ""),
-                quantity=None,  # Will be filled from purchase order if exists
-                unit=None,
-                specifications=master.get("specifications"),
-                requested_at=datetime.now(),  # Placeholder
-                notes=None,
-            ))
+async def get_pending_quotations(supplier_id: int) -> list[QuotationRequest]:
+    """
+    Get pending quotation requests for a supplier.
 
-    return quotations
+    Finds products that restaurants want to purchase from this supplier
+    but don't have current pricing for.
+
+    Args:
+        supplier_id: The supplier's ID
+
+    Returns:
+        List of QuotationRequest objects
+    """
+    now = time.monotonic()
+    cached = _pending_cache.get(supplier_id)
+    if cached and now - cached[0] < PENDING_CACHE_TTL_SECONDS:
+        # A copy, so callers can't alter the cached list
+        return list(cached[1])
+
+    if db_pool.get_db_pool() is not None:
+        unpriced = await _fetch_unpriced_products_pg(supplier_id)
+    else:
+        unpriced = await asyncio.to_thread(_fetch_unpriced_products, supplier_id)
+
+    quotations = []
+    for smp in unpriced:
+        master = smp.get("master_list") or _EMPTY
+        restaurant = master.get("restaurants") or _EMPTY
+
+        quotations.append(QuotationRequest(
+            id=smp["id"],
+            restaurant_id=master.get("restaurant_id", 0),
+            restaurant_name=restaurant.get("restaurant_name", "Desconhecido"),
+            product_id=master.get("id", 0),
+            product_name=master.get("product_name") or smp.get("supplier_product_name", ""),
+            quantity=None,  # Will be filled from purchase order if exists
+            unit=None,
+            specifications=master.get("specifications"),
+            requested_at=datetime.now(),  # Placeholder
+            notes=None,
+        ))
+
+    _pending_cache[supplier_id] = (now, quotations)
+    return list(quotations)
 
 
 async def get_quotation_details(quotation_id: int, supplier_id: int) -> Optional[QuotationRequest]:
@@ -138,34 +210,21 @@ async def get_quotation_details(quotation_id: int, supplier_id: int) -> Optional
     """
     client = get_supabase_client()
 
-    result = (
+    result = await execute_async(
         client.table(Tables.SUPPLIER_MAPPED_PRODUCTS)
-        .select("""
-            id,
-            master_list_id,
-            supplier_product_name,
-            master_list!inner(
-                id,
-                product_name,
-                brand,
-                specifications,
-                restaurant_id,
-                restaurants(id, restaurant_name)
-            )
-        """)
+        .select(_QUOTATION_SELECT)
         .eq("id", quotation_id)
         .eq("supplier_id", supplier_id)
         .eq("is_active", True)
         .limit(1)
-        .execute()
     )
 
     if not result.data:
         return None
 
     smp = result.data[0]
-    master = smp.get("master_list", {})
-    restaurant = master.get("restaurants", {})
+    master = smp.get("master_list") or _EMPTY
+    restaurant = master.get("restaurants") or _EMPTY
 
     return QuotationRequest(
         id=smp["id"],
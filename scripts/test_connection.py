@@ -13,7 +13,13 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from frepi_agent.config import get_config
-from frepi_agent.shared.supabase_client import test_connection, get_supabase_client, Tables
+from frepi_agent.shared.db_pool import close_db_pool, fetchrow, init_db_pool
+from frepi_agent.shared.supabase_client import (
+    execute_async,
+    get_supabase_client,
+    test_connection,
+    Tables,
+)
 from frepi_agent.restaurant_facing_agent.tools.embeddings import generate_embedding
 
 
@@ -23,6 +29,54 @@ def print_status(name: str, success: bool, details: str = ""):
     print(f"{emoji} {name}: {details if details else ('OK' if success else 'FAILED')}")
 
 
+async def check_supabase() -> tuple[bool, str, list[str]]:
+    """Supabase REST connection, plus a master_list row count."""
+    if not await test_connection():
+        return False, "", []
+
+    # Try to count records in master_list
+    client = get_supabase_client()
+    result = await execute_async(client.table(Tables.MASTER_LIST).select("id", count="exact", head=True))
+    return True, "", [f"Found {result.count} products in master_list"]
+
+
+async def check_db_pool() -> tuple[bool, str, list[str]]:
+    """Postgres pool (optional, used by hot read paths)."""
+    try:
+        if await init_db_pool() is None:
+            return True, "DATABASE_URL not set, using the REST client", []
+        await fetchrow("SELECT 1 AS ok")
+        return True, "", []
+    finally:
+        await close_db_pool()
+
+
+async def check_embeddings() -> tuple[bool, str, list[str]]:
+    """OpenAI embeddings."""
+    embedding = await generate_embedding("picanha friboi 10kg")
+    return True, f"Generated {len(embedding)}-dim vector", []
+
+
+async def check_vector_search() -> tuple[bool, str, list[str]]:
+    """Vector search (if RPC exists)."""
+    from frepi_agent.restaurant_facing_agent.tools.product_search import search_products
+    result = await search_products("picanha")
+    notes = []
+    if result.best_match:
+        notes.append(f"Best match: {result.best_match.product_name} ({result.best_match.confidence})")
+    return True, f"Found {len(result.matches)} matches", notes
+
+
+# Network checks: (name, check, required, note printed on failure)
+CHECKS = [
+    ("Supabase", check_supabase, True, None),
+    ("Postgres pool", check_db_pool, True, None),
+    ("OpenAI Embeddings", check_embeddings, True, None),
+    ("Vector Search", check_vector_search, False,
+     "Note: You may need to create the vector_search RPC function in Supabase"),
+]
+
+
 async def main():
     print("\n" + "=" * 50)
     print("Frepi Agent Configuration Test")
@@ -39,43 +93,32 @@ async def main():
     else:
         print_status("Configuration", True, "All required keys present")
 
-    # 2. Test Supabase connection
-    print("\n2. Testing Supabase connection...")
-    try:
-        success = await test_connection()
-        print_status("Supabase", success)
-
-        if success:
-            # Try to count records in master_list
-            client = get_supabase_client()
-            result = client.table(Tables.MASTER_LIST).select("id", count="exact").execute()
-            count = result.count if hasattr(result, 'count') else len(result.data or [])
-            print(f"   Found {count} products in master_list")
-    except Exception as e:
-        print_status("Supabase", False, str(e))
+    # 2. The network checks are independent: run them concurrently
+    print("\n2. Testing connections...")
+    results = await asyncio.gather(
+        *(check() for _, check, _, _ in CHECKS),
+        return_exceptions=True,
+    )
+
+    passed = True
+    for (name, _, required, failure_note), result in zip(CHECKS, results):
+        if isinstance(result, BaseException):
+            success, details, notes = False, str(result), []
+        else:
+            success, details, notes = result
+
+        print_status(name, success, details)
+        for note in notes:
+            print(f"   {note}")
+        if not success:
+            if failure_note:
+                print(f"   {failure_note}")
+            if required:
+                passed = False
+
+    if not passed:
         return False
 
-    # 3. Test OpenAI embeddings
-    print("\n3. Testing OpenAI embeddings...")
-    try:
-        embedding = await generate_embedding("picanha friboi 10kg")
-        print_status("OpenAI Embeddings", True, f"Generated {len(embedding)}-dim vector")
-    except Exception as e:
-        print_status("OpenAI Embeddings", False, str(e))
-        return False
-
-    # 4. Test vector search (if RPC exists)
-    print("\n4. Testing vector search...")
-    try:
-        from frepi_agent.restaurant_facing_agent.tools.product_search import search_products
-        result = await search_products("picanha")
-        print_status("Vector Search", True, f"Found {len(result.matches)} matches")
-        if result.best_match:
-            print(f"   Best match: {result.best_match.product_name} ({result.best_match.confidence})")
-    except Exception as e:
-        print_status("Vector Search", False, str(e))
-        print("   Note: You may need to create the vector_search RPC function in Supabase")
-
     print("\n" + "=" * 50)
     print("✅ All tests passed! Ready to proceed.")
     print("=" * 50 + "\n")
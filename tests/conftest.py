@@ -1,57 +1,68 @@
 """Pytest configuration and fixtures for Frepi Agent tests."""
 
 import json
+import sys
+import warnings
 import pytest
-import pytest_asyncio
 from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock, patch
+from types import SimpleNamespace
 from typing import Optional
 from dataclasses import dataclass, field
+from functools import lru_cache
 from datetime import datetime
 
 # Load fixture data
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
 
 
-@pytest.fixture
+@lru_cache(maxsize=None)
+def _load(name: str):
+    """Parse a fixture file once per test session."""
+    return json.loads((FIXTURES_DIR / name).read_bytes())
+
+
+# The loaders below are session-scoped and share one parsed copy, so tests
+# must treat the data as read-only (copy.deepcopy it before mutating).
+@pytest.fixture(scope="session")
 def sample_products():
     """Load sample product data."""
-    with open(FIXTURES_DIR / "sample_products.json") as f:
-        return json.load(f)
+    return _load("sample_products.json")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_suppliers():
     """Load sample supplier data."""
-    with open(FIXTURES_DIR / "sample_suppliers.json") as f:
-        return json.load(f)
+    return _load("sample_suppliers.json")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_prices():
     """Load sample pricing data."""
-    with open(FIXTURES_DIR / "sample_prices.json") as f:
-        return json.load(f)
+    return _load("sample_prices.json")
 
 
-@dataclass
+@dataclass(slots=True)
 class MockToolTracker:
     """Tracks tool calls during test execution."""
     calls: list = field(default_factory=list)
+    _by_name: dict[str, list] = field(default_factory=dict, init=False, repr=False)
 
     def record_call(self, tool_name: str, args: dict):
         """Record a tool call."""
-        self.calls.append({"name": tool_name, "args": args})
+        call = {"name": tool_name, "args": args}
+        self.calls.append(call)
+        self._by_name.setdefault(tool_name, []).append(call)
 
     def get_calls(self, tool_name: str = None):
         """Get all calls or filter by tool name."""
         if tool_name:
-            return [c for c in self.calls if c["name"] == tool_name]
+            return self._by_name.get(tool_name, [])
         return self.calls
 
     def reset(self):
-        """Clear recorded calls."""
-        self.calls = []
+        """Clear recorded calls (in place, so the tracker reuses its buffers)."""
+        self.calls.clear()
+        self._by_name.clear()
 
 
 @pytest.fixture
@@ -60,7 +71,7 @@ def tool_tracker():
     return MockToolTracker()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_search_result(sample_products):
     """Create a mock search result from fixture data."""
     from frepi_agent.restaurant_facing_agent.tools.product_search import SearchResult, ProductMatch
@@ -86,7 +97,7 @@ def mock_search_result(sample_products):
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_price_info(sample_prices):
     """Create mock price info from fixture data."""
     from frepi_agent.restaurant_facing_agent.tools.pricing import PriceInfo
@@ -101,7 +112,7 @@ def mock_price_info(sample_prices):
             supplier_name=p["supplier_name"],
             unit_price=p["unit_price"],
             unit=p["unit"],
-            effective_date=datetime.strptime(p["effective_date"], "%Y-%m-%d"),
+            effective_date=datetime.fromisoformat(p["effective_date"]),
             days_old=p["days_old"],
             is_fresh=p["is_fresh"],
         )
@@ -109,7 +120,7 @@ def mock_price_info(sample_prices):
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_supplier(sample_suppliers):
     """Create a mock supplier from fixture data."""
     from frepi_agent.restaurant_facing_agent.tools.suppliers import Supplier
@@ -131,29 +142,18 @@ def mock_supplier(sample_suppliers):
 
 def create_mock_gpt4_response(content: str, tool_calls: Optional[list] = None):
     """Create a mock GPT-4 response object."""
-    mock_message = MagicMock()
-    mock_message.content = content
-    mock_message.tool_calls = tool_calls
-
-    mock_choice = MagicMock()
-    mock_choice.message = mock_message
-    mock_choice.finish_reason = "stop" if not tool_calls else "tool_calls"
-
-    mock_response = MagicMock()
-    mock_response.choices = [mock_choice]
-    return mock_response
+    message = SimpleNamespace(content=content, tool_calls=tool_calls)
+    choice = SimpleNamespace(
+        message=message,
+        finish_reason="stop" if not tool_calls else "tool_calls",
+    )
+    return SimpleNamespace(choices=[choice])
 
 
 def create_mock_tool_call(call_id: str, name: str, arguments: dict):
     """Create a mock tool call object."""
-    mock_function = MagicMock()
-    mock_function.name = name
-    mock_function.arguments = json.dumps(arguments)
-
-    mock_tool_call = MagicMock()
-    mock_tool_call.id = call_id
-    mock_tool_call.function = mock_function
-    return mock_tool_call
+    function = SimpleNamespace(name=name, arguments=json.dumps(arguments))
+    return SimpleNamespace(id=call_id, function=function)
 
 
 @pytest.fixture
@@ -246,3 +246,12 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "group_e: management tests")
     config.addinivalue_line("markers", "group_f: error handling tests")
     config.addinivalue_line("markers", "critical: critical priority tests")
+    # Registered by pytest-xdist too; declared here so runs without it stay quiet
+    config.addinivalue_line("markers", "xdist_group(name): pytest-xdist loadgroup shard")
+
+    # coverage.py only has the fast sys.monitoring core on 3.12+
+    if config.pluginmanager.hasplugin("_cov") and sys.version_info < (3, 12):
+        warnings.warn(
+            "Coverage on Python < 3.12 uses the slower trace core; "
+            "run on 3.12+ for sys.monitoring-based coverage"
+        )
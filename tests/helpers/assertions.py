@@ -1,11 +1,16 @@
 """Custom assertion helpers for Frepi Agent tests."""
 
 import re
+from functools import lru_cache
 from typing import Optional
 from dataclasses import dataclass
 
 
-@dataclass
+# One turn's response goes through several assertions; lower-case it once
+_lower = lru_cache(maxsize=128)(str.lower)
+
+
+@dataclass(slots=True, frozen=True)
 class AssertionResult:
     """Result of an assertion check."""
     passed: bool
@@ -32,20 +37,63 @@ class FrepiAssertions:
         "🥩", "🍚", "🫒", "👋", "🛒", "📋"
     ]
 
+    # Single-pass matchers over the lists above (longest alternatives first,
+    # so e.g. "quero" wins over "quer")
+    PT_BR_MARKER_RE = re.compile(
+        "|".join(map(re.escape, sorted(PT_BR_MARKERS, key=len, reverse=True)))
+    )
+    EMOJI_RE = re.compile("|".join(map(re.escape, RESPONSE_EMOJIS + MENU_EMOJIS)))
+
     # Brazilian price format pattern: R$ 1.234,56
     PRICE_PATTERN = r"R\$\s*[\d.,]+(?:,\d{2})?"
+    PRICE_RE = re.compile(PRICE_PATTERN)
+
+    # Generic supplier references that should NOT be used, matched against
+    # the lower-cased response
+    GENERIC_SUPPLIER_RE = re.compile(
+        "os fornecedores|alguns fornecedores|fornecedores disponíveis|vários fornecedores"
+    )
+
+    # Error indicators, matched against the lower-cased response
+    ERROR_RES = tuple(re.compile(p) for p in (
+        r"erro\s+interno",
+        r"error",
+        r"exception",
+        r"falha\s+no\s+sistema",
+        r"não\s+foi\s+possível\s+processar",
+        r"traceback",
+        r"stack\s+trace",
+    ))
 
     @classmethod
-    def assert_contains_any(cls, response: str, terms: list[str]) -> AssertionResult:
-        """Check if response contains at least one of the terms."""
-        response_lower = response.lower()
-        found = [t for t in terms if t.lower() in response_lower]
+    def terms_pattern(cls, terms: list[str]) -> re.Pattern:
+        """
+        Compile terms into one case-insensitive alternation.
 
-        if found:
+        Matched against the lower-cased response, it finds a term iff one of
+        the terms occurs; pass it as `pattern` to the term assertions below.
+        """
+        alternation = "|".join(
+            re.escape(t.lower()) for t in sorted(terms, key=len, reverse=True)
+        )
+        return re.compile(alternation or "(?!)")  # No terms: never matches
+
+    @classmethod
+    def assert_contains_any(
+        cls, response: str, terms: list[str], pattern: Optional[re.Pattern] = None
+    ) -> AssertionResult:
+        """Check if response contains at least one of the terms."""
+        response_lower = _lower(response)
+        if pattern is not None:
+            match = pattern.search(response_lower)
+            found = match.group() if match else None
+        else:
+            found = next((t for t in terms if t.lower() in response_lower), None)
+
+        if found is not None:
             return AssertionResult(
                 passed=True,
-                message=f"Found terms: {found}",
-                details={"found": found}
+                message=f"Found term: {found}"
             )
         return AssertionResult(
             passed=False,
@@ -70,10 +118,15 @@ class FrepiAssertions:
         )
 
     @classmethod
-    def assert_not_contains(cls, response: str, terms: list[str]) -> AssertionResult:
+    def assert_not_contains(
+        cls, response: str, terms: list[str], pattern: Optional[re.Pattern] = None
+    ) -> AssertionResult:
         """Check that response does not contain any of the forbidden terms."""
-        response_lower = response.lower()
-        found = [t for t in terms if t.lower() in response_lower]
+        response_lower = _lower(response)
+        if pattern is not None and not pattern.search(response_lower):
+            found = []
+        else:
+            found = [t for t in terms if t.lower() in response_lower]
 
         if not found:
             return AssertionResult(
@@ -89,13 +142,13 @@ class FrepiAssertions:
     @classmethod
     def assert_menu_displayed(cls, response: str) -> AssertionResult:
         """Check if the 4-option menu is displayed."""
-        missing_emojis = [e for e in cls.MENU_EMOJIS if e not in response]
-
-        if not missing_emojis:
+        # Probes "1️⃣" first, so responses without a menu bail out on one scan
+        if all(e in response for e in cls.MENU_EMOJIS):
             return AssertionResult(
                 passed=True,
                 message="Menu with all 4 options displayed"
             )
+        missing_emojis = [e for e in cls.MENU_EMOJIS if e not in response]
         return AssertionResult(
             passed=False,
             message=f"Menu incomplete. Missing: {missing_emojis}",
@@ -105,13 +158,12 @@ class FrepiAssertions:
     @classmethod
     def assert_has_emojis(cls, response: str) -> AssertionResult:
         """Check if response contains emojis."""
-        found_emojis = [e for e in cls.RESPONSE_EMOJIS + cls.MENU_EMOJIS if e in response]
+        match = cls.EMOJI_RE.search(response)
 
-        if found_emojis:
+        if match:
             return AssertionResult(
                 passed=True,
-                message=f"Found emojis: {found_emojis}",
-                details={"found": found_emojis}
+                message=f"Found emoji: {match.group()}"
             )
         return AssertionResult(
             passed=False,
@@ -121,15 +173,23 @@ class FrepiAssertions:
     @classmethod
     def assert_portuguese_language(cls, response: str) -> AssertionResult:
         """Check if response is in Portuguese."""
-        response_lower = response.lower()
-        found_markers = [m for m in cls.PT_BR_MARKERS if m in response_lower]
+        response_lower = _lower(response)
+        # Two distinct hits are enough evidence, so stop scanning there
+        hits = set()
+        for match in cls.PT_BR_MARKER_RE.finditer(response_lower):
+            hits.add(match.group())
+            if len(hits) >= 2:
+                break
+        # A longer hit also counts the markers it contains ("quero" -> "quer")
+        found_markers = [
+            m for m in cls.PT_BR_MARKERS if any(m in hit for hit in hits)
+        ]
 
         # Consider Portuguese if at least 2 markers found or response is short
         if len(found_markers) >= 2 or len(response) < 50:
             return AssertionResult(
                 passed=True,
-                message=f"Portuguese language detected. Markers: {found_markers}",
-                details={"markers": found_markers}
+                message=f"Portuguese language detected. Markers: {found_markers}"
             )
         return AssertionResult(
             passed=False,
@@ -140,13 +200,12 @@ class FrepiAssertions:
     @classmethod
     def assert_price_format(cls, response: str) -> AssertionResult:
         """Check if response contains Brazilian price format."""
-        prices = re.findall(cls.PRICE_PATTERN, response)
+        match = cls.PRICE_RE.search(response)
 
-        if prices:
+        if match:
             return AssertionResult(
                 passed=True,
-                message=f"Found prices: {prices}",
-                details={"prices": prices}
+                message=f"Found price: {match.group()}"
             )
         return AssertionResult(
             passed=False,
@@ -156,16 +215,8 @@ class FrepiAssertions:
     @classmethod
     def assert_has_supplier_names(cls, response: str) -> AssertionResult:
         """Check if response contains specific supplier names (not generic terms)."""
-        # Generic terms that should NOT be used
-        generic_terms = [
-            "os fornecedores",
-            "alguns fornecedores",
-            "fornecedores disponíveis",
-            "vários fornecedores"
-        ]
-
-        response_lower = response.lower()
-        found_generic = [t for t in generic_terms if t in response_lower]
+        response_lower = _lower(response)
+        found_generic = list(dict.fromkeys(cls.GENERIC_SUPPLIER_RE.findall(response_lower)))
 
         if found_generic:
             return AssertionResult(
@@ -195,10 +246,13 @@ class FrepiAssertions:
             forbidden_calls: List of tool names that should NOT be called
         """
         recorded_names = [c["name"] for c in recorded_calls]
+        calls_by_name: dict[str, list[dict]] = {}
+        for c in recorded_calls:
+            calls_by_name.setdefault(c["name"], []).append(c)
 
         # Check forbidden calls
         if forbidden_calls:
-            found_forbidden = [n for n in forbidden_calls if n in recorded_names]
+            found_forbidden = [n for n in forbidden_calls if n in calls_by_name]
             if found_forbidden:
                 return AssertionResult(
                     passed=False,
@@ -210,23 +264,20 @@ class FrepiAssertions:
         missing_calls = []
         for expected in expected_calls:
             expected_name = expected.get("name")
-            if expected_name not in recorded_names:
+            if expected_name not in calls_by_name:
                 missing_calls.append(expected_name)
                 continue
 
             # Check args if specified
             args_to_check = expected.get("args_contain", {})
             if args_to_check:
-                matching_calls = [c for c in recorded_calls if c["name"] == expected_name]
-                args_matched = False
-                for call in matching_calls:
-                    call_args = call.get("args", {})
-                    if all(
+                args_matched = any(
+                    all(
                         k in call_args and str(args_to_check[k]).lower() in str(call_args[k]).lower()
                         for k in args_to_check
-                    ):
-                        args_matched = True
-                        break
+                    )
+                    for call_args in (c.get("args", {}) for c in calls_by_name[expected_name])
+                )
 
                 if not args_matched:
                     missing_calls.append(f"{expected_name}(with args: {args_to_check})")
@@ -243,30 +294,19 @@ class FrepiAssertions:
 
         return AssertionResult(
             passed=True,
-            message=f"All expected tool calls made: {recorded_names}",
-            details={"recorded": recorded_calls}
+            message=f"All expected tool calls made: {recorded_names}"
         )
 
     @classmethod
     def assert_no_error(cls, response: str) -> AssertionResult:
         """Check that response doesn't contain error indicators."""
-        error_patterns = [
-            r"erro\s+interno",
-            r"error",
-            r"exception",
-            r"falha\s+no\s+sistema",
-            r"não\s+foi\s+possível\s+processar",
-            r"traceback",
-            r"stack\s+trace"
-        ]
-
-        response_lower = response.lower()
-        for pattern in error_patterns:
-            if re.search(pattern, response_lower):
+        response_lower = _lower(response)
+        for pattern in cls.ERROR_RES:
+            if pattern.search(response_lower):
                 return AssertionResult(
                     passed=False,
-                    message=f"Error pattern detected: {pattern}",
-                    details={"pattern": pattern}
+                    message=f"Error pattern detected: {pattern.pattern}",
+                    details={"pattern": pattern.pattern}
                 )
 
         return AssertionResult(
@@ -1,229 +1,166 @@
 """Test report generation for Frepi Agent tests."""
 
-import json
 from datetime import datetime
 from pathlib import Path
-from dataclasses import dataclass, asdict, field
-from typing import Optional
+from string import Template
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
 
+import orjson
 
-@dataclass
-class TestResult:
-    """Result of a single test case."""
-    test_id: str
-    test_name: str
-    group: str
-    passed: bool
-    duration_ms: float
-    turns_tested: int
-    assertions_passed: int
-    assertions_failed: int
-    failure_details: list[str] = field(default_factory=list)
-    tool_calls: list[dict] = field(default_factory=list)
-
-
-@dataclass
-class TestReport:
-    """Complete test report."""
-    timestamp: str
-    total_tests: int
-    passed: int
-    failed: int
-    skipped: int
-    duration_seconds: float
-    groups_summary: dict
-    results: list[TestResult] = field(default_factory=list)
 
-
-class ReportGenerator:
-    """Generates test reports in JSON and HTML formats."""
-
-    def __init__(self, output_dir: Optional[Path] = None):
-        self.output_dir = output_dir or Path(__file__).parent.parent / "reports"
-        self.output_dir.mkdir(exist_ok=True)
-
-    def generate_json_report(self, report: TestReport) -> Path:
-        """Generate JSON report."""
-        filename = f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        filepath = self.output_dir / filename
-
-        with open(filepath, "w") as f:
-            json.dump(asdict(report), f, indent=2, ensure_ascii=False)
-
-        return filepath
-
-    def generate_html_report(self, report: TestReport) -> Path:
-        """Generate HTML report."""
-        filename = f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-        filepath = self.output_dir / filename
-
-        html_content = self._render_html(report)
-
-        with open(filepath, "w") as f:
-            f.write(html_content)
-
-        return filepath
-
-    def _render_html(self, report: TestReport) -> str:
-        """Render HTML report content."""
-        pass_rate = (report.passed / report.total_tests * 100) if report.total_tests > 0 else 0
-
-        # Group results by group
-        groups_html = ""
-        for group_id, summary in report.groups_summary.items():
-            group_results = [r for r in report.results if r.group == group_id]
-            groups_html += self._render_group_section(group_id, summary, group_results)
-
-        return f"""<!DOCTYPE html>
+# Page skeleton, parsed once at import. It is split around the group
+# sections so _iter_html can stream them between the head and the tail.
+_HTML_PAGE = """<!DOCTYPE html>
 <html lang="pt-BR">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Frepi Agent Test Report - {report.timestamp}</title>
+    <title>Frepi Agent Test Report - $timestamp</title>
     <style>
-        * {{
+        * {
             box-sizing: border-box;
             margin: 0;
             padding: 0;
-        }}
-        body {{
+        }
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, sans-serif;
             background: #f5f5f5;
             color: #333;
             line-height: 1.6;
-        }}
-        .container {{
+        }
+        .container {
             max-width: 1200px;
             margin: 0 auto;
             padding: 20px;
-        }}
-        .header {{
+        }
+        .header {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 30px;
             border-radius: 12px;
             margin-bottom: 30px;
             box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }}
-        .header h1 {{
+        }
+        .header h1 {
             font-size: 28px;
             margin-bottom: 10px;
-        }}
-        .header .meta {{
+        }
+        .header .meta {
             opacity: 0.9;
             font-size: 14px;
-        }}
-        .summary {{
+        }
+        .summary {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 20px;
             margin-bottom: 30px;
-        }}
-        .stat-card {{
+        }
+        .stat-card {
             background: white;
             padding: 25px;
             border-radius: 12px;
             text-align: center;
             box-shadow: 0 2px 4px rgba(0,0,0,0.05);
             transition: transform 0.2s;
-        }}
-        .stat-card:hover {{
+        }
+        .stat-card:hover {
             transform: translateY(-2px);
-        }}
-        .stat-card.passed {{
+        }
+        .stat-card.passed {
             border-left: 4px solid #28a745;
-        }}
-        .stat-card.failed {{
+        }
+        .stat-card.failed {
             border-left: 4px solid #dc3545;
-        }}
-        .stat-card.total {{
+        }
+        .stat-card.total {
             border-left: 4px solid #6c757d;
-        }}
-        .stat-card.rate {{
+        }
+        .stat-card.rate {
             border-left: 4px solid #667eea;
-        }}
-        .stat-value {{
+        }
+        .stat-value {
             font-size: 48px;
             font-weight: 700;
             color: #333;
-        }}
-        .stat-label {{
+        }
+        .stat-label {
             color: #666;
             font-size: 14px;
             text-transform: uppercase;
             letter-spacing: 1px;
             margin-top: 5px;
-        }}
-        .group {{
+        }
+        .group {
             background: white;
             margin-bottom: 20px;
             border-radius: 12px;
             overflow: hidden;
             box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-        }}
-        .group-header {{
+        }
+        .group-header {
             padding: 20px;
             background: #f8f9fa;
             border-bottom: 1px solid #eee;
             display: flex;
             justify-content: space-between;
             align-items: center;
-        }}
-        .group-header h3 {{
+        }
+        .group-header h3 {
             font-size: 18px;
             color: #333;
-        }}
-        .group-stats {{
+        }
+        .group-stats {
             font-size: 14px;
             color: #666;
-        }}
-        .test-row {{
+        }
+        .test-row {
             padding: 15px 20px;
             border-bottom: 1px solid #f0f0f0;
             display: flex;
             align-items: center;
             gap: 15px;
-        }}
-        .test-row:last-child {{
+        }
+        .test-row:last-child {
             border-bottom: none;
-        }}
-        .test-row.passed {{
+        }
+        .test-row.passed {
             border-left: 3px solid #28a745;
-        }}
-        .test-row.failed {{
+        }
+        .test-row.failed {
             border-left: 3px solid #dc3545;
             background: #fff5f5;
-        }}
-        .test-id {{
+        }
+        .test-id {
             font-family: monospace;
             font-weight: 600;
             color: #667eea;
             min-width: 60px;
-        }}
-        .test-name {{
+        }
+        .test-name {
             flex: 1;
             font-weight: 500;
-        }}
-        .badge {{
+        }
+        .badge {
             padding: 4px 12px;
             border-radius: 20px;
             font-size: 12px;
             font-weight: 600;
             text-transform: uppercase;
-        }}
-        .badge-pass {{
+        }
+        .badge-pass {
             background: #d4edda;
             color: #155724;
-        }}
-        .badge-fail {{
+        }
+        .badge-fail {
             background: #f8d7da;
             color: #721c24;
-        }}
-        .test-meta {{
+        }
+        .test-meta {
             font-size: 12px;
             color: #999;
-        }}
-        .details {{
+        }
+        .details {
             margin-top: 10px;
             padding: 15px;
             background: #f8f9fa;
@@ -232,13 +169,13 @@ class ReportGenerator:
             font-size: 12px;
             white-space: pre-wrap;
             color: #dc3545;
-        }}
-        .footer {{
+        }
+        .footer {
             text-align: center;
             padding: 20px;
             color: #999;
             font-size: 12px;
-        }}
+        }
     </style>
 </head>
 <body>
@@ -246,31 +183,31 @@ class ReportGenerator:
         <div class="header">
             <h1>Frepi Agent Test Report</h1>
             <div class="meta">
-                <div>Generated: {report.timestamp}</div>
-                <div>Duration: {report.duration_seconds:.2f}s</div>
+                <div>Generated: $timestamp</div>
+                <div>Duration: ${duration}s</div>
             </div>
         </div>
 
         <div class="summary">
             <div class="stat-card total">
-                <div class="stat-value">{report.total_tests}</div>
+                <div class="stat-value">$total_tests</div>
                 <div class="stat-label">Total Tests</div>
             </div>
             <div class="stat-card passed">
-                <div class="stat-value">{report.passed}</div>
+                <div class="stat-value">$passed</div>
                 <div class="stat-label">Passed</div>
             </div>
             <div class="stat-card failed">
-                <div class="stat-value">{report.failed}</div>
+                <div class="stat-value">$failed</div>
                 <div class="stat-label">Failed</div>
             </div>
             <div class="stat-card rate">
-                <div class="stat-value">{pass_rate:.0f}%</div>
+                <div class="stat-value">$pass_rate%</div>
                 <div class="stat-label">Pass Rate</div>
             </div>
         </div>
 
-        {groups_html}
+        $groups_html
 
         <div class="footer">
             Frepi Agent Test Framework v1.0
@@ -278,6 +215,115 @@ class ReportGenerator:
     </div>
 </body>
 </html>"""
+_html_head, _HTML_TAIL = _HTML_PAGE.split("$groups_html")
+_HTML_HEAD = Template(_html_head)
+
+
+@dataclass(slots=True, frozen=True)
+class TestResult:
+    """Result of a single test case."""
+    test_id: str
+    test_name: str
+    group: str
+    passed: bool
+    duration_ms: float
+    turns_tested: int
+    assertions_passed: int
+    assertions_failed: int
+    failure_details: list[str] = field(default_factory=list)
+    tool_calls: list[dict] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        """Plain-dict view for serialization (nested lists are shared, not copied)."""
+        return {
+            "test_id": self.test_id,
+            "test_name": self.test_name,
+            "group": self.group,
+            "passed": self.passed,
+            "duration_ms": self.duration_ms,
+            "turns_tested": self.turns_tested,
+            "assertions_passed": self.assertions_passed,
+            "assertions_failed": self.assertions_failed,
+            "failure_details": self.failure_details,
+            "tool_calls": self.tool_calls,
+        }
+
+
+@dataclass(slots=True)
+class TestReport:
+    """Complete test report."""
+    timestamp: str
+    total_tests: int
+    passed: int
+    failed: int
+    skipped: int
+    duration_seconds: float
+    groups_summary: dict
+    results: list[TestResult] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        """Plain-dict view for serialization."""
+        return {
+            "timestamp": self.timestamp,
+            "total_tests": self.total_tests,
+            "passed": self.passed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "duration_seconds": self.duration_seconds,
+            "groups_summary": self.groups_summary,
+            "results": [r.to_dict() for r in self.results],
+        }
+
+
+class ReportGenerator:
+    """Generates test reports in JSON and HTML formats."""
+
+    def __init__(self, output_dir: Optional[Path] = None):
+        self.output_dir = output_dir or Path(__file__).parent.parent / "reports"
+        self.output_dir.mkdir(exist_ok=True)
+
+    def generate_json_report(self, report: TestReport) -> Path:
+        """Generate JSON report."""
+        filename = f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        filepath = self.output_dir / filename
+
+        filepath.write_bytes(orjson.dumps(report.to_dict(), option=orjson.OPT_INDENT_2))
+
+        return filepath
+
+    def generate_html_report(self, report: TestReport) -> Path:
+        """Generate HTML report."""
+        filename = f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+        filepath = self.output_dir / filename
+
+        with open(filepath, "w") as f:
+            f.writelines(self._iter_html(report))
+
+        return filepath
+
+    def _iter_html(self, report: TestReport) -> Iterator[str]:
+        """Yield the HTML report content in chunks."""
+        pass_rate = (report.passed / report.total_tests * 100) if report.total_tests > 0 else 0
+
+        yield _HTML_HEAD.substitute(
+            timestamp=report.timestamp,
+            duration=f"{report.duration_seconds:.2f}",
+            total_tests=report.total_tests,
+            passed=report.passed,
+            failed=report.failed,
+            pass_rate=f"{pass_rate:.0f}",
+        )
+
+        # Group results by group
+        results_by_group: dict[str, list[TestResult]] = {}
+        for r in report.results:
+            results_by_group.setdefault(r.group, []).append(r)
+        for group_id, summary in report.groups_summary.items():
+            yield self._render_group_section(
+                group_id, summary, results_by_group.get(group_id, [])
+            )
+
+        yield _HTML_TAIL
 
     def _render_group_section(self, group_id: str, summary: dict, results: list) -> str:
         """Render a single group section."""
@@ -341,6 +387,8 @@ def create_report_from_pytest_results(pytest_results: list[dict]) -> TestReport:
     """
     results = []
     groups_summary = {}
+    total_passed = 0
+    total_duration_ms = 0.0
 
     for pr in pytest_results:
         # Parse test ID from nodeid (e.g., "test_agent.py::TestAgentFromMatrix::test_from_matrix[A001-First_greeting]")
@@ -372,17 +420,17 @@ def create_report_from_pytest_results(pytest_results: list[dict]) -> TestReport:
         results.append(result)
 
         # Update group summary
-        if group not in groups_summary:
-            groups_summary[group] = {"total": 0, "passed": 0, "failed": 0}
-        groups_summary[group]["total"] += 1
+        summary = groups_summary.setdefault(group, {"total": 0, "passed": 0, "failed": 0})
+        summary["total"] += 1
         if result.passed:
-            groups_summary[group]["passed"] += 1
+            summary["passed"] += 1
+            total_passed += 1
         else:
-            groups_summary[group]["failed"] += 1
+            summary["failed"] += 1
+        total_duration_ms += result.duration_ms
 
-    total_passed = sum(1 for r in results if r.passed)
-    total_failed = sum(1 for r in results if not r.passed)
-    total_duration = sum(r.duration_ms for r in results) / 1000
+    total_failed = len(results) - total_passed
+    total_duration = total_duration_ms / 1000
 
     return TestReport(
         timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -1,12 +1,33 @@
 """YAML test case loader for Frepi Agent tests."""
 
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+import tempfile
+
 import yaml
 from pathlib import Path
 from dataclasses import dataclass, field
+from functools import partial
 from typing import Optional
 
+from tests.helpers.assertions import FrepiAssertions
+
+# libyaml's C loader when PyYAML was built with it, else the pure-Python one
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+# Parsed matrices are pickled here, keyed by the YAML bytes and the source of
+# this module and assertions.py (the dataclasses below and the pickled
+# response checks come from them, so editing either invalidates the cache)
+MATRIX_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "frepi"
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class ExpectedBehavior:
     """Expected behaviors for a test turn."""
     contains_any: list[str] = field(default_factory=list)
@@ -19,14 +40,14 @@ class ExpectedBehavior:
     language: str = "pt-BR"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ToolCallExpectation:
     """Expected tool call."""
     name: str
     args_contain: dict = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ConversationTurn:
     """A single turn in a test conversation."""
     turn: int
@@ -34,9 +55,44 @@ class ConversationTurn:
     expected: ExpectedBehavior
     tool_calls_expected: list[ToolCallExpectation] = field(default_factory=list)
     tool_calls_forbidden: list[str] = field(default_factory=list)
+    # Response checks enabled by `expected`, as callables taking the response
+    checks: tuple = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "checks", _response_checks(self.expected))
 
 
-@dataclass
+def _response_checks(expected: ExpectedBehavior) -> tuple:
+    """Plan the FrepiAssertions calls for a turn once, in validation order."""
+    checks = []
+    if expected.contains_any:
+        checks.append(partial(
+            FrepiAssertions.assert_contains_any,
+            terms=expected.contains_any,
+            pattern=FrepiAssertions.terms_pattern(expected.contains_any),
+        ))
+    if expected.contains_all:
+        checks.append(partial(FrepiAssertions.assert_contains_all, terms=expected.contains_all))
+    if expected.not_contains:
+        checks.append(partial(
+            FrepiAssertions.assert_not_contains,
+            terms=expected.not_contains,
+            pattern=FrepiAssertions.terms_pattern(expected.not_contains),
+        ))
+    if expected.contains_menu:
+        checks.append(FrepiAssertions.assert_menu_displayed)
+    if expected.has_emojis:
+        checks.append(FrepiAssertions.assert_has_emojis)
+    if expected.has_price_format:
+        checks.append(FrepiAssertions.assert_price_format)
+    if expected.has_supplier_names:
+        checks.append(FrepiAssertions.assert_has_supplier_names)
+    if expected.language == "pt-BR":
+        checks.append(FrepiAssertions.assert_portuguese_language)
+    return tuple(checks)
+
+
+@dataclass(slots=True, frozen=True)
 class TestCase:
     """A complete test case."""
     id: str
@@ -49,13 +105,34 @@ class TestCase:
     tags: list[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TestMatrix:
     """Complete test matrix."""
     version: str
     settings: dict
     groups: list[dict]
     test_cases: list[TestCase]
+    # Lookup indexes over test_cases, built once in __post_init__
+    id_index: dict[str, TestCase] = field(init=False, repr=False, compare=False)
+    by_group: dict[str, list[TestCase]] = field(init=False, repr=False, compare=False)
+    by_priority: dict[str, list[TestCase]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        id_index, by_group, by_priority = {}, {}, {}
+        for tc in self.test_cases:
+            id_index.setdefault(tc.id, tc)  # First case wins, as in the old scan
+            by_group.setdefault(tc.group, []).append(tc)
+            by_priority.setdefault(tc.priority, []).append(tc)
+        object.__setattr__(self, "id_index", id_index)
+        object.__setattr__(self, "by_group", by_group)
+        object.__setattr__(self, "by_priority", by_priority)
+
+
+# Defaults for required fields the YAML may omit; optional fields fall back
+# to the dataclass defaults, so matrix keys must match the field names
+_TOOL_CALL_DEFAULTS = {"name": ""}
+_TURN_DEFAULTS = {"turn": 1, "user_message": ""}
+_CASE_DEFAULTS = {"id": "", "name": "", "group": "", "description": "", "priority": "medium"}
 
 
 def load_test_matrix(path: Optional[Path] = None) -> TestMatrix:
@@ -71,51 +148,66 @@ def load_test_matrix(path: Optional[Path] = None) -> TestMatrix:
     if path is None:
         path = Path(__file__).parent.parent / "test_matrix.yaml"
 
-    with open(path) as f:
-        data = yaml.safe_load(f)
+    raw = path.read_bytes()
+    sources = Path(__file__).read_bytes() + Path(inspect.getfile(FrepiAssertions)).read_bytes()
+    key = hashlib.blake2b(raw + sources, digest_size=16).hexdigest()
+    cache_path = MATRIX_CACHE_DIR / f"matrix-{key}.pkl"
+    try:
+        return pickle.loads(cache_path.read_bytes())
+    except Exception:
+        pass  # Miss (or unreadable entry): parse and rewrite below
+
+    matrix = _parse_test_matrix(yaml.load(raw, Loader=_Loader))
+
+    tmp = None
+    try:
+        MATRIX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so parallel workers never read a partial file
+        fd, tmp = tempfile.mkstemp(dir=MATRIX_CACHE_DIR)
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(matrix, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_path)
+    except (OSError, pickle.PicklingError):
+        # Read-only home, unpicklable check etc.; caching is best effort
+        if tmp is not None:
+            Path(tmp).unlink(missing_ok=True)
+
+    return matrix
+
+
+def _intern_fields(data: dict, *keys: str) -> dict:
+    """
+    Intern categorical string fields (groups, priorities, tool names...).
+
+    YAML yields a fresh str per occurrence; interned copies share one object,
+    so the repeated equality checks against them hit the identity fast path.
+    """
+    return {**data, **{k: sys.intern(data[k]) for k in keys if isinstance(data.get(k), str)}}
+
 
+def _parse_test_matrix(data: dict) -> TestMatrix:
+    """Build a TestMatrix from the parsed YAML document."""
     test_cases = []
     for tc_data in data.get("test_cases", []):
-        conversation = []
-        for turn_data in tc_data.get("conversation", []):
-            expected_data = turn_data.get("expected", {})
-            expected = ExpectedBehavior(
-                contains_any=expected_data.get("contains_any", []),
-                contains_all=expected_data.get("contains_all", []),
-                not_contains=expected_data.get("not_contains", []),
-                contains_menu=expected_data.get("contains_menu", False),
-                has_price_format=expected_data.get("has_price_format", False),
-                has_supplier_names=expected_data.get("has_supplier_names", False),
-                has_emojis=expected_data.get("has_emojis", False),
-                language=expected_data.get("language", "pt-BR"),
-            )
-
-            tool_calls = [
-                ToolCallExpectation(
-                    name=tc.get("name", ""),
-                    args_contain=tc.get("args_contain", {}),
-                )
-                for tc in turn_data.get("tool_calls_expected", [])
-            ]
-
-            conversation.append(ConversationTurn(
-                turn=turn_data.get("turn", 1),
-                user_message=turn_data.get("user_message", ""),
-                expected=expected,
-                tool_calls_expected=tool_calls,
-                tool_calls_forbidden=turn_data.get("tool_calls_forbidden", []),
-            ))
-
-        test_cases.append(TestCase(
-            id=tc_data.get("id", ""),
-            name=tc_data.get("name", ""),
-            group=tc_data.get("group", ""),
-            description=tc_data.get("description", ""),
-            priority=tc_data.get("priority", "medium"),
-            conversation=conversation,
-            mock_overrides=tc_data.get("mock_overrides", {}),
-            tags=tc_data.get("tags", []),
-        ))
+        conversation = [
+            ConversationTurn(**{
+                **_TURN_DEFAULTS,
+                **turn_data,
+                "expected": ExpectedBehavior(
+                    **_intern_fields(turn_data.get("expected", {}), "language")
+                ),
+                "tool_calls_expected": [
+                    ToolCallExpectation(**_intern_fields({**_TOOL_CALL_DEFAULTS, **tc}, "name"))
+                    for tc in turn_data.get("tool_calls_expected", [])
+                ],
+            })
+            for turn_data in tc_data.get("conversation", [])
+        ]
+        test_cases.append(TestCase(**_intern_fields(
+            {**_CASE_DEFAULTS, **tc_data, "conversation": conversation},
+            "group",
+            "priority",
+        )))
 
     return TestMatrix(
         version=data.get("version", "1.0"),
@@ -127,17 +219,19 @@ def load_test_matrix(path: Optional[Path] = None) -> TestMatrix:
 
 def get_test_cases_by_group(matrix: TestMatrix, group_id: str) -> list[TestCase]:
     """Filter test cases by group."""
-    return [tc for tc in matrix.test_cases if tc.group == group_id]
+    return list(matrix.by_group.get(group_id, ()))
 
 
 def get_test_cases_by_priority(matrix: TestMatrix, priority: str) -> list[TestCase]:
     """Filter test cases by priority."""
-    return [tc for tc in matrix.test_cases if tc.priority == priority]
+    return list(matrix.by_priority.get(priority, ()))
+
+
+def has_test_case(matrix: TestMatrix, test_id: str) -> bool:
+    """Check whether the matrix has a test case with this ID."""
+    return test_id in matrix.id_index
 
 
 def get_test_case_by_id(matrix: TestMatrix, test_id: str) -> Optional[TestCase]:
     """Get a specific test case by ID."""
-    for tc in matrix.test_cases:
-        if tc.id == test_id:
-            return tc
-    return None
+    return matrix.id_index.get(test_id)
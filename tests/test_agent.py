@@ -4,17 +4,11 @@ Main test runner for Frepi Agent tests.
 Loads test cases from YAML matrix and executes them programmatically.
 """
 
-import json
 import pytest
-from datetime import datetime
-from pathlib import Path
-from typing import Optional
-from unittest.mock import AsyncMock, MagicMock, patch
 
 from tests.helpers.test_loader import (
     load_test_matrix,
     TestCase,
-    TestMatrix,
     ConversationTurn,
 )
 from tests.helpers.assertions import FrepiAssertions, AssertionResult
@@ -24,15 +18,23 @@ from tests.helpers.assertions import FrepiAssertions, AssertionResult
 TEST_MATRIX = load_test_matrix()
 
 
-class TestAgentFromMatrix:
-    """Test class that runs tests from the YAML test matrix."""
+def _param(tc: TestCase, test_id: str):
+    """
+    Parametrize value for a test case.
 
-    def get_mock_response_for_test(self, test_case: TestCase, turn: int) -> str:
-        """Get appropriate mock response based on test case."""
-        test_id = test_case.id
+    Each case runs once and carries its group and priority markers, so subsets
+    are selected with `-m group_a`, `-m high` etc. The xdist_group marker lets
+    `pytest -n auto --dist=loadgroup` shard the suite by group.
+    """
+    return pytest.param(tc, id=test_id, marks=(
+        getattr(pytest.mark, f"group_{tc.group.lower()}"),
+        getattr(pytest.mark, tc.priority),
+        pytest.mark.xdist_group(tc.group),
+    ))
 
-        # Default menu response
-        default_menu = """Olá! 👋 Bem-vindo ao Frepi, seu assistente de compras!
+
+# Default menu response
+_DEFAULT_MENU = """Olá! 👋 Bem-vindo ao Frepi, seu assistente de compras!
 
 Como posso ajudar você hoje?
 
@@ -43,10 +45,13 @@ Como posso ajudar você hoje?
 
 Digite o número da opção desejada ou me conte o que você precisa! 🛒"""
 
-        # Response mapping based on test ID
-        responses = {
-            "A001": default_menu,
-            "A002": """Vou verificar o fornecedor Marfrig no sistema.
+# Tests whose mock responses are keyed per turn
+_MULTI_TURN_TESTS = frozenset({"B002", "E002", "A003", "A004", "E003", "E004"})
+
+# Mock responses by test ID (multi-turn tests use "<id>_turn<n>" keys)
+_RESPONSES = {
+    "A001": _DEFAULT_MENU,
+    "A002": """Vou verificar o fornecedor Marfrig no sistema.
 
 ✅ Fornecedor encontrado: **Marfrig Distribuidora**
 
@@ -57,7 +62,7 @@ Exemplo: "Picanha R$ 45,00/kg, Alcatra R$ 38,00/kg"
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "B001": """Encontrei preços para Picanha! 🥩
+    "B001": """Encontrei preços para Picanha! 🥩
 
 **Melhores opções:**
 
@@ -72,7 +77,7 @@ Exemplo: "Picanha R$ 45,00/kg, Alcatra R$ 38,00/kg"
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "B002_turn1": """Encontrei a picanha! 🥩
+    "B002_turn1": """Encontrei a picanha! 🥩
 
 **Para 10kg de Picanha Friboi Premium:**
 
@@ -89,7 +94,7 @@ Confirma o pedido com Friboi Direto por R$ 419,00?
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "B002_turn2": """✅ Pedido confirmado!
+    "B002_turn2": """✅ Pedido confirmado!
 
 **Resumo do pedido:**
 • Produto: Picanha Friboi Premium
@@ -103,7 +108,7 @@ O pedido foi recebido e será processado.
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "C001": """⚠️ Não encontrei "hambúrguer de soja vegano" no catálogo.
+    "C001": """⚠️ Não encontrei "hambúrguer de soja vegano" no catálogo.
 
 Produtos similares encontrados:
 • Hambúrguer Bovino (32% similar)
@@ -116,7 +121,7 @@ Você pode:
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "C002": """⚠️ Atenção ao preço!
+    "C002": """⚠️ Atenção ao preço!
 
 **Filé Mignon** - R$ 150,00/kg está acima do normal.
 Preço médio histórico: R$ 89,90/kg
@@ -129,7 +134,7 @@ Deseja continuar mesmo assim?
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "D001": """📦 Status do seu último pedido:
+    "D001": """📦 Status do seu último pedido:
 
 **Pedido #1234**
 • Status: Em separação
@@ -142,7 +147,7 @@ Posso ajudar com mais alguma coisa?
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "D002": """📋 Seu histórico de compras:
+    "D002": """📋 Seu histórico de compras:
 
 **Últimos pedidos:**
 • 10/01 - Picanha 10kg - R$ 419,00 (Friboi Direto)
@@ -155,7 +160,7 @@ Posso ajudar com mais alguma coisa?
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "E001": """⚙️ Configuração de Preferências
+    "E001": """⚙️ Configuração de Preferências
 
 Você pode configurar:
 • **Fornecedores preferidos** - Priorizar certos fornecedores
@@ -168,7 +173,7 @@ O que você gostaria de configurar?
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "E002_turn1": """📝 Vamos cadastrar o novo fornecedor!
+    "E002_turn1": """📝 Vamos cadastrar o novo fornecedor!
 
 Por favor, me informe:
 • Nome da empresa
@@ -180,7 +185,7 @@ Por favor, me informe:
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "E002_turn2": """✅ Fornecedor cadastrado com sucesso!
+    "E002_turn2": """✅ Fornecedor cadastrado com sucesso!
 
 **Frigorífico Sul**
 • Telefone: 11999887766
@@ -192,7 +197,7 @@ Agora você pode receber cotações deste fornecedor.
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "F001": """⚠️ Não encontrei preços atualizados para "camarão fresco".
+    "F001": """⚠️ Não encontrei preços atualizados para "camarão fresco".
 
 Nenhum fornecedor cadastrado tem cotação recente.
 
@@ -205,7 +210,7 @@ Você pode:
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "F002": """⚠️ Fornecedor "NovoBrasil" não está cadastrado no sistema.
+    "F002": """⚠️ Fornecedor "NovoBrasil" não está cadastrado no sistema.
 
 Quer cadastrar este fornecedor agora?
 
@@ -218,7 +223,7 @@ Vou precisar de:
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "A003_turn1": """Olá! 👋 Bem-vindo ao Frepi!
+    "A003_turn1": """Olá! 👋 Bem-vindo ao Frepi!
 
 Vamos começar o cadastro do seu restaurante.
 
@@ -228,7 +233,7 @@ Qual é o nome do seu restaurante?
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "A003_turn2": """Ótimo! Você escolheu configurar os Top 5 produtos principais. 🎯
+    "A003_turn2": """Ótimo! Você escolheu configurar os Top 5 produtos principais. 🎯
 
 Vou te fazer algumas perguntas sobre preferências para seus 5 produtos mais importantes.
 
@@ -239,7 +244,7 @@ Qual marca você prefere?
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "A004_turn1": """Olá! 👋 Bem-vindo ao Frepi!
+    "A004_turn1": """Olá! 👋 Bem-vindo ao Frepi!
 
 Vamos começar o cadastro do seu restaurante.
 
@@ -249,7 +254,7 @@ Qual é o nome do seu restaurante?
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "A004_turn2": """Sem problema! Você pode configurar depois quando quiser. 😊
+    "A004_turn2": """Sem problema! Você pode configurar depois quando quiser. 😊
 
 Cadastro completo! Agora você já pode usar o Frepi para suas compras.
 
@@ -259,7 +264,7 @@ Como posso ajudar?
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "E003_turn1": """Entendi! Você prefere **Friboi** em vez de Marfrig. 📝
+    "E003_turn1": """Entendi! Você prefere **Friboi** em vez de Marfrig. 📝
 
 Posso perguntar por quê? Isso me ajuda a fazer recomendações melhores no futuro.
 
@@ -267,7 +272,7 @@ Posso perguntar por quê? Isso me ajuda a fazer recomendações melhores no futu
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "E003_turn2": """Anotado! ✅ Preferência atualizada:
+    "E003_turn2": """Anotado! ✅ Preferência atualizada:
 • **Picanha**: Friboi (motivo: qualidade mais consistente)
 
 Obrigado pelo feedback! Vou considerar isso nas próximas recomendações.
@@ -276,7 +281,7 @@ Obrigado pelo feedback! Vou considerar isso nas próximas recomendações.
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "E004_turn1": """Encontrei opções de arroz! 🍚
+    "E004_turn1": """Encontrei opções de arroz! 🍚
 
 Antes de continuar, uma pergunta rápida:
 Você tem alguma preferência de marca para arroz?
@@ -285,7 +290,7 @@ Você tem alguma preferência de marca para arroz?
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "E004_turn2": """Preferência salva! ✅
+    "E004_turn2": """Preferência salva! ✅
 
 • **Arroz**: Tio João, máximo R$ 6,00/kg
 
@@ -295,7 +300,7 @@ Agora vou buscar as melhores opções com essa preferência.
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-            "F003": """Posso ajudar você com:
+    "F003": """Posso ajudar você com:
 
 🛒 **Compras** - Encontrar produtos, comparar preços, fazer pedidos
 💰 **Preços** - Atualizar cotações de fornecedores
@@ -306,14 +311,17 @@ Agora vou buscar as melhores opções com essa preferência.
 2️⃣ Atualizar preços de fornecedor
 3️⃣ Registrar/Atualizar fornecedor
 4️⃣ Configurar preferências""",
-        }
+}
 
-        # Handle multi-turn tests
-        multi_turn_tests = ["B002", "E002", "A003", "A004", "E003", "E004"]
-        if test_id in multi_turn_tests:
-            return responses.get(f"{test_id}_turn{turn}", default_menu)
 
-        return responses.get(test_id, default_menu)
+class TestAgentFromMatrix:
+    """Test class that runs tests from the YAML test matrix."""
+
+    def get_mock_response_for_test(self, test_case: TestCase, turn: int) -> str:
+        """Get appropriate mock response based on test case."""
+        test_id = test_case.id
+        key = f"{test_id}_turn{turn}" if test_id in _MULTI_TURN_TESTS else test_id
+        return _RESPONSES.get(key, _DEFAULT_MENU)
 
     def validate_turn_expectations(
         self,
@@ -322,40 +330,8 @@ Agora vou buscar as melhores opções com essa preferência.
         recorded_calls: list[dict]
     ) -> list[AssertionResult]:
         """Validate all expectations for a conversation turn."""
-        results = []
-        expected = turn.expected
-
-        # Check contains_any
-        if expected.contains_any:
-            results.append(FrepiAssertions.assert_contains_any(response, expected.contains_any))
-
-        # Check contains_all
-        if expected.contains_all:
-            results.append(FrepiAssertions.assert_contains_all(response, expected.contains_all))
-
-        # Check not_contains
-        if expected.not_contains:
-            results.append(FrepiAssertions.assert_not_contains(response, expected.not_contains))
-
-        # Check menu displayed
-        if expected.contains_menu:
-            results.append(FrepiAssertions.assert_menu_displayed(response))
-
-        # Check emojis
-        if expected.has_emojis:
-            results.append(FrepiAssertions.assert_has_emojis(response))
-
-        # Check price format
-        if expected.has_price_format:
-            results.append(FrepiAssertions.assert_price_format(response))
-
-        # Check supplier names (not generic)
-        if expected.has_supplier_names:
-            results.append(FrepiAssertions.assert_has_supplier_names(response))
-
-        # Check Portuguese language
-        if expected.language == "pt-BR":
-            results.append(FrepiAssertions.assert_portuguese_language(response))
+        # Response checks planned when the matrix was loaded
+        results = [check(response) for check in turn.checks]
 
         # Check tool calls
         if turn.tool_calls_expected or turn.tool_calls_forbidden:
@@ -377,8 +353,10 @@ Agora vou buscar as melhores opções com essa preferência.
     @pytest.mark.asyncio
     @pytest.mark.parametrize(
         "test_case",
-        [tc for tc in TEST_MATRIX.test_cases],
-        ids=[f"{tc.id}-{tc.name.replace(' ', '_')}" for tc in TEST_MATRIX.test_cases]
+        [
+            _param(tc, f"{tc.id}-{tc.name.replace(' ', '_')}")
+            for tc in TEST_MATRIX.test_cases
+        ],
     )
     async def test_from_matrix(self, test_case: TestCase, tool_tracker):
         """
@@ -418,119 +396,3 @@ Agora vou buscar as melhores opções com essa preferência.
             pytest.fail(
                 f"\nTest {test_case.id} ({test_case.name}) failed:\n{failure_messages}"
             )
-
-
-# Group-specific test classes for selective running
-
-class TestGroupA:
-    """Group A: Onboarding tests."""
-
-    @pytest.mark.group_a
-    @pytest.mark.asyncio
-    @pytest.mark.parametrize(
-        "test_case",
-        [tc for tc in TEST_MATRIX.test_cases if tc.group == "A"],
-        ids=[tc.id for tc in TEST_MATRIX.test_cases if tc.group == "A"]
-    )
-    async def test_onboarding(self, test_case: TestCase, tool_tracker):
-        """Run onboarding test cases."""
-        runner = TestAgentFromMatrix()
-        await runner.test_from_matrix(test_case, tool_tracker)
-
-
-class TestGroupB:
-    """Group B: Pre-purchase tests."""
-
-    @pytest.mark.group_b
-    @pytest.mark.asyncio
-    @pytest.mark.parametrize(
-        "test_case",
-        [tc for tc in TEST_MATRIX.test_cases if tc.group == "B"],
-        ids=[tc.id for tc in TEST_MATRIX.test_cases if tc.group == "B"]
-    )
-    async def test_pre_purchase(self, test_case: TestCase, tool_tracker):
-        """Run pre-purchase test cases."""
-        runner = TestAgentFromMatrix()
-        await runner.test_from_matrix(test_case, tool_tracker)
-
-
-class TestGroupC:
-    """Group C: Core purchasing tests."""
-
-    @pytest.mark.group_c
-    @pytest.mark.asyncio
-    @pytest.mark.parametrize(
-        "test_case",
-        [tc for tc in TEST_MATRIX.test_cases if tc.group == "C"],
-        ids=[tc.id for tc in TEST_MATRIX.test_cases if tc.group == "C"]
-    )
-    async def test_core_purchasing(self, test_case: TestCase, tool_tracker):
-        """Run core purchasing test cases."""
-        runner = TestAgentFromMatrix()
-        await runner.test_from_matrix(test_case, tool_tracker)
-
-
-class TestGroupE:
-    """Group E: Management tests."""
-
-    @pytest.mark.group_e
-    @pytest.mark.asyncio
-    @pytest.mark.parametrize(
-        "test_case",
-        [tc for tc in TEST_MATRIX.test_cases if tc.group == "E"],
-        ids=[tc.id for tc in TEST_MATRIX.test_cases if tc.group == "E"]
-    )
-    async def test_management(self, test_case: TestCase, tool_tracker):
-        """Run management test cases."""
-        runner = TestAgentFromMatrix()
-        await runner.test_from_matrix(test_case, tool_tracker)
-
-
-class TestGroupF:
-    """Group F: Error handling tests."""
-
-    @pytest.mark.group_f
-    @pytest.mark.asyncio
-    @pytest.mark.parametrize(
-        "test_case",
-        [tc for tc in TEST_MATRIX.test_cases if tc.group == "F"],
-        ids=[tc.id for tc in TEST_MATRIX.test_cases if tc.group == "F"]
-    )
-    async def test_error_handling(self, test_case: TestCase, tool_tracker):
-        """Run error handling test cases."""
-        runner = TestAgentFromMatrix()
-        await runner.test_from_matrix(test_case, tool_tracker)
-
-
-# Priority-based test classes
-
-class TestHighPriority:
-    """High priority tests only."""
-
-    @pytest.mark.high
-    @pytest.mark.asyncio
-    @pytest.mark.parametrize(
-        "test_case",
-        [tc for tc in TEST_MATRIX.test_cases if tc.priority == "high"],
-        ids=[tc.id for tc in TEST_MATRIX.test_cases if tc.priority == "high"]
-    )
-    async def test_high_priority(self, test_case: TestCase, tool_tracker):
-        """Run high priority test cases."""
-        runner = TestAgentFromMatrix()
-        await runner.test_from_matrix(test_case, tool_tracker)
-
-
-class TestCriticalPriority:
-    """Critical priority tests only."""
-
-    @pytest.mark.critical
-    @pytest.mark.asyncio
-    @pytest.mark.parametrize(
-        "test_case",
-        [tc for tc in TEST_MATRIX.test_cases if tc.priority == "critical"],
-        ids=[tc.id for tc in TEST_MATRIX.test_cases if tc.priority == "critical"]
-    )
-    async def test_critical_priority(self, test_case: TestCase, tool_tracker):
-        """Run critical priority test cases."""
-        runner = TestAgentFromMatrix()
-        await runner.test_from_matrix(test_case, tool_tracker)
@@ -0,0 +1,86 @@
+"""Tests for batch engagement rescoring."""
+
+import pytest
+
+from frepi_agent.shared import engagement_scoring
+
+
+class FakeQuery:
+    """Chainable stand-in for a PostgREST query on engagement_profile."""
+
+    def __init__(self, client):
+        self._client = client
+        self._range = None
+
+    def select(self, columns):
+        self._client.selected.append(columns)
+        return self
+
+    def order(self, column):
+        return self
+
+    def range(self, start, end):
+        self._range = (start, end)
+        return self
+
+    def upsert(self, rows, on_conflict):
+        self._client.written.append(rows)
+        return self
+
+    def execute(self):
+        if self._range is None:
+            return type("Result", (), {"data": []})()
+        start, end = self._range
+        return type("Result", (), {"data": self._client.profiles[start:end + 1]})()
+
+
+class FakeClient:
+    def __init__(self, profiles):
+        self.profiles = profiles
+        self.selected = []
+        self.written = []
+
+    def table(self, name):
+        return FakeQuery(self)
+
+    def rpc(self, name, params):
+        raise RuntimeError("function does not exist")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    profiles = [
+        {
+            "restaurant_id": rid,
+            "onboarding_depth": 10,
+            "drip_questions_answered": 4,
+            "drip_questions_skipped": 1,
+            "total_corrections": 5,
+            "sessions_last_30d": 10,
+            "corrections_with_reason": 5,
+        }
+        for rid in range(1, 6)
+    ]
+    client = FakeClient(profiles)
+    monkeypatch.setattr(engagement_scoring, "get_supabase_client", lambda: client)
+    monkeypatch.setattr(engagement_scoring, "BULK_PAGE_SIZE", 2)
+    return client
+
+
+class TestRecalculateEngagementBulk:
+    def test_reads_every_page(self, client):
+        assert engagement_scoring.recalculate_engagement_bulk() == 5
+        assert len(client.written) == 3
+
+    def test_writes_only_score_columns(self, client):
+        engagement_scoring.recalculate_engagement_bulk()
+
+        for rows in client.written:
+            for row in rows:
+                assert set(row) == {
+                    "restaurant_id",
+                    "engagement_score",
+                    "engagement_level",
+                    "drip_questions_per_session",
+                }
+        assert "*" not in client.selected
@@ -0,0 +1,64 @@
+"""
+Unit tests for the restaurant agent's tools.
+
+Supabase is replaced by a stub.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from frepi_agent.restaurant_facing_agent.tools import suppliers
+
+
+class RecordingQuery:
+    """Chainable PostgREST query stub recording the builder calls."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.calls.append((name, *args))
+            return self
+        return call
+
+
+@pytest.fixture
+def query(monkeypatch):
+    rows = [
+        {"id": 4, "company_name": "Hortifruti"},
+        {"id": 9, "company_name": "Hortifruti"},
+    ]
+    query = RecordingQuery(rows)
+    monkeypatch.setattr(suppliers, "get_supabase_client", lambda: SimpleNamespace(table=lambda name: query))
+
+    async def fake_execute(q):
+        return SimpleNamespace(data=q.rows)
+
+    monkeypatch.setattr(suppliers, "execute_async", fake_execute)
+    return query
+
+
+class TestGetAllActiveSuppliers:
+    """Keyset paging of the supplier directory."""
+
+    async def test_full_page_returns_composite_cursor(self, query):
+        page, cursor = await suppliers.get_all_active_suppliers(limit=2)
+
+        assert [s.id for s in page] == [4, 9]
+        assert cursor == ("Hortifruti", 9)
+        assert ("order", "company_name") in query.calls
+        assert ("order", "id") in query.calls
+
+    async def test_short_page_has_no_cursor(self, query):
+        _, cursor = await suppliers.get_all_active_suppliers(limit=5)
+
+        assert cursor is None
+
+    async def test_cursor_breaks_name_ties_by_id(self, query):
+        await suppliers.get_all_active_suppliers(limit=2, after=("Hortifruti, Ltda.", 9))
+
+        assert ("or_", 'company_name.gt."Hortifruti, Ltda.",'
+                'and(company_name.eq."Hortifruti, Ltda.",id.gt.9)') in query.calls
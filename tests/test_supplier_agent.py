@@ -0,0 +1,278 @@
+"""
+Unit tests for the supplier agent's request-side helpers.
+
+These run without OpenAI or Supabase: the model stream is replaced by a stub.
+"""
+
+import asyncio
+from contextlib import aclosing
+
+import pytest
+
+from frepi_agent.supplier_facing_agent import agent as supplier_agent
+from frepi_agent.supplier_facing_agent.agent import (
+    SupplierAgent,
+    SupplierConversationContext,
+    _compile_args_parser,
+    _select_tool_groups,
+    _to_table,
+)
+
+ALL_GROUPS = frozenset(supplier_agent.TOOL_GROUPS)
+
+
+def _tool_names(tools_body: dict) -> set[str]:
+    return {tool["function"]["name"] for tool in tools_body["tools"]}
+
+
+class TestSelectToolGroups:
+    """Keyword routing of supplier messages to tool groups."""
+
+    @pytest.mark.parametrize("message, expected", [
+        ("1", {"quotations"}),
+        ("3️⃣", {"orders"}),
+        ("Quero confirmar o pedido 123", {"orders"}),
+        ("O caminhão atrasou, chega à tarde", {"deliveries"}),
+        ("O que tenho pendente?", {"overview"}),
+        ("Picanha R$ 45,00/kg", {"quotations"}),
+        ("Alface 3,50 o kg", {"quotations"}),
+        ("42,90", {"quotations"}),
+        ("Tomate 45 reais", {"quotations"}),
+    ])
+    def test_single_workflow(self, message, expected):
+        assert _select_tool_groups(message) == expected
+
+    @pytest.mark.parametrize("message", ["sim", "ok, pode ser", "bom dia", "👍"])
+    def test_no_keyword_selects_nothing(self, message):
+        assert _select_tool_groups(message) == frozenset()
+
+    @pytest.mark.parametrize("message", [
+        "Tomate 45 reais, entrega amanhã",
+        "Confirmo o pedido, o preço fica 12,50",
+    ])
+    def test_several_workflows_select_all(self, message):
+        assert _select_tool_groups(message) == ALL_GROUPS
+
+
+PRICE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "product_id": {"type": "integer"},
+        "unit_price": {"type": "number"},
+        "unit": {"type": "string", "enum": ["kg", "un"], "default": "kg"},
+    },
+    "required": ["product_id", "unit_price"],
+}
+
+
+class TestArgsParser:
+    """Tool argument parsing compiled from the JSON Schemas."""
+
+    @pytest.fixture
+    def parse(self):
+        return _compile_args_parser(PRICE_SCHEMA)
+
+    def test_coerces_and_fills_defaults(self, parse):
+        args = parse('{"product_id": "12", "unit_price": "42.90", "extra": 1}')
+
+        assert args == {"product_id": 12, "unit_price": 42.9, "unit": "kg"}
+
+    def test_integral_float_id_is_accepted(self, parse):
+        assert parse('{"product_id": 12.0, "unit_price": 5}')["product_id"] == 12
+
+    @pytest.mark.parametrize("price", ['"nan"', '"NaN"', '"inf"', '"-inf"', '"Infinity"'])
+    def test_non_finite_number_is_rejected(self, parse, price):
+        with pytest.raises(ValueError, match="unit_price"):
+            parse(f'{{"product_id": 1, "unit_price": {price}}}')
+
+    @pytest.mark.parametrize("raw", [
+        '{"product_id": 1.5, "unit_price": 5}',
+        '{"product_id": true, "unit_price": 5}',
+        '{"product_id": 1, "unit_price": "barato"}',
+        '{"product_id": 1, "unit_price": [5]}',
+    ])
+    def test_wrong_type_is_rejected(self, parse, raw):
+        with pytest.raises(ValueError, match="inválido"):
+            parse(raw)
+
+    def test_missing_required_is_rejected(self, parse):
+        with pytest.raises(ValueError, match="unit_price"):
+            parse('{"product_id": 1, "unit_price": null}')
+
+    def test_value_outside_enum_is_rejected(self, parse):
+        with pytest.raises(ValueError, match="kg, un"):
+            parse('{"product_id": 1, "unit_price": 5, "unit": "ton"}')
+
+    def test_non_object_is_rejected(self, parse):
+        with pytest.raises(ValueError):
+            parse("[1, 2]")
+
+
+class TestToTable:
+    """Compact table encoding of tool results."""
+
+    def test_header_then_one_line_per_row(self):
+        rows = [
+            {"id": 1, "name": "Tomate", "price": 4.5},
+            {"id": 2, "name": "Alface", "price": None},
+        ]
+
+        assert _to_table("Products", rows) == (
+            "Products{id|name|price}\n"
+            "1|Tomate|4.5\n"
+            "2|Alface|"
+        )
+
+    def test_empty(self):
+        assert _to_table("Products", []) == "Products{}"
+
+    def test_ambiguous_and_nested_cells_are_json_encoded(self):
+        rows = [{"note": "a|b", "tags": ["x"], "text": "linha\nnova"}]
+
+        assert _to_table("Notes", rows).splitlines()[1] == '"a|b"|["x"]|"linha\\nnova"'
+
+
+class TestToolGroupsAcrossTurns:
+    """Tool schemas sent to the model over a conversation."""
+
+    @pytest.fixture
+    def agent(self):
+        # Bypass __init__ (needs API keys); only the turn loop is exercised
+        agent = SupplierAgent.__new__(SupplierAgent)
+        agent.system_prompt = "prompt"
+        agent._response_cache = {}
+        agent.max_tool_rounds = 5
+        agent.sent_tools = []
+
+        async def fake_stream(context, tools_body):
+            agent.sent_tools.append(_tool_names(tools_body))
+            return
+            yield
+
+        agent._stream_gpt4 = fake_stream
+        return agent
+
+    async def test_follow_up_keeps_previous_tools(self, agent):
+        context = SupplierConversationContext(supplier_id=7, supplier_name="Hortifruti")
+
+        await agent.process_message("Quais cotações tenho?", context)
+        await agent.process_message("sim", context)
+        await agent.process_message("Tomate 4,50 o kg", context)
+
+        assert all("submit_price" in tools for tools in agent.sent_tools)
+
+    async def test_groups_accumulate(self, agent):
+        context = SupplierConversationContext(supplier_id=7, supplier_name="Hortifruti")
+
+        await agent.process_message("Tenho um pedido novo?", context)
+        await agent.process_message("Cebola 3,20 o kg", context)
+
+        assert "confirm_order" in agent.sent_tools[-1]
+        assert "submit_price" in agent.sent_tools[-1]
+
+    async def test_unclear_opening_sends_all_tools(self, agent):
+        context = SupplierConversationContext(supplier_id=7, supplier_name="Hortifruti")
+
+        await agent.process_message("bom dia", context)
+
+        assert agent.sent_tools[-1] == set(supplier_agent._TOOLS_BY_NAME)
+
+
+class FakeStream:
+    """Async chunk stream that records whether it was closed."""
+
+    def __init__(self, chunks, ready: asyncio.Event):
+        self._chunks = iter(chunks)
+        self._ready = ready
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await self._ready.wait()
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def close(self):
+        self.closed = True
+
+
+class TestHedgedStream:
+    """Cleanup of the hedged GPT-4 requests in _stream_gpt4."""
+
+    @pytest.fixture
+    def agent(self, monkeypatch):
+        monkeypatch.setattr(supplier_agent, "HEDGE_AFTER_SECONDS", 0.01)
+        agent = SupplierAgent.__new__(SupplierAgent)
+        agent.ready = asyncio.Event()
+        agent.streams = []
+
+        async def fake_call(context, tools_body):
+            stream = FakeStream(["a", "b", "c"], agent.ready)
+            agent.streams.append(stream)
+            if len(agent.streams) == 2:
+                # Let both requests produce their first chunk in the same tick
+                asyncio.get_running_loop().call_later(0.01, agent.ready.set)
+            return stream
+
+        agent._call_gpt4 = fake_call
+        return agent
+
+    async def test_simultaneous_finish_closes_the_loser(self, agent):
+        chunks = [chunk async for chunk in agent._stream_gpt4(None, {})]
+
+        assert chunks == ["a", "b", "c"]
+        assert len(agent.streams) == 2
+        assert all(stream.closed for stream in agent.streams)
+
+    async def test_early_stop_closes_the_winner(self, agent):
+        async with aclosing(agent._stream_gpt4(None, {})) as chunks:
+            async for chunk in chunks:
+                break
+
+        assert all(stream.closed for stream in agent.streams)
+
+
+class TestSupplierChatMany:
+    """Concurrent conversations through supplier_chat_many."""
+
+    async def test_failure_is_returned_in_place(self, monkeypatch):
+        agent = SupplierAgent.__new__(SupplierAgent)
+
+        async def fake_process_message(user_message, context):
+            if user_message == "erro":
+                raise RuntimeError("boom")
+            return f"ok {context.supplier_id}"
+
+        agent.process_message = fake_process_message
+        monkeypatch.setattr(supplier_agent, "get_supplier_agent", lambda: agent)
+
+        results = await supplier_agent.supplier_chat_many([
+            ("oi", SupplierConversationContext(supplier_id=1)),
+            ("erro", SupplierConversationContext(supplier_id=2)),
+            ("oi", SupplierConversationContext(supplier_id=3)),
+        ])
+
+        assert results[0] == "ok 1"
+        assert isinstance(results[1], RuntimeError)
+        assert results[2] == "ok 3"
+
+
+class TestSharedHttpClient:
+    """Lifecycle of the HTTP client shared by the OpenAI clients."""
+
+    def test_each_event_loop_gets_a_fresh_client(self):
+        # Simulates scripts that call asyncio.run more than once
+        async def use_and_close():
+            client = supplier_agent._get_shared_http_client()
+            await supplier_agent.close_supplier_agent()
+            return client
+
+        first = asyncio.run(use_and_close())
+        second = asyncio.run(use_and_close())
+
+        assert first is not second
+        assert first.is_closed and second.is_closed
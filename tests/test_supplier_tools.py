@@ -0,0 +1,135 @@
+"""
+Unit tests for the supplier agent's tools.
+
+Supabase and the Postgres pool are replaced by stubs.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from frepi_agent.supplier_facing_agent.tools import (
+    order_management,
+    price_submission,
+    quotation_request,
+)
+
+
+class FakeQuery:
+    """Chainable PostgREST query stub; every builder method returns itself."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+
+class TestPendingOrdersCache:
+    """Caching of get_pending_orders and its invalidation by confirm/reject."""
+
+    @pytest.fixture
+    def fetches(self, monkeypatch):
+        fetches = []
+
+        async def fake_fetch(supplier_id):
+            fetches.append(supplier_id)
+            return [{"order_id": "PO-1", "restaurant_id": 3, "total_amount": 10}]
+
+        monkeypatch.setattr(order_management.db_pool, "get_db_pool", lambda: object())
+        monkeypatch.setattr(order_management, "_fetch_pending_order_rows_pg", fake_fetch)
+        monkeypatch.setattr(order_management, "get_supabase_client", lambda: FakeQuery())
+        monkeypatch.setattr(order_management, "_pending_cache", {})
+        return fetches
+
+    async def test_reopened_list_is_cached(self, fetches):
+        await order_management.get_pending_orders(7)
+        orders = await order_management.get_pending_orders(7)
+
+        assert fetches == [7]
+        assert [order.order_id for order in orders] == ["PO-1"]
+
+    async def test_returned_list_is_a_copy(self, fetches):
+        (await order_management.get_pending_orders(7)).clear()
+
+        assert len(await order_management.get_pending_orders(7)) == 1
+
+    @pytest.mark.parametrize("action, args", [
+        (order_management.confirm_order, {}),
+        (order_management.reject_order, {"reason": "sem estoque"}),
+    ])
+    async def test_status_change_invalidates(self, fetches, monkeypatch, action, args):
+        async def fake_execute(query):
+            return SimpleNamespace(data=[{"order_id": "PO-1"}])
+
+        monkeypatch.setattr(order_management, "execute_async", fake_execute)
+
+        await order_management.get_pending_orders(7)
+        result = await action(supplier_id=7, order_id="PO-1", **args)
+        await order_management.get_pending_orders(7)
+
+        assert result["success"]
+        assert fetches == [7, 7]
+
+
+class TestPendingQuotationsCache:
+    """Caching of get_pending_quotations and its invalidation by submit_price."""
+
+    @pytest.fixture
+    def fetches(self, monkeypatch):
+        fetches = []
+
+        async def fake_fetch(supplier_id):
+            fetches.append(supplier_id)
+            return [{"id": 11, "supplier_product_name": "Tomate", "master_list": None}]
+
+        monkeypatch.setattr(quotation_request.db_pool, "get_db_pool", lambda: object())
+        monkeypatch.setattr(quotation_request, "_fetch_unpriced_products_pg", fake_fetch)
+        monkeypatch.setattr(quotation_request, "_pending_cache", {})
+        return fetches
+
+    async def test_returned_list_is_a_copy(self, fetches):
+        (await quotation_request.get_pending_quotations(7)).clear()
+
+        assert len(await quotation_request.get_pending_quotations(7)) == 1
+        assert fetches == [7]
+
+    async def test_submitted_price_invalidates(self, fetches, monkeypatch):
+        monkeypatch.setattr(price_submission, "_record_price", lambda *args: "Tomate")
+
+        await quotation_request.get_pending_quotations(7)
+        result = await price_submission.submit_price(7, 11, 4.5)
+        await quotation_request.get_pending_quotations(7)
+
+        assert result.success
+        assert fetches == [7, 7]
+
+
+class TestUnpricedProducts:
+    """REST lookup of a supplier's products without a current price."""
+
+    async def test_price_lookup_is_chunked(self, monkeypatch):
+        products = [{"id": smp_id} for smp_id in range(1, 451)]
+        lookups = []
+
+        class Query(FakeQuery):
+            def __init__(self, table):
+                self.table, self.ids = table, None
+
+            def in_(self, column, ids):
+                self.ids = ids
+                lookups.append(len(ids))
+                return self
+
+            def execute(self):
+                if self.table == quotation_request.Tables.PRICING_HISTORY:
+                    # Every even product has an open price
+                    return SimpleNamespace(data=[
+                        {"supplier_mapped_product_id": i} for i in self.ids if i % 2 == 0
+                    ])
+                return SimpleNamespace(data=products)
+
+        client = SimpleNamespace(table=Query)
+        monkeypatch.setattr(quotation_request, "get_supabase_client", lambda: client)
+
+        unpriced = quotation_request._fetch_unpriced_products(7)
+
+        assert lookups == [200, 200, 50]
+        assert [smp["id"] for smp in unpriced] == list(range(1, 451, 2))
@@ -0,0 +1,67 @@
+"""Tests for streaming replies into Telegram."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from telegram.error import BadRequest, RetryAfter
+
+from frepi_agent.integrations import telegram_bot
+from frepi_agent.integrations.telegram_bot import EMPTY_REPLY_MESSAGE, stream_reply
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+class FakeMessage:
+    """Sent-message stub that fails edits the way Telegram does."""
+
+    def __init__(self):
+        self.replies = []
+        self.edits = 0
+        self.flood_limited_edits = 0
+
+    async def reply_text(self, text, **kwargs):
+        if not text:
+            raise AssertionError("Telegram rejects empty messages")
+        self.replies.append(text)
+        return SimpleNamespace(edit_text=self._edit)
+
+    async def _edit(self, text, **kwargs):
+        if self.flood_limited_edits:
+            self.flood_limited_edits -= 1
+            raise RetryAfter(0)
+        if text.rstrip() == self.replies[-1].rstrip():
+            raise BadRequest("Message is not modified")
+        self.edits += 1
+        self.replies[-1] = text
+
+
+@pytest.fixture
+def update(monkeypatch):
+    monkeypatch.setattr(telegram_bot, "STREAM_EDIT_INTERVAL_SECONDS", 0.0)
+    return SimpleNamespace(message=FakeMessage())
+
+
+class TestStreamReply:
+    @pytest.mark.parametrize("parts", [(), ("",), (" ", "\n")])
+    async def test_empty_stream_returns_fallback(self, update, parts):
+        assert await stream_reply(update, _chunks(*parts)) == EMPTY_REPLY_MESSAGE
+        assert update.message.replies == []
+
+    async def test_streamed_text_is_shown(self, update):
+        assert await stream_reply(update, _chunks("Olá", ", tudo bem?")) is None
+        assert update.message.replies == ["Olá, tudo bem?"]
+
+    async def test_whitespace_only_chunks_do_not_fail(self, update):
+        assert await stream_reply(update, _chunks("Olá", "\n", " ", "\n\n")) is None
+        assert update.message.replies == ["Olá"]
+        assert update.message.edits == 0
+
+    async def test_flood_limited_edit_does_not_fail(self, update):
+        update.message.flood_limited_edits = 2
+
+        assert await stream_reply(update, _chunks("Olá", ", tudo", " bem?")) is None
+        assert update.message.replies == ["Olá, tudo bem?"]
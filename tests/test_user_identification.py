@@ -0,0 +1,54 @@
+"""Tests for batched user identification."""
+
+import asyncio
+
+import pytest
+
+from frepi_agent.shared import user_identification
+from frepi_agent.shared.user_identification import UserIdentification, UserType
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Replace the database lookup with a slow stub recording each batch."""
+    batches = []
+
+    async def fake_lookup_users(chat_ids):
+        batches.append(sorted(chat_ids))
+        await asyncio.sleep(0.01)
+        return {
+            chat_id: UserIdentification(user_type=UserType.UNKNOWN, is_new_user=True)
+            for chat_id in chat_ids
+        }
+
+    monkeypatch.setattr(user_identification, "_lookup_users", fake_lookup_users)
+    monkeypatch.setattr(user_identification, "_user_loader", user_identification._UserLoader())
+    user_identification.invalidate_user_cache()
+    yield batches
+    user_identification.invalidate_user_cache()
+
+
+class TestUserLoader:
+    """Coalescing of identify_user lookups."""
+
+    async def test_same_tick_lookups_share_one_batch(self, lookups):
+        results = await asyncio.gather(
+            user_identification.identify_user(1),
+            user_identification.identify_user(2),
+            user_identification.identify_user(1),
+        )
+
+        assert lookups == [[1, 2]]
+        assert all(r.user_type == UserType.UNKNOWN for r in results)
+
+    async def test_cancelling_one_caller_spares_the_others(self, lookups):
+        first = asyncio.create_task(user_identification.identify_user(1))
+        second = asyncio.create_task(user_identification.identify_user(1))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        identification = await second
+
+        assert identification.user_type == UserType.UNKNOWN
+        with pytest.raises(asyncio.CancelledError):
+            await first